@@ -0,0 +1,84 @@
+import numpy as np
+import HandEvaluator
+
+# NumPy version of HandEvaluator.evaluate for whole arrays of hands
+# same card ids and same strengths (1 = royal flush, lower is better), so results can be mixed freely
+
+CARD_KEYS = np.array(HandEvaluator.CARD_KEYS, dtype=np.int64)
+RANK_KEYS = np.array(HandEvaluator.RANK_KEYS, dtype=np.int64)
+CATEGORIES = np.array(HandEvaluator.CATEGORIES, dtype=np.int8)
+
+# the base 8 fingerprint is too sparse for a flat array, so it is split into the low 7 and high 6 ranks
+# each half is mapped to a dense id and the pair of ids indexes a 2d table of strengths
+LOW_BITS = 7 * 3
+LOW_MASK = (1 << LOW_BITS) - 1
+
+
+def buildRankTable():
+    fingerprints = np.array(list(HandEvaluator.RANK_TABLE), dtype=np.int64)
+    strengths = np.array(list(HandEvaluator.RANK_TABLE.values()), dtype=np.int16)
+    lows = fingerprints & LOW_MASK
+    highs = fingerprints >> LOW_BITS
+
+    lowIds = np.zeros(LOW_MASK + 1, dtype=np.intp)
+    highIds = np.zeros(highs.max() + 1, dtype=np.intp)
+    lowValues = np.unique(lows)
+    highValues = np.unique(highs)
+    lowIds[lowValues] = np.arange(lowValues.size)
+    highIds[highValues] = np.arange(highValues.size)
+
+    table = np.zeros((lowValues.size, highValues.size), dtype=np.int16)
+    table[lowIds[lows], highIds[highs]] = strengths
+
+    return lowIds, highIds, table
+
+
+LOW_IDS, HIGH_IDS, RANK_STRENGTHS = buildRankTable()
+
+# only the few flush rows use the flush table, so a sorted search is enough there
+FLUSH_KEYS = np.array(sorted(HandEvaluator.FLUSH_TABLE), dtype=np.int64)
+FLUSH_STRENGTHS = np.array(
+    [HandEvaluator.FLUSH_TABLE[key] for key in FLUSH_KEYS.tolist()], dtype=np.int16
+)
+
+# hands are evaluated in chunks so the intermediate arrays stay in cache
+CHUNK_SIZE = 32768
+
+
+# takes an (N, 5), (N, 6) or (N, 7) array of card ids and returns an (N,) array of strengths
+def evaluateBatch(cards):
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError("cards must be shaped (hands, 5 to 7)")
+
+    strengths = np.empty(len(cards), dtype=np.int16)
+    for start in range(0, len(cards), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        strengths[start:end] = evaluateChunk(cards[start:end].astype(np.intp))
+
+    return strengths
+
+
+def evaluateChunk(cards):
+    # same packed rank fingerprint and suit counters as HandEvaluator.evaluate
+    keys = CARD_KEYS[cards].sum(axis=1) + HandEvaluator.FLUSH_BIAS
+    fingerprints = keys & HandEvaluator.RANK_MASK
+    strengths = RANK_STRENGTHS[LOW_IDS[fingerprints & LOW_MASK], HIGH_IDS[fingerprints >> LOW_BITS]]
+
+    flushBits = keys & HandEvaluator.FLUSH_CHECK
+    flushes = np.flatnonzero(flushBits)
+
+    # at most one suit can hold 5 cards, so only those rows need a suited fingerprint
+    if flushes.size:
+        flushCards = cards[flushes]
+        flushSuits = (np.log2(flushBits[flushes] >> HandEvaluator.SUIT_SHIFT).astype(np.int64) - 3) >> 2
+        inSuit = (flushCards & 3) == flushSuits[:, np.newaxis]
+        suited = np.where(inSuit, RANK_KEYS[flushCards], 0).sum(axis=1)
+        flushStrengths = FLUSH_STRENGTHS[np.searchsorted(FLUSH_KEYS, suited)]
+        strengths[flushes] = np.minimum(strengths[flushes], flushStrengths)
+
+    return strengths
+
+
+def handCategories(strengths):
+    return CATEGORIES[np.asarray(strengths)]
@@ -0,0 +1,450 @@
+import argparse, itertools, json, platform, random, statistics, subprocess, sys, time
+import HandEvaluator, Snapshot
+from DataStructures import CircularLinkedList, SeatRing
+from Game import Card, Pot
+from Headless import HeadlessPoker, CallingAgent
+
+# the lockstep backend needs NumPy, its case is skipped without it
+try:
+    import Lockstep
+except ImportError:
+    Lockstep = None
+
+# Benchmarks for the hot paths, every case is seeded so runs are comparable between commits
+#   python Benchmark.py run --output before.json
+#   python Benchmark.py compare before.json after.json --threshold 0.1
+# ops/sec is the median over repeated batches of calls, each about SAMPLE_NS long
+# the p50/p90/p99 latencies (ns) are over single calls timed one at a time, less the clock's own overhead,
+# so they show the per call tail that batch averages smooth away
+
+SEED = 1234
+INPUTS = 1000
+REPEAT = 50
+SAMPLE_NS = 5_000_000
+LATENCY_SAMPLES = 10_000
+LATENCY_NS = 200_000_000
+THRESHOLD = 0.1
+
+# name -> setup(rng) returning a function that runs one operation
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def cycle(function, inputs):
+    inputs = itertools.cycle(inputs)
+    return lambda: function(next(inputs))
+
+
+def randomHand(rng, size=7):
+    return rng.sample(range(len(Card.CARDS)), size)
+
+
+def sortedCards(cardIds):
+    return sorted([Card.fromInt(card) for card in cardIds], key=Card.getValue)
+
+
+def newTable(seats=6):
+    return HeadlessPoker({f"p{i}": CallingAgent() for i in range(seats)}, 2)
+
+
+@case("HandEvaluator.evaluate")
+def evaluateCase(rng):
+    return cycle(HandEvaluator.evaluate, [randomHand(rng) for _ in range(INPUTS)])
+
+
+# a hand built street by street with the made hand read after each one
+@case("HandEvaluator.HandState")
+def handStateCase(rng):
+    def streets(cards):
+        state = HandEvaluator.HandState(cards[:2])
+        state.category()
+        state.extend(cards[2:5])
+        state.category()
+        state.add(cards[5])
+        state.category()
+        state.add(cards[6])
+        return state.strength()
+
+    return cycle(streets, [randomHand(rng) for _ in range(INPUTS)])
+
+
+@case("Poker.getHandRank")
+def getHandRankCase(rng):
+    game = newTable()
+    return cycle(game.getHandRank, [sortedCards(randomHand(rng)) for _ in range(INPUTS)])
+
+
+@case("Poker.checkStraight")
+def checkStraightCase(rng):
+    game = newTable()
+    hands = [[card.value for card in sortedCards(randomHand(rng))] for _ in range(INPUTS)]
+    return cycle(game.checkStraight, hands)
+
+
+@case("Poker.checkStraightFlush")
+def checkStraightFlushCase(rng):
+    game = newTable()
+    straights = []
+    while len(straights) < INPUTS:
+        cards = sortedCards(randomHand(rng))
+        start, end = game.checkStraight([card.value for card in cards])
+        if end:
+            straights.append(cards[max(start, 0):end + 1])
+
+    return cycle(game.checkStraightFlush, straights)
+
+
+@case("Poker.findWinner")
+def findWinnerCase(rng):
+    game = newTable()
+    deals = []
+    for _ in range(INPUTS):
+        cards = randomHand(rng, 17)
+        deals.append((cards[:5], [cards[i:i + 2] for i in range(5, 17, 2)]))
+
+    def findWinner(deal):
+        community, holes = deal
+        game.community = community
+        for player, hole in zip(game.players, holes):
+            player.hand = list(hole)
+
+        return game.findWinner(game.players)
+
+    return cycle(findWinner, deals)
+
+
+# six players all in for different amounts, so there is a side pot per player
+@case("Poker.resolveShowdown")
+def resolveShowdownCase(rng):
+    game = newTable()
+    deals = []
+    for _ in range(INPUTS):
+        cards = randomHand(rng, 17)
+        deals.append((cards[:5], [cards[i:i + 2] for i in range(5, 17, 2)], rng.sample(range(1, 1000), 6)))
+
+    def resolveShowdown(deal):
+        community, holes, contributions = deal
+        game.community = community
+        for player, hole, contribution in zip(game.players, holes, contributions):
+            player.hand = list(hole)
+            player.handState = HandEvaluator.HandState(hole + community)
+            player.currentPotContrib = contribution
+
+        game.activePlayers = SeatRing(game.players)
+
+        pot = Pot(0, game.players)
+        while pot:
+            game.pots.enqueue(pot)
+            pot = pot.addChipsToPot()
+
+        return game.resolveShowdown()
+
+    return cycle(resolveShowdown, deals)
+
+
+@case("Poker.findBiggestHand")
+def findBiggestHandCase(rng):
+    game = newTable()
+    getCard = lambda i: lambda player: Card.valueOf(player.hand[i])
+    deals = [[sorted(randomHand(rng, 5), reverse=True) for _ in game.players] for _ in range(INPUTS)]
+
+    def findBiggestHand(hands):
+        for player, hand in zip(game.players, hands):
+            player.hand = hand
+
+        return game.findBiggestHand(game.players, getCard, 5)
+
+    return cycle(findBiggestHand, deals)
+
+
+@case("Poker.mergeSort")
+def mergeSortCase(rng):
+    game = newTable()
+    decks = [rng.sample(range(len(Card.CARDS)), len(Card.CARDS)) for _ in range(INPUTS // 10)]
+    return cycle(lambda deck: game.mergeSort(list(deck), Card.valueOf), decks)
+
+
+# every player is all in for a different amount, so each call builds a pot per level
+@case("Pot.addChipsToPot")
+def addChipsToPotCase(rng):
+    game = newTable()
+    levels = [rng.sample(range(1, 1000), len(game.players)) for _ in range(INPUTS)]
+
+    def addChipsToPot(contributions):
+        for player, contribution in zip(game.players, contributions):
+            player.currentPotContrib = contribution
+
+        pots = [Pot(0, game.players)]
+        nextPot = pots[0].addChipsToPot()
+        while nextPot:
+            pots.append(nextPot)
+            nextPot = nextPot.addChipsToPot()
+
+        return pots
+
+    return cycle(addChipsToPot, levels)
+
+
+@case("CircularLinkedList")
+def circularLinkedListCase(rng):
+    orders = [rng.sample(range(6), 6) for _ in range(INPUTS)]
+
+    def operations(order):
+        seats = CircularLinkedList()
+        for seat in order:
+            seats.insertTail(seat)
+        seats.search(order[3], start=seats.head.next)
+        seats.deleteNode(order[0])
+        seats.deleteNode(order[-1])
+        return seats.getList()
+
+    return cycle(operations, orders)
+
+
+# the same folds and lookups on the seat ring
+@case("SeatRing")
+def seatRingCase(rng):
+    orders = [rng.sample(range(6), 6) for _ in range(INPUTS)]
+
+    def operations(order):
+        seats = SeatRing(order)
+        seats.nextToAct(order[3])
+        seats.fold(0)
+        seats.fold(5)
+        return seats.getList()
+
+    return cycle(operations, orders)
+
+
+# a six handed table just after the flop, with the blinds in the pot
+def midHandTable(rng):
+    game = HeadlessPoker({f"p{i}": CallingAgent() for i in range(6)}, 2, rng=random.Random(rng.random()))
+    game.deal()
+    seats = game.activePlayers
+    game.postBlind(seats.players[1], game.minBet)
+    game.postBlind(seats.players[0], game.minBet // 2)
+    game.pots.enqueue(Pot(0, seats.getList()))
+    game.dealStreet()
+    return game
+
+
+@case("Snapshot.snapshot")
+def snapshotCase(rng):
+    game = midHandTable(rng)
+    return lambda: Snapshot.snapshot(game)
+
+
+@case("Snapshot.restore")
+def restoreCase(rng):
+    game = midHandTable(rng)
+    blob = Snapshot.snapshot(game)
+    return lambda: Snapshot.restore(game, blob)
+
+
+if Lockstep:
+    # a hand at a thousand six handed tables, ops/sec is thousands of hands a second
+    @case("Lockstep.playHand")
+    def lockstepCase(rng):
+        tables = Lockstep.LockstepTables(1000, 6, 2, seed=rng.randrange(1 << 32))
+        policy = Lockstep.CallingPolicy()
+
+        def playHand():
+            tables.money[:] = 100
+            tables.left[:] = False
+            return tables.playHand(policy)
+
+        return playHand
+
+
+# plays its script in order, falling back to check or call when the scripted choice isn't valid
+class ScriptedAgent:
+    def __init__(self, script):
+        self.script = itertools.cycle(script)
+
+    def act(self, view):
+        choice = next(self.script)
+        valid = view["validChoices"]
+        if choice == "raise" and "raise" in valid and view["minAmount"] <= view["maxAmount"]:
+            return choice, view["minAmount"]
+        if choice in valid and choice != "raise" and choice != "bet":
+            return choice
+
+        return "check" if "check" in valid else "call"
+
+
+# a preflop round at a full table from a fresh deal
+@case("Poker.bettingRound")
+def bettingRoundCase(rng):
+    scripts = [["call", "raise", "call", "fold"], ["raise", "call"], ["call"], ["fold", "call"], ["call", "call", "raise"], ["call"]]
+    agents = {f"p{i}": ScriptedAgent(script) for i, script in enumerate(scripts)}
+    game = HeadlessPoker(agents, 2, money=1000, rng=random.Random(rng.random()))
+
+    def bettingRound():
+        for player in game.players:
+            player.money = 1000
+
+        game.deal()
+        seats = game.activePlayers
+        game.postBlind(seats.players[1], game.minBet)
+        game.postBlind(seats.players[0], game.minBet // 2)
+        game.bettingRound(seats.nextActive(1), game.minBet)
+
+    return bettingRound
+
+
+# the cheapest a back to back pair of clock reads gets, taken off every single call timing
+def clockOverhead(clock=time.perf_counter_ns):
+    overhead = None
+    for _ in range(1000):
+        start = clock()
+        elapsed = clock() - start
+        if overhead is None or elapsed < overhead:
+            overhead = elapsed
+    return overhead
+
+
+# times single calls until there are LATENCY_SAMPLES of them or LATENCY_NS has gone (but at least minimum)
+def latencies(operation, minimum, clock=time.perf_counter_ns):
+    overhead = clockOverhead(clock)
+    samples = []
+    deadline = clock() + LATENCY_NS
+    while len(samples) < LATENCY_SAMPLES and (len(samples) < minimum or clock() < deadline):
+        start = clock()
+        operation()
+        samples.append(max(clock() - start - overhead, 0))
+    return samples
+
+
+# the number of calls per sample is picked so each sample takes about SAMPLE_NS
+def measure(operation, repeat=REPEAT):
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= SAMPLE_NS // 10:
+            break
+        number *= 10
+    number = max(1, number * SAMPLE_NS // max(elapsed, 1))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter_ns() - start) / number)
+
+    single = latencies(operation, repeat)
+    percentiles = statistics.quantiles(single, n=100, method="inclusive")
+    return {
+        "opsPerSec": 1e9 / statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p50": statistics.median(single),
+        "p90": percentiles[89],
+        "p99": percentiles[98],
+        "number": number,
+        "repeat": repeat,
+        "latencySamples": len(single),
+    }
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# names filters the cases by substring
+def run(names=None, repeat=REPEAT, seed=SEED):
+    results = {}
+    for name, setup in CASES.items():
+        if names and not any(part in name for part in names):
+            continue
+
+        results[name] = measure(setup(random.Random(seed)), repeat)
+
+    return {
+        "meta": {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+# returns (name, old ops/sec, new ops/sec, change, regressed) for every case in both results
+def compare(old, new, threshold=THRESHOLD):
+    rows = []
+    for name, result in new["results"].items():
+        if name in old["results"]:
+            before = old["results"][name]["opsPerSec"]
+            after = result["opsPerSec"]
+            change = after / before - 1
+            rows.append((name, before, after, change, change < -threshold))
+
+    return rows
+
+
+def printResults(results):
+    print(f"{'case':<28}{'ops/sec':>14}{'p50 ns':>12}{'p90 ns':>12}{'p99 ns':>12}")
+    for name, result in results["results"].items():
+        print(
+            f"{name:<28}{result['opsPerSec']:>14,.0f}{result['p50']:>12,.0f}"
+            f"{result['p90']:>12,.0f}{result['p99']:>12,.0f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text Poker benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runParser = commands.add_parser("run", help="run the benchmarks")
+    runParser.add_argument("cases", nargs="*", help="only run cases containing one of these")
+    runParser.add_argument("--output", help="write the results to this JSON file")
+    runParser.add_argument("--repeat", type=int, default=REPEAT)
+    runParser.add_argument("--seed", type=int, default=SEED)
+
+    compareParser = commands.add_parser("compare", help="flag regressions between two results files")
+    compareParser.add_argument("old")
+    compareParser.add_argument("new")
+    compareParser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, 0.1 is 10%%")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.cases, args.repeat, args.seed)
+        printResults(results)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    with open(args.old) as file:
+        old = json.load(file)
+    with open(args.new) as file:
+        new = json.load(file)
+
+    regressions = 0
+    for name, before, after, change, regressed in compare(old, new, args.threshold):
+        regressions += regressed
+        print(f"{name:<28}{before:>14,.0f}{after:>14,.0f}{change:>+9.1%}{'  REGRESSION' if regressed else ''}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
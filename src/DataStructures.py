@@ -128,7 +128,7 @@ class CircularLinkedList:
             current = start
 
         if not end:
-            end = start
+            end = current
 
         while True:
 
@@ -165,6 +165,8 @@ class CircularLinkedList:
         while current != self.head:
             if key(current.data) == target:
                 prev.next = current.next
+                if current == self.tail:
+                    self.tail = prev
                 self.length -= 1
                 return True
 
@@ -176,3 +178,72 @@ class CircularLinkedList:
 
     def __repr__(self):
         return ", ".join(self.getList())
+
+
+# Fixed seats with a bit per seat for players still in the hand, folded and all in
+# seat order never changes during a hand so folding and finding the next seat are bit operations
+class SeatRing:
+    def __init__(self, players):
+        self.players = list(players)
+        self.size = len(self.players)
+        self.seatOf = {player: seat for seat, player in enumerate(self.players)}
+        self.active = (1 << self.size) - 1
+        self.folded = 0
+        self.allIn = 0
+        self.length = self.size
+        self.canAct = self.size
+
+    # next seat after seat (not seat itself unless it is the only one) whose bit is set in mask, or None
+    def nextSeat(self, seat, mask):
+        higher = mask >> (seat + 1) << (seat + 1)
+        if higher:
+            return (higher & -higher).bit_length() - 1
+        if mask:
+            return (mask & -mask).bit_length() - 1
+        return None
+
+    def nextActive(self, seat):
+        return self.nextSeat(seat, self.active)
+
+    # next player still in the hand who isn't all in
+    def nextToAct(self, seat):
+        return self.nextSeat(seat, self.active & ~self.allIn)
+
+    def first(self):
+        return self.nextSeat(self.size - 1, self.active)
+
+    def fold(self, seat):
+        bit = 1 << seat
+        if self.active & bit:
+            self.active &= ~bit
+            self.folded |= bit
+            self.length -= 1
+            if not self.allIn & bit:
+                self.canAct -= 1
+
+    def setAllIn(self, seat):
+        bit = 1 << seat
+        if not self.allIn & bit:
+            self.allIn |= bit
+            if self.active & bit:
+                self.canAct -= 1
+
+    # copies a player's folded and all in flags into the masks after they act
+    def update(self, seat):
+        player = self.players[seat]
+        if player.isAllIn:
+            self.setAllIn(seat)
+        if player.folded or player.currentBet == -1:
+            self.fold(seat)
+
+    def isActive(self, seat):
+        return bool(self.active >> seat & 1)
+
+    def getList(self):
+        return [player for seat, player in enumerate(self.players) if self.active >> seat & 1]
+
+    def getSet(self):
+        return set(self.getList())
+
+    def __repr__(self):
+        return ", ".join([str(player) for player in self.getList()])
@@ -0,0 +1,100 @@
+import errno, os
+
+# Private delivery of hole cards, each backend gets every player's hole cards once per hand
+# backends have clear() for the start of a game, deliver({name: cards}) and remove(name)
+# card ids are turned into text with formatCard (Card.toString for the game)
+
+
+def formatHand(cards, formatCard):
+    return "".join([formatCard(card) + "\n" for card in cards])
+
+
+def clearDirectory(directory):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+        return
+
+    for entry in os.scandir(directory):
+        os.remove(entry.path)
+
+
+# one text file per player, written to a temp file and renamed over the old one so it is never half written
+class FileDelivery:
+    def __init__(self, directory, formatCard=str, extension=".txt"):
+        self.directory = directory
+        self.formatCard = formatCard
+        self.extension = extension
+
+    def path(self, name):
+        return os.path.join(self.directory, name + self.extension)
+
+    def clear(self):
+        clearDirectory(self.directory)
+
+    def deliver(self, hands):
+        for name, cards in hands.items():
+            path = self.path(name)
+            temp = os.path.join(self.directory, f".{name}.tmp")
+            with open(temp, "w") as file:
+                file.write(formatHand(cards, self.formatCard))
+            os.replace(temp, path)
+
+    def remove(self, name):
+        os.remove(self.path(name))
+
+
+# one named pipe per player, a player reads theirs with something like `cat Player_Hands/name.pipe`
+# a hand is a single write under PIPE_BUF so readers get all of it or none of it
+# hands for a player with no reader (or a full pipe) are dropped rather than blocking the table
+class PipeDelivery:
+    def __init__(self, directory, formatCard=str):
+        if not hasattr(os, "mkfifo"):
+            raise ValueError("Named pipes aren't supported on this platform")
+
+        self.directory = directory
+        self.formatCard = formatCard
+
+    def path(self, name):
+        return os.path.join(self.directory, name + ".pipe")
+
+    def clear(self):
+        clearDirectory(self.directory)
+
+    def deliver(self, hands):
+        for name, cards in hands.items():
+            path = self.path(name)
+            if not os.path.exists(path):
+                os.mkfifo(path, 0o600)
+
+            try:
+                pipe = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno == errno.ENXIO:
+                    continue
+                raise
+
+            try:
+                os.write(pipe, formatHand(cards, self.formatCard).encode())
+            except BlockingIOError:
+                pass
+            finally:
+                os.close(pipe)
+
+    def remove(self, name):
+        os.remove(self.path(name))
+
+
+# keeps the latest hole cards by name, nothing touches the disk
+class MemoryDelivery:
+    def __init__(self):
+        self.hands = {}
+
+    def clear(self):
+        self.hands.clear()
+
+    def deliver(self, hands):
+        for name, cards in hands.items():
+            self.hands[name] = list(cards)
+
+    def remove(self, name):
+        self.hands.pop(name, None)
@@ -0,0 +1,267 @@
+import functools, itertools, os, random, time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+import HandEvaluator
+from Game import Card, Deck
+
+# Monte Carlo and exact equity for known hole cards, all cards are ids (see Card.fromInt)
+# results are a list with a (win, tie, loss) probability tuple per seat
+
+MIN_SEATS = 2
+MAX_SEATS = 6
+
+# relabelling suits doesn't change anyone's equity, so exact results are cached by the smallest relabelling
+SUIT_PERMUTATIONS = list(itertools.permutations(range(len(Card.SUITS))))
+EXACT_CACHE_SIZE = 4096
+
+
+def validateCards(holeCards, board, deadCards):
+    if not MIN_SEATS <= len(holeCards) <= MAX_SEATS:
+        raise ValueError(f"Equity needs between {MIN_SEATS} and {MAX_SEATS} seats")
+
+    if any(len(hole) != 2 for hole in holeCards):
+        raise ValueError("Every seat needs exactly 2 hole cards")
+
+    if len(board) > 5:
+        raise ValueError("The board cannot have more than 5 cards")
+
+    known = list(itertools.chain(*holeCards, board, deadCards))
+    if any(not 0 <= card < len(Card.CARDS) for card in known):
+        raise ValueError(f"Cards are ids from 0 to {len(Card.CARDS) - 1}")
+
+    if len(set(known)) != len(known):
+        raise ValueError("A card can only be used once")
+
+    return known
+
+
+# a tally is [wins, ties, equity sums, squared equity sums, samples] with one entry per seat in each list
+def newTally(seats):
+    return [[0] * seats, [0] * seats, [0.0] * seats, [0.0] * seats, 0]
+
+
+def mergeTally(tally, other):
+    for i in range(4):
+        tally[i] = [a + b for a, b in zip(tally[i], other[i])]
+    tally[4] += other[4]
+
+    return tally
+
+
+def recordShowdown(tally, strengths):
+    wins, ties, equity, squares, _ = tally
+    best = min(strengths)
+    winners = [seat for seat, strength in enumerate(strengths) if strength == best]
+
+    if len(winners) == 1:
+        seat = winners[0]
+        wins[seat] += 1
+        equity[seat] += 1
+        squares[seat] += 1
+
+    else:
+        share = 1 / len(winners)
+        for seat in winners:
+            ties[seat] += 1
+            equity[seat] += share
+            squares[seat] += share * share
+
+    tally[4] += 1
+
+
+# runs in the worker processes so must stay a top level function
+def simulate(holeCards, board, deadCards, iterations, seed):
+    deck = Deck(1, random.Random(seed))
+    deck.removeCards(list(itertools.chain(*holeCards, board, deadCards)))
+    start = deck.position
+
+    holeCards = [list(hole) for hole in holeCards]
+    board = list(board)
+    missing = 5 - len(board)
+    tally = newTally(len(holeCards))
+    evaluate = HandEvaluator.evaluate
+
+    for _ in range(iterations):
+        deck.reset(start)
+        runout = board + deck.dealCards(missing)
+        recordShowdown(tally, [evaluate(hole + runout) for hole in holeCards])
+
+    return tally
+
+
+def probabilities(tally):
+    wins, ties, _, _, samples = tally
+    return [
+        (win / samples, tie / samples, (samples - win - tie) / samples)
+        for win, tie in zip(wins, ties)
+    ]
+
+
+# widest confidence interval half width of any seat's equity
+def halfWidth(tally, confidence):
+    _, _, equity, squares, samples = tally
+    if samples < 2:
+        return float("inf")
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    widest = 0
+    for total, square in zip(equity, squares):
+        mean = total / samples
+        variance = max(square / samples - mean * mean, 0) * samples / (samples - 1)
+        widest = max(widest, z * (variance / samples) ** 0.5)
+
+    return widest
+
+
+def splitIterations(iterations, parts):
+    size, extra = divmod(iterations, parts)
+    return [size + (1 if i < extra else 0) for i in range(parts) if size or i < extra]
+
+
+def calculateEquity(holeCards, board=(), deadCards=(), iterations=100000, workers=None, seed=None):
+    validateCards(holeCards, board, deadCards)
+    if iterations <= 0:
+        raise ValueError("Equity needs at least one iteration")
+
+    workers = workers or os.cpu_count() or 1
+    seeder = random.Random(seed)
+    chunks = splitIterations(iterations, workers)
+
+    if len(chunks) == 1:
+        return probabilities(simulate(holeCards, board, deadCards, iterations, seeder.getrandbits(64)))
+
+    tally = newTally(len(holeCards))
+    with ProcessPoolExecutor(len(chunks)) as pool:
+        futures = [
+            pool.submit(simulate, holeCards, board, deadCards, chunk, seeder.getrandbits(64))
+            for chunk in chunks
+        ]
+        for future in futures:
+            mergeTally(tally, future.result())
+
+    return probabilities(tally)
+
+
+# keeps sampling in batches until every seat's equity is within margin at the given confidence
+# or the time budget (seconds) runs out, returns (probabilities, samples, half width)
+def adaptiveEquity(
+    holeCards,
+    board=(),
+    deadCards=(),
+    margin=0.005,
+    confidence=0.95,
+    timeBudget=None,
+    batchSize=5000,
+    maxIterations=10000000,
+    workers=None,
+    seed=None,
+):
+    validateCards(holeCards, board, deadCards)
+    if batchSize <= 0:
+        raise ValueError("Batches need at least one iteration")
+
+    workers = workers or os.cpu_count() or 1
+    seeder = random.Random(seed)
+    deadline = time.monotonic() + timeBudget if timeBudget else None
+    tally = newTally(len(holeCards))
+
+    finished = lambda: (
+        halfWidth(tally, confidence) <= margin
+        or tally[4] >= maxIterations
+        or (deadline and time.monotonic() >= deadline)
+    )
+
+    pool = ProcessPoolExecutor(workers)
+    submit = lambda: pool.submit(
+        simulate, holeCards, board, deadCards, batchSize, seeder.getrandbits(64)
+    )
+
+    try:
+        pending = {submit() for _ in range(workers)}
+
+        while pending:
+            timeout = max(deadline - time.monotonic(), 0) if deadline else None
+            done, pending = wait(pending, timeout, FIRST_COMPLETED)
+            for future in done:
+                mergeTally(tally, future.result())
+
+            if finished():
+                break
+
+            pending |= {submit() for _ in done}
+
+    # batches still running are abandoned rather than waited on so the time budget holds
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if not tally[4]:
+        return None, 0, float("inf")
+
+    return probabilities(tally), tally[4], halfWidth(tally, confidence)
+
+
+def canonicalSituation(holeCards, board, deadCards):
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        relabel = lambda cards: tuple(sorted(card >> 2 << 2 | permutation[card & 3] for card in cards))
+        situation = (tuple(relabel(hole) for hole in holeCards), relabel(board), relabel(deadCards))
+        if best is None or situation < best:
+            best = situation
+
+    return best
+
+
+@functools.lru_cache(maxsize=EXACT_CACHE_SIZE)
+def enumerateSituation(holeCards, board, deadCards):
+    known = set(itertools.chain(*holeCards, board, deadCards))
+    remaining = [card.id for card in Card.CARDS if card.id not in known]
+    holeCards = [list(hole) for hole in holeCards]
+    board = list(board)
+    tally = newTally(len(holeCards))
+    evaluate = HandEvaluator.evaluate
+
+    for runout in itertools.combinations(remaining, 5 - len(board)):
+        runout = board + list(runout)
+        recordShowdown(tally, [evaluate(hole + runout) for hole in holeCards])
+
+    return tuple(probabilities(tally))
+
+
+# enumerates every remaining board, a few milliseconds from the flop onwards but slow preflop
+def exactEquity(holeCards, board=(), deadCards=()):
+    validateCards(holeCards, board, deadCards)
+    return list(enumerateSituation(*canonicalSituation(holeCards, board, deadCards)))
+
+
+# equity of one hand against opponents dealt random cards from a shoe of numberOfDecks decks
+# checks cancel (anything with is_set, like a threading.Event) between batches and stops early once it is set
+# returns (equity, samples) over the trials that were run, equity is None if none were
+def randomOpponentEquity(hole, board=(), opponents=1, iterations=20000, numberOfDecks=1, seed=None, cancel=None, batchSize=500):
+    if not 1 <= opponents < MAX_SEATS:
+        raise ValueError(f"Equity needs between 1 and {MAX_SEATS - 1} opponents")
+
+    if len(hole) != 2 or len(board) > 5:
+        raise ValueError("A hand needs 2 hole cards and at most 5 board cards")
+
+    deck = Deck(numberOfDecks, random.Random(seed))
+    deck.removeCards(list(hole) + list(board))
+    start = deck.position
+
+    hole = list(hole)
+    board = list(board)
+    missing = 5 - len(board)
+    tally = newTally(opponents + 1)
+    evaluate = HandEvaluator.evaluate
+
+    while tally[4] < iterations and not (cancel and cancel.is_set()):
+        for _ in range(min(batchSize, iterations - tally[4])):
+            deck.reset(start)
+            runout = board + deck.dealCards(missing)
+            strengths = [evaluate(hole + runout)]
+            strengths.extend([evaluate(deck.dealCards(2) + runout) for _ in range(opponents)])
+            recordShowdown(tally, strengths)
+
+    if not tally[4]:
+        return None, 0
+
+    return tally[2][0] / tally[4], tally[4]
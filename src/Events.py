@@ -0,0 +1,174 @@
+import json, queue, threading
+
+# Engine events for observers: Poker emits one at each step of a hand when it was given an EventBus
+# a bus nobody subscribes to is falsy, so the engine skips building events at the cost of one check per spot
+# handlers are called on the engine thread, background ones get the events through a bounded queue
+# and run on their own thread so slow logging or analytics don't hold the game up
+# events only hold names, numbers and card ids (never players) so handlers on other threads can keep them
+#
+# kind          data
+# hand_start    players [(name, money)] in seat order before blinds, button, smallBlind, bigBlind, minBet
+# deal          hole {name: cards}
+# action        name, phase, action (the Game.CHOICES name chosen, or "blind"), chips, stake, bet (after acting)
+# street        phase, cards (just dealt), board
+# pot           number, total, players [names who can win it], sent as each pot with chips in it is paid out,
+#               numbered like payout's pot (everything goes as pot 0 when the hand ends without a showdown)
+# showdown      hands {name: (hole, strength, category)}
+# payout        name, amount, pot (pot number)
+# elimination   name, quit (False when the player ran out of chips)
+# hand_end      stacks {name: money}
+
+HAND_START = "hand_start"
+DEAL = "deal"
+ACTION = "action"
+STREET = "street"
+POT = "pot"
+SHOWDOWN = "showdown"
+PAYOUT = "payout"
+ELIMINATION = "elimination"
+HAND_END = "hand_end"
+KINDS = (HAND_START, DEAL, ACTION, STREET, POT, SHOWDOWN, PAYOUT, ELIMINATION, HAND_END)
+
+QUEUE_SIZE = 256
+BATCH_SIZE = 64
+
+
+class Event:
+    __slots__ = ("kind", "hand", "data")
+
+    # hand is the table's hand number (Poker.handsDealt)
+    def __init__(self, kind, hand, data):
+        self.kind = kind
+        self.hand = hand
+        self.data = data
+
+    def __repr__(self):
+        return f"Event({self.kind}, {self.hand}, {self.data})"
+
+
+# runs a handler on its own thread, events are passed over in batches through a queue of queueSize batches
+# a batch goes when it has batchSize events or the hand ends, so handlers lag the table by at most a hand
+# when the queue is full emit waits for room, or with block=False the batch is dropped and its events counted
+class BackgroundSubscriber:
+    def __init__(self, handler, queueSize=QUEUE_SIZE, block=True, batchSize=BATCH_SIZE):
+        self.handler = handler
+        self.block = block
+        self.batchSize = batchSize
+        self.batch = []
+        self.queue = queue.Queue(queueSize)
+        self.dropped = 0
+        # handler exceptions are counted and the last one kept, the thread carries on
+        self.errors = 0
+        self.lastError = None
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def __call__(self, event):
+        self.batch.append(event)
+        if len(self.batch) >= self.batchSize:
+            self.send()
+
+    def send(self):
+        batch = self.batch
+        if not batch:
+            return
+
+        self.batch = []
+        if self.block:
+            self.queue.put(batch)
+            return
+
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += len(batch)
+
+    def work(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+
+            for event in batch:
+                try:
+                    self.handler(event)
+                except Exception as e:
+                    self.errors += 1
+                    self.lastError = e
+
+    # handles everything emitted so far then stops the thread
+    def close(self):
+        self.send()
+        self.queue.put(None)
+        self.thread.join()
+
+
+class EventBus:
+    def __init__(self):
+        # kind -> handlers
+        self.handlers = {kind: [] for kind in KINDS}
+        self.background = []
+        self.subscribed = 0
+
+    def __bool__(self):
+        return self.subscribed > 0
+
+    # kinds defaults to every kind, returns what was subscribed (the BackgroundSubscriber in background mode)
+    # so it can be passed to unsubscribe
+    def subscribe(self, handler, kinds=None, background=False, queueSize=QUEUE_SIZE, block=True, batchSize=BATCH_SIZE):
+        kinds = KINDS if kinds is None else kinds
+        for kind in kinds:
+            if kind not in self.handlers:
+                raise ValueError(f"{kind!r} isn't an event kind")
+
+        if background:
+            handler = BackgroundSubscriber(handler, queueSize, block, batchSize)
+            self.background.append(handler)
+
+        for kind in kinds:
+            self.handlers[kind].append(handler)
+        self.subscribed += 1
+
+        return handler
+
+    def unsubscribe(self, handler):
+        found = False
+        for handlers in self.handlers.values():
+            if handler in handlers:
+                handlers.remove(handler)
+                found = True
+        if not found:
+            raise ValueError(f"{handler!r} isn't subscribed")
+        self.subscribed -= 1
+
+        if handler in self.background:
+            self.background.remove(handler)
+            handler.close()
+
+    def emit(self, kind, hand, **data):
+        handlers = self.handlers[kind]
+        if handlers:
+            event = Event(kind, hand, data)
+            for handler in handlers:
+                handler(event)
+
+        if kind == HAND_END:
+            for subscriber in self.background:
+                subscriber.send()
+
+    # waits for background subscribers to handle everything emitted so far and unsubscribes them
+    def close(self):
+        for subscriber in list(self.background):
+            self.unsubscribe(subscriber)
+
+
+# an observer writing one JSON object per event, run it in the background to keep file writes off the engine
+class JsonLinesLog:
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def __call__(self, event):
+        self.file.write(json.dumps({"kind": event.kind, "hand": event.hand, **event.data}) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -1,30 +1,61 @@
-import itertools, random, time, os
-import StringFormatting
-from DataStructures import Queue, CircularLinkedList
+import itertools, operator, random, sys, time, os
+import StringFormatting, HandEvaluator, HandHistory, Delivery, Events
+from Tracing import NULL_SPAN
+from DataStructures import Queue, SeatRing
 
 CURRENT_DIR = os.getcwd()
 PLAYER_DIR = os.path.join(CURRENT_DIR, "Player_Hands")
 
 
+# cards are passed around as ints (see HandEvaluator), Card holds the 52 interned objects for display
 class Card:
+    __slots__ = ("rank", "suit", "value", "id")
 
     RANK = {"2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King", "Ace"}
     ROYALS = {"Jack": 11, "Queen": 12, "King": 13, "Ace": 14}
     SUITS = {"Diamonds", "Spades", "Hearts", "Clubs"}
+    RANK_ORDER = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King", "Ace")
+    SUIT_ORDER = ("Clubs", "Diamonds", "Hearts", "Spades")
+    SUIT_INDEX = {"Clubs": 0, "Diamonds": 1, "Hearts": 2, "Spades": 3}
 
-    def __init__(self, rank, suit):
-        if rank in Card.RANK and suit in Card.SUITS:
-            self.rank = rank
-            self.suit = suit
-            self.value = self.findValue()
-        else:
-            return
+    # filled in below the class, indexed by card id and by (rank, suit)
+    CARDS = []
+    BY_NAME = {}
+    BY_STRING = {}
 
-    def findValue(self):
+    def __new__(cls, rank, suit):
         try:
-            return int(self.rank)
-        except ValueError:
-            return Card.ROYALS[self.rank]
+            return Card.BY_NAME[(rank, suit)]
+        except KeyError:
+            raise ValueError(f"{rank} of {suit} is not a card")
+
+    @classmethod
+    def _intern(cls, rank, suit):
+        card = object.__new__(cls)
+        object.__setattr__(card, "rank", rank)
+        object.__setattr__(card, "suit", suit)
+        object.__setattr__(card, "value", Card.RANK_ORDER.index(rank) + 2)
+        object.__setattr__(card, "id", HandEvaluator.cardId(card.value - 2, Card.SUIT_INDEX[suit]))
+        return card
+
+    @staticmethod
+    def fromInt(cardId):
+        return Card.CARDS[cardId]
+
+    @staticmethod
+    def fromString(string):
+        return Card.BY_STRING[string]
+
+    @staticmethod
+    def toString(cardId):
+        return str(Card.CARDS[cardId])
+
+    @staticmethod
+    def valueOf(cardId):
+        return (cardId >> 2) + 2
+
+    def findValue(self):
+        return self.value
 
     def getValue(self):
         return self.value
@@ -35,39 +66,90 @@ class Card:
     def getSuit(self):
         return self.suit
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards are immutable")
+
+    def __reduce__(self):
+        return Card.fromInt, (self.id,)
+
+    def __int__(self):
+        return self.id
+
     def __repr__(self):
         return f"{self.rank} of {self.suit}"
 
     def __str__(self):
         return f"{self.rank} of {self.suit}"
 
-    def __eq__(self, other):
-        return isinstance(other, Card) and (
-            self.rank == other.rank and self.suit == other.suit
-        )
-
+    # cards are interned so the default identity equality is correct
     def __hash__(self):
-        return hash((self.rank, self.suit))
+        return self.id
+
 
+for suit in Card.SUIT_ORDER:
+    for rank in Card.RANK_ORDER:
+        card = Card._intern(rank, suit)
+        Card.BY_NAME[(rank, suit)] = card
+        Card.BY_STRING[str(card)] = card
+Card.CARDS.extend(sorted(Card.BY_NAME.values(), key=lambda card: card.id))
 
+
+# cards[:position] have been dealt, the rest are still in the deck
+# dealing is a partial Fisher-Yates shuffle so only dealt cards are ever randomised
 class Deck:
-    def __init__(self, numberOfDecks):
-        deck = itertools.product(Card.RANK, Card.SUITS)
+    def __init__(self, numberOfDecks, rng=None):
         self.cards = [
-            Card(rank, suit) for (rank, suit) in deck for _ in range(numberOfDecks)
+            card.id for card in Card.CARDS for _ in range(numberOfDecks)
         ]
-
-    def shuffle(self):
-        random.shuffle(self.cards)
+        self.position = 0
+        # anything with randrange, defaults to the random module
+        self.rng = rng if rng else random
+
+    # any undealt order is as good as a shuffled one, so shuffling just collects the dealt cards
+    # a new rng also puts the cards back in order so what it deals depends on nothing else (see Streams)
+    def shuffle(self, rng=None):
+        if rng:
+            self.rng = rng
+            self.cards.sort()
+        self.position = 0
+
+    # position can be kept from an earlier deal to return only the cards dealt since then
+    def reset(self, position=0):
+        self.position = position
+
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    # moves known or dead cards into the dealt part of the deck so they can't be dealt
+    def removeCards(self, cardList):
+        cards = self.cards
+        for card in cardList:
+            i = cards.index(card, self.position)
+            cards[i], cards[self.position] = cards[self.position], cards[i]
+            self.position += 1
 
     def dealCard(self):
-        return self.cards.pop(0)
+        cards = self.cards
+        i = self.position
+        j = self.rng.randrange(i, len(cards))
+        cards[i], cards[j] = cards[j], cards[i]
+        self.position = i + 1
 
-    def addCard(self, card):
-        self.cards.append(card)
+        return cards[i]
 
-    def addCards(self, cardList):
-        self.cards.extend(cardList)
+    def dealCards(self, amount):
+        return [self.dealCard() for _ in range(amount)]
+
+
+# a bit per choice in legal action masks, in this order
+CHOICES = ("check", "call", "bet", "raise", "all in", "fold", "quit")
+CHECK, CALL, BET, RAISE, ALL_IN, FOLD, QUIT = range(len(CHOICES))
+CHOICE_CODES = {choice: code for code, choice in enumerate(CHOICES)}
+# the names in every mask, so a mask never has to be turned into a new set
+MASK_CHOICES = [
+    frozenset([choice for code, choice in enumerate(CHOICES) if mask >> code & 1]) for mask in range(1 << len(CHOICES))
+]
+ALWAYS_LEGAL = 1 << ALL_IN | 1 << FOLD | 1 << QUIT
 
 
 class Player:
@@ -83,6 +165,13 @@ class Player:
         self.hand = []
         self.kickers = []
         self.handRank = 0
+        self.handStrength = 0
+        # hole and community cards evaluated so far, updated as each street is dealt
+        self.handState = HandEvaluator.HandState()
+        # the table's Hud.EquityHud if it has one, it reads the prompts so its results can show while the player answers
+        self.hud = None
+        # the CHOICES name of the player's last turn, what the hand history and ACTION events record
+        self.lastAction = None
 
     def getCardHand(self, index):
         return self.hand[index]
@@ -93,6 +182,7 @@ class Player:
     def addCard(self, card):
         self.hole.append(card)
         self.hand.append(card)
+        self.handState.add(card)
 
     def addToHand(self, cards):
         self.hand.extend(cards)
@@ -110,6 +200,8 @@ class Player:
         self.hand = []
         self.kickers = []
         self.handRank = 0
+        self.handStrength = 0
+        self.handState = HandEvaluator.HandState()
 
     def call(self, stake):
         total = stake - self.currentBet
@@ -146,24 +238,93 @@ class Player:
     def fold(self):
         self.folded = True
 
+    # returns (mask, minAmount, maxAmount): a bit per CHOICES index that can be chosen and the range of amounts
+    # a raise (raise to) or a bet (chips bet) can take, minAmount > maxAmount when neither is possible
+    # a raise or bet can be offered that the player can't reach the minimum of, like getValidChoices
+    def legalActions(self, stake, lastRaise, minBet):
+        money = self.money
+        currentBet = self.currentBet
+        if money + currentBet <= stake:
+            return ALWAYS_LEGAL, 1, 0
+
+        raiseBy = 2 * lastRaise
+        canRaise = money > (minBet if minBet > raiseBy else raiseBy)
+        # checkRaiseBet's minimum, a raise also has to take the bet above the stake
+        low = stake + raiseBy
+        if low < minBet:
+            low = minBet
+
+        if currentBet < stake:
+            if canRaise:
+                return ALWAYS_LEGAL | 1 << CALL | 1 << RAISE, low + 1 if low == stake else low, currentBet + money
+            return ALWAYS_LEGAL | 1 << CALL, 1, 0
+
+        if canRaise:
+            return ALWAYS_LEGAL | 1 << CHECK | 1 << BET, low, money
+        return ALWAYS_LEGAL | 1 << CHECK, 1, 0
+
+    # takes a CHOICES index without prompting, same return values as playTurn, raises ValueError if it isn't legal
+    # legal is legalActions' result if it has already been worked out for this turn
+    def apply(self, action, amount, stake, lastRaise, minBet, legal=None):
+        mask, low, high = legal if legal else self.legalActions(stake, lastRaise, minBet)
+        if not mask >> action & 1:
+            raise ValueError(f"{self.name} chose {CHOICES[action]!r} which isn't one of {', '.join(MASK_CHOICES[mask])}")
+
+        self.lastAction = CHOICES[action]
+        if action == CALL:
+            return self.call(stake), lastRaise
+
+        if action == CHECK:
+            return 0, lastRaise
+
+        if action == RAISE or action == BET:
+            choice = CHOICES[action]
+            # anything integer like will do, e.g. NumPy ints from vectorised agents, but chips stay Python ints
+            try:
+                amount = operator.index(amount)
+            except TypeError:
+                raise ValueError(f"{self.name} must give a whole number of chips to {choice}")
+            if amount < low:
+                raise ValueError(
+                    self.checkRaiseBet(amount, minBet, lastRaise, stake, action == RAISE)
+                    or f"{self.name} must {choice} at least {low}"
+                )
+            if amount > high:
+                raise ValueError(f"{self.name} doesn't have enough money to {choice} {amount}")
+
+            total = amount - self.currentBet if action == RAISE else amount
+            return total, self.raiseOrBet(total) - stake
+
+        if action == ALL_IN:
+            return self.allIn(), lastRaise
+
+        if action == FOLD:
+            self.fold()
+            return 0, lastRaise
+
+        self.currentBet = -1
+        return -1, lastRaise
+
     def getValidChoices(self, stake, lastRaise, minBet):
-        choices = set()
-        if self.money - (stake - self.currentBet) > 0:
-            if self.currentBet < stake:
-                choices.add("call")
-                if self.money - max(minBet, ((2 * lastRaise))) > 0:
-                    choices.add("raise")
+        return set(MASK_CHOICES[self.legalActions(stake, lastRaise, minBet)[0]])
 
-            else:
-                choices.add("check")
-                if self.money - max(minBet, (2 * lastRaise)) > 0:
-                    choices.add("bet")
+    # returns why a raise to (or bet of) amount is not allowed, or None if it is
+    def checkRaiseBet(self, amount, minBet, lastRaise, stake, raising=True):
+        stringRaiseOrBet = "raise" if raising else "bet"
+
+        if amount < 0:
+            return f"You cannot {stringRaiseOrBet} a negative amount!"
 
-        choices.add("all in")
-        choices.add("fold")
-        choices.add("quit")
+        elif amount < stake + (2 * lastRaise):
+            return f"You must raise by a minimum of double the last raise or bet (min {2 * lastRaise} chips) which takes the bet to {stake + (2 * lastRaise)} chips"
 
-        return choices
+        elif amount < minBet:
+            return f"You cannot {stringRaiseOrBet} less than the minimum bet which is {minBet} chips"
+
+        elif raising and amount == stake:
+            return f"You must raise by at least {max(minBet, (2 * lastRaise))} which takes the bet to {stake + max(minBet, (2 * lastRaise))} chips"
+
+        return None
 
     def validateRaiseBet(self, minBet, lastRaise, stake, raising=True):
         raisedBet = None
@@ -179,30 +340,16 @@ class Player:
         while not raisedBet:
             if raising:
                 print("enter the amount you would like to raise to")
-            amount = input(f"how much would you like to {stringRaiseOrBet} ").strip()
+            amount = self.prompt(f"how much would you like to {stringRaiseOrBet} ").strip()
 
             if amount == "back":
                 break
             try:
                 amount = int(amount)
-                if amount < 0:
-                    print(f"You cannot {stringRaiseOrBet} a negative amount!")
-                    continue
-
-                elif amount < stake + (2 * lastRaise):
-                    print(
-                        f"You must raise by a minimum of double the last raise or bet (min {2 * lastRaise} chips) which takes the bet to {stake + (2 * lastRaise)} chips"
-                    )
-
-                elif amount < minBet:
-                    print(
-                        f"You cannot {stringRaiseOrBet} less than the minimum bet which is {minBet} chips"
-                    )
+                error = self.checkRaiseBet(amount, minBet, lastRaise, stake, raising)
 
-                elif raising and amount == stake:
-                    print(
-                        f"You must raise by at least {max(minBet, (2 * lastRaise))} which takes the bet to {stake + max(minBet, (2 * lastRaise))} chips"
-                    )
+                if error:
+                    print(error)
 
                 else:
                     if raising:
@@ -223,6 +370,11 @@ class Player:
 
         return raisedBet, increase
 
+    def prompt(self, message):
+        if self.hud:
+            return self.hud.prompt(message)
+        return input(message)
+
     def playTurn(self, stake, lastRaise, minBet):
         valid = self.getValidChoices(stake, lastRaise, minBet)
         played = False
@@ -235,7 +387,7 @@ class Player:
         while not played:
             StringFormatting.printWithSeperators(infoString, "*")
             choice = (
-                input(f"{self.name} would you like to: {', '.join(valid)} ")
+                self.prompt(f"{self.name} would you like to: {', '.join(valid)} ")
                 .lower()
                 .strip()
             )
@@ -281,6 +433,7 @@ class Player:
                 print("I'm sorry, that choice wasn't on the list!", end="")
                 time.sleep(0.4)
 
+        self.lastAction = choice
         return total, lastRaise
 
     def __repr__(self):
@@ -316,6 +469,9 @@ class Pot:
 
 # class requires classes CircularLinkedList, StringFormatting, Player, Card and Deck
 class Poker:
+    # phase -> the betting round's span name
+    STREETS = {1: "preflop", 2: "flop", 3: "turn", 4: "river"}
+
     HAND_RANKS = {
         1: "Royal Flush",
         2: "Straight Flush",
@@ -329,15 +485,35 @@ class Poker:
         10: "High Card",
     }
 
-    def __init__(self, minBet=0, numberOfDecks=2, players=None):
+    def __init__(self, minBet=0, numberOfDecks=2, players=None, history=None, delivery=None, hud=None, metrics=None, tracer=None, streams=None, events=None):
         self.phase = 0
+        self.handsDealt = 0
         self.community = []
         self.activePlayers = None
+        # (seat, seatToStart, stake, startBet, lastRaise, start) of the betting round's current turn, None between turns
+        self.turn = None
         self.deck = Deck(
             numberOfDecks
         )  # Game deck normally consits of 2 standard Decks
         self.minBet = minBet
         self.pots = Queue()
+        # a StringFormatting.FrameRenderer, each screen update is written once when the game pauses or waits
+        # for input, headless games use a NullRenderer to skip rendering
+        self.formatting = StringFormatting.FrameRenderer()
+        # optional HandHistory.HandHistoryWriter that every hand is logged to
+        self.history = history
+        # where players privately see their hole cards, see Delivery
+        self.delivery = delivery if delivery else Delivery.FileDelivery(PLAYER_DIR, Card.toString)
+        # optional Hud.EquityHud shown on every turn
+        self.hud = hud
+        # optional Metrics.Metrics, every instrumented spot checks for it first
+        self.metrics = metrics
+        # optional Tracing.HandTracer, hands are traced as nested spans through span()
+        self.tracer = tracer
+        # optional Streams.DealStreams, each hand is dealt from its own stream so it can be replayed on its own
+        self.streams = streams
+        # optional Events.EventBus, observers get every step of a hand from it
+        self.events = events
 
         # Allows you to skip initiation
         if players:
@@ -349,16 +525,17 @@ class Poker:
 
     def addPlayer(self, player):
         self.players.append(player)
-        print(f"Hello {player.name}")
+        self.display(f"Hello {player.name}")
+        self.formatting.flush()
 
     def removePlayer(self, player):
         self.players.remove(player)
-        print(f"{player.name} is out!")
+        self.display(f"{player.name} is out!")
         try:
-            os.remove(os.path.join(PLAYER_DIR, player.name + ".txt"))
+            self.delivery.remove(player.name)
 
         except Exception as e:
-            print("couldn't delete player file: ", e)
+            self.display("couldn't delete player file: ", e)
 
     # get new is false when the function is used to ensure player numbers are valid
     def getNewPlayers(self, getNew=True):
@@ -443,15 +620,11 @@ class Poker:
                 print("I'm sorry, you didn't enter a number!")
 
         # clear all previous games files
-        if not os.path.isdir(PLAYER_DIR):
-            os.mkdir(PLAYER_DIR)
-        else:
-            try:
-                for f in os.listdir(PLAYER_DIR):
-                    os.remove(os.path.join(PLAYER_DIR, f))
+        try:
+            self.delivery.clear()
 
-            except Exception as e:
-                print("couldn't delete files because ", e)
+        except Exception as e:
+            print("couldn't delete files because ", e)
 
     def checkActivePlayers(self):
         i = len(self.players) - 1
@@ -459,6 +632,8 @@ class Poker:
             player = self.players[i]
             player.resetRound()
             if not player.money:
+                if self.events:
+                    self.events.emit(Events.ELIMINATION, self.handsDealt, name=player.name, quit=False)
                 self.removePlayer(player)
             i -= 1
 
@@ -466,329 +641,499 @@ class Poker:
 
     def deal(self):
         if self.checkActivePlayers():
-            self.activePlayers = CircularLinkedList()
             for player in self.players:
-                self.activePlayers.insertTail(player)
-                self.clearFile(os.path.join(PLAYER_DIR, player.name + ".txt"))
                 player.resetRound()
+            self.activePlayers = SeatRing(self.players)
         else:
             return False
 
-        self.deck.shuffle()
-        numberOfPlayers = len(self.players)
+        if self.tracer:
+            self.tracer.startHand()
 
-        totalHoleCards = numberOfPlayers * 2
+        with self.span("deal"):
+            self.deck.shuffle(self.streams.forHand(self.handsDealt) if self.streams else None)
+            self.handsDealt += 1
+            numberOfPlayers = len(self.players)
 
-        cardsInPlay = []
-        j = 0
+            totalHoleCards = numberOfPlayers * 2
 
-        for i in range(totalHoleCards):
-            if j == numberOfPlayers:
-                j = 0
+            j = 0
 
-            cardsInPlay.append(self.deck.dealCard())
-            self.players[j].addCard(cardsInPlay[i])
-            self.writeToFile(
-                os.path.join(PLAYER_DIR, self.players[j].name + ".txt"),
-                str(cardsInPlay[i]),
-            )
-            j += 1
+            for i in range(totalHoleCards):
+                if j == numberOfPlayers:
+                    j = 0
 
-        self.community = [self.deck.dealCard() for _ in range(5)]
+                card = self.deck.dealCard()
+                self.players[j].addCard(card)
+                j += 1
 
-        self.deck.addCards(cardsInPlay)
-        self.deck.addCards(self.community)
+        # every player's cards are delivered together once dealing is done
+        if self.metrics:
+            start = time.perf_counter_ns()
+        with self.span("delivery"):
+            self.delivery.deliver({player.name: player.hole for player in self.players})
+        if self.metrics:
+            self.metrics.record("delivery", time.perf_counter_ns() - start)
+            self.metrics.count("hands_dealt")
+
+        self.community = []
         self.phase = 1
 
         return True
 
-    def rotateBlinds(self):
-        self.players.append(self.players.pop(0))
+    # flop is 3 cards, turn and river are 1
+    def dealStreet(self):
+        amount = 1 if self.community else 3
+        cards = self.deck.dealCards(amount)
+        self.community.extend(cards)
+        for player in self.activePlayers.getList():
+            player.handState.extend(cards)
+        if self.history:
+            self.history.recordBoard(self.phase, self.community)
+        if self.events:
+            self.events.emit(Events.STREET, self.handsDealt, phase=self.phase, cards=list(cards), board=list(self.community))
 
-    def writeToFile(self, filename, lines):
-        lines = lines.splitlines()
-        with open(filename, "a") as file:
-            for line in lines:
-                file.write(line + "\n")
+        return self.community
 
-    def clearFile(self, filename):
-        open(filename, "w").close()
+    def rotateBlinds(self):
+        self.players.append(self.players.pop(0))
 
     # want to limit print statements to play and play turn function to allow code reusability
     def play(self):
 
         while self.deal():
-            turnedCards = self.community[:2]
-            button = self.activePlayers.tail
-            smallBlind = button.next
-            bigBlind = smallBlind.next
-            currentPot = None
+            self.playHand()
+            self.offerNewPlayers()
+            self.display("Starting new round...\n")
+            self.pause(1)
+
+        winner = self.players[0]
+        self.formatting.printInFancyBox(
+            f"{winner.name} wins the game with {winner.money} chips!"
+        )
+        self.formatting.flush()
+
+        if self.hud:
+            self.hud.close()
+
+    # plays one hand, deal must have been called first
+    def playHand(self):
+        seats = self.activePlayers
+        # seats are in table order and the button is the last seat
+        button = seats.size - 1
+        smallBlind = seats.nextActive(button)
+        bigBlind = seats.nextActive(smallBlind)
+        if self.metrics:
+            handStart = time.perf_counter_ns()
+
+        if self.history:
+            self.history.startHand(self.players, self.minBet)
+
+        if self.events:
+            self.events.emit(
+                Events.HAND_START,
+                self.handsDealt,
+                players=[(player.name, player.money) for player in seats.players],
+                button=seats.players[button].name,
+                smallBlind=seats.players[smallBlind].name,
+                bigBlind=seats.players[bigBlind].name,
+                minBet=self.minBet,
+            )
+            self.events.emit(Events.DEAL, self.handsDealt, hole={player.name: list(player.hole) for player in seats.players})
 
+        self.formatting.printWithSeperators((f"button: {seats.players[button].name}"
+                                             f"\nbig blind: {seats.players[bigBlind].name}"
+                                             f"\nsmall blind: {seats.players[smallBlind].name}"),"~")
 
-            StringFormatting.printWithSeperators((f"button: {button.data.name}"
-                                                 f"\nbig blind: {bigBlind.data.name}"
-                                                 f"\nsmall blind: {smallBlind.data.name}"),"~")
+        with self.span("blinds"):
+            self.postBlind(seats.players[bigBlind], self.minBet)
+            self.postBlind(seats.players[smallBlind], self.minBet // 2)
 
-            bigBlind.data.raiseOrBet(self.minBet)
-            smallBlind.data.raiseOrBet(self.minBet // 2)
+        if seats.players[bigBlind].isAllIn:
+            self.display(f"{seats.players[bigBlind].name} is all in")
 
-            if bigBlind.data.isAllIn:
-                print(f"{bigBlind.data.name} is all in")
+        if seats.players[smallBlind].isAllIn:
+            self.display(f"{seats.players[smallBlind].name} is all in")
 
-            if smallBlind.data.isAllIn:
-                print(f"{smallBlind.data.name} is all in")
+        self.pause(1.5)
 
-            time.sleep(1.5)
+        self.display("Betting Starting....\n")
+        self.pause(0.5)
 
-            print("Betting Starting....\n")
-            time.sleep(0.5)
+        self.playStreets(handStart if self.metrics else None)
 
-            for i in range(4):
-                if self.activePlayers.length == 1:
-                    break
+    # continues a hand put back by Snapshot.restore from where the snapshot was taken: the turn it was taken in
+    # (from inside an agent's act) or the start of the betting round (between streets, e.g. from a street event)
+    # a resumed hand isn't written to the hand history and event subscribers only see the rest of it
+    def resumeHand(self):
+        if not self.activePlayers or not 1 <= self.phase <= 4:
+            raise ValueError("There's no hand to resume")
 
-                if self.phase == 1:
-                    self.bettingRound(bigBlind.next, self.minBet)
-                    currentPot = Pot(0, self.activePlayers.getList())
-                    self.pots.enqueue(currentPot)
+        if self.history:
+            raise ValueError("A resumed hand can't be added to a hand history")
+
+        if self.tracer:
+            self.tracer.startHand()
+
+        self.playStreets(time.perf_counter_ns() if self.metrics else None)
+
+    # the betting rounds from the current phase on, then the showdown or payout and the end of the hand
+    def playStreets(self, handStart=None):
+        seats = self.activePlayers
+        currentPot = self.pots.tail.data if self.pots.size else None
+        turn = self.turn
 
+        while self.phase < 5 and seats.length > 1:
+            # the pot is made before betting so players who fold preflop still lose their blinds to it
+            with self.span(Poker.STREETS[self.phase]):
+                if self.phase == 1:
+                    if currentPot is None:
+                        currentPot = Pot(0, seats.getList())
+                        self.pots.enqueue(currentPot)
+                    # nobody has folded before preflop betting so the blinds are found as they were posted
+                    bigBlind = seats.nextActive(seats.nextActive(seats.size - 1))
+                    self.bettingRound(seats.nextActive(bigBlind), self.minBet, turn)
 
                 else:
-                    self.bettingRound()
+                    self.bettingRound(turn=turn)
+                turn = None
 
+            with self.span("pots"):
                 nextPot = currentPot.addChipsToPot()
 
                 while nextPot:
+                    if self.metrics and Poker.isSidePot(currentPot, nextPot):
+                        self.metrics.count("side_pots")
                     currentPot = nextPot
                     self.pots.enqueue(currentPot)
                     nextPot = nextPot.addChipsToPot()
 
-                if self.activePlayers.length > 1 and self.phase < 5:
-                    turnedCards.append(self.community[self.phase])
-                    communityString = ", ".join([str(card) for card in turnedCards])
-                    StringFormatting.printPaddedInBox(communityString, "=")
-                    time.sleep(1)
-
-            if self.phase == 5:
-                print("Turning over hole cards....")
-                time.sleep(1)
-                current = self.activePlayers.head
-                while True:
-
-                    holeStrings = [str(card) for card in current.data.hole]
+            if seats.length > 1 and self.phase < 5:
+                with self.span("deal_street"):
+                    self.dealStreet()
+                with self.span("render"):
+                    communityString = ", ".join([Card.toString(card) for card in self.community])
+                    self.formatting.printPaddedInBox(communityString, "=")
+                self.pause(1)
+
+        if self.phase == 5:
+            self.display("Turning over hole cards....")
+            self.pause(1)
+            with self.span("render"):
+                for player in seats.getList():
+                    holeStrings = [Card.toString(card) for card in player.hole]
                     width = len(max(holeStrings, key=lambda x: len(x)))
-                    StringFormatting.padAndCentreLine(current.data.name, width)
-                    StringFormatting.borderedText(holeStrings)
-                    current = current.next
-                    if current == self.activePlayers.head:
-                        break
+                    self.formatting.padAndCentreLine(player.name, width)
+                    self.formatting.borderedText(holeStrings)
 
-                time.sleep(2)
+            self.pause(2)
 
-                activePlayersSet = self.activePlayers.getSet()
-                lastPotValue = 0
-                playersInPot = []
-                potNumber = 0
-                potName = None
-                HandFound = False
-
-                while not self.pots.isEmpty():
-                    currentPot = self.pots.dequeue()
-                    playersInPot = [
-                        player
-                        for player in currentPot.players
-                        if player in activePlayersSet
-                    ]
-                    potName = (
-                        "Main Pot" if potNumber == 0 else f"Side Pot {potNumber}"
-                    )
+            if self.metrics:
+                start = time.perf_counter_ns()
+            with self.span("showdown"):
+                results = self.resolveShowdown()
+            if self.metrics:
+                self.metrics.record("showdown", time.perf_counter_ns() - start)
+                self.metrics.count("hand_evaluations", seats.length)
 
-                    if len(playersInPot) == 1:
-                        lastPotValue += currentPot.total
+            with self.span("render"):
+                potNumber = 0
+                for winners, total, split, extraChipsAwardee, extraChips, contested in results:
+                    potName = "Main Pot" if potNumber == 0 else f"Side Pot {potNumber}"
+                    potNumber += 1
+
+                    if not contested:
+                        self.formatting.printInFancyBox(
+                            f"~{potName}~\nOne Player Left In Pot"
+                        )
+                        self.display(f"{winners[0].name} wins {total} chips")
+                        continue
+
+                    text = (f"~{potName}~"
+                            f"\nWinning Hand: {Poker.HAND_RANKS[winners[0].handRank]}"
+                            )
+                    self.formatting.printInFancyBox(text, 10)
+
+                    if len(winners) == 1:
+                        self.printPlayersHand(winners[0])
+                        self.display(f"{winners[0].name} wins {total} chips!")
 
                     else:
+                        self.display(f"pot split {len(winners)} ways for a win of {split} chips each")
 
-                        winners = self.findWinner(playersInPot, HandFound)
-                        text = (f"~{potName}~"
-                                f"\nWinning Hand: {Poker.HAND_RANKS[winners[0].handRank]}"
-                                )
-                        StringFormatting.printInFancyBox(text, 10)
-
-                        potNumber += 1
+                        self.display("winning hands:")
+                        for winner in winners:
+                            self.printPlayersHand(winner)
 
-                        if not HandFound:
-                            HandFound = True
+                        if extraChipsAwardee:
+                            self.display(f"\nWith {extraChips} extra chips awarded to the player to the left of the dealer, {extraChipsAwardee.name}")
 
-                        if len(winners) == 1:
-                            self.printPlayersHand(winners[0])
-                            winners[0].money += currentPot.total
-                            print(f"{winners[0].name} wins {currentPot.total} chips!")
+                    self.pause(2)
 
-                        else:
-                            split, extraChipsAwardee, extraChips = self.splitPot(winners, currentPot.total)
-
-                            print(f"pot split {len(winners)} ways for a win of {split} chips each")
-
-                            print("winning hands:")
-                            for winner in winners:
-                                self.printPlayersHand(winner)
+        else:
+            total = 0
+            while not self.pots.isEmpty():
+                currentPot = self.pots.dequeue()
+                total += currentPot.total
+
+            player = seats.players[seats.first()]
+            if self.events:
+                self.events.emit(Events.POT, self.handsDealt, number=0, total=total, players=[player.name])
+            with self.span("payout"):
+                self.awardChips(player, total)
+            self.formatting.printInFancyBox("~Main Pot~", 10)
+            self.display(f"{player.name} wins {total} chips!")
+
+        if self.history:
+            if self.metrics:
+                start = time.perf_counter_ns()
+            with self.span("history"):
+                self.history.endHand()
+            if self.metrics:
+                self.metrics.record("history_write", time.perf_counter_ns() - start)
+
+        if self.metrics:
+            self.metrics.record("hand", time.perf_counter_ns() - handStart)
+            self.metrics.handFinished()
+
+        if self.tracer:
+            self.tracer.finishHand()
+
+        if self.events:
+            self.events.emit(Events.HAND_END, self.handsDealt, stacks={player.name: player.money for player in seats.players})
+
+        self.rotateBlinds()
+        self.display("~~~~~~~~~~~~~~~~~~~~")
+        self.display("Round ended")
+        self.formatting.flush()
+
+    # players who can't cover a blind post what they have
+    def postBlind(self, player, blind):
+        if player.raiseOrBet(blind) is None:
+            player.allIn()
+
+        self.activePlayers.update(self.activePlayers.seatOf[player])
+
+        if self.history:
+            self.history.recordAction(player, self.phase, "blind", player.totalPotContrib)
+        if self.events:
+            self.events.emit(
+                Events.ACTION,
+                self.handsDealt,
+                name=player.name,
+                phase=self.phase,
+                action="blind",
+                chips=player.totalPotContrib,
+                stake=0,
+                bet=player.currentBet,
+            )
 
-                            if extraChipsAwardee:
-                                print(f"\nWith {extraChips} extra chips awarded to the player to the left of the dealer, {extraChipsAwardee.name}")
-                        time.sleep(2)
+    # a pot splits off whenever someone in it has put in less than the rest, folded players included
+    # it's only a side pot when a player all in for less capped the pot before it, and then it always has chips
+    @staticmethod
+    def isSidePot(pot, nextPot):
+        inNext = set(nextPot.players)
+        return any(player.isAllIn and not player.folded for player in pot.players if player not in inNext)
+
+    def awardChips(self, player, amount, potNumber=0):
+        player.money += amount
+        if self.history:
+            self.history.recordAward(player, potNumber, amount)
+        if self.events:
+            self.events.emit(Events.PAYOUT, self.handsDealt, name=player.name, amount=amount, pot=potNumber)
+
+    def offerNewPlayers(self):
+        if self.checkActivePlayers() and len(self.players) < 6:
+            answer = None
+
+            while not (answer == "y" or answer == "n"):
+                self.formatting.flush()
+                answer = (
+                    input("Would you like to add more players y/n ").lower().strip()
+                )
+                if not (answer == "y" or answer == "n"):
+                    self.display("Invalid input, type y/n")
 
-                if lastPotValue:
-                    StringFormatting.printInFancyBox(
-                        f"~{potName}~\nOne Player Left In Pot"
-                    )
-                    print(f"{playersInPot[0].name} wins {lastPotValue} chips")
-                    playersInPot[0].money += lastPotValue
+            if answer == "y":
+                if self.getNewPlayers():
+                    self.display("\nPlayers added...")
 
-            else:
-                total = 0
-                while not self.pots.isEmpty():
-                    currentPot = self.pots.dequeue()
-                    total += currentPot.total
-
-                player = self.activePlayers.head.data
-                player.money += total
-                StringFormatting.printInFancyBox("~Main Pot~", 10)
-                print(f"{player.name} wins {total} chips!")
-
-            self.rotateBlinds()
-            print("~~~~~~~~~~~~~~~~~~~~")
-            print("Round ended")
-
-            if self.checkActivePlayers() and len(self.players) < 6:
-                answer = None
-
-                while not (answer == "y" or answer == "n"):
-                    answer = (
-                        input("Would you like to add more players y/n ").lower().strip()
-                    )
-                    if not (answer == "y" or answer == "n"):
-                        print("Invalid input, type y/n")
+                else:
+                    self.display("\nNo players added...")
+                self.pause(0.5)
 
-                if answer == "y":
-                    if self.getNewPlayers():
-                        print("\nPlayers added...")
+    # a tracing span around part of the hand, a shared no-op when there's no tracer
+    def span(self, name):
+        return self.tracer.span(name) if self.tracer else NULL_SPAN
 
-                    else:
-                        print("\nNo players added...")
-                    time.sleep(0.5)
-            print("Starting new round...\n")
-            time.sleep(1)
+    def display(self, *args, **kwargs):
+        self.formatting.display(*args, **kwargs)
 
-        winner = self.players[0]
-        StringFormatting.printInFancyBox(
-            f"{winner.name} wins the game with {winner.money} chips!"
-        )
+    def pause(self, seconds):
+        self.formatting.flush()
+        time.sleep(seconds)
 
     def printPlayersHand(self, player):
-        print(f"{player.name}\'s hand > ", end="")
-        print(", ".join([str(card) for card in player.hand]), end="")
-        if player.kickers:
-            print(", ", ", ".join([str(card) for card in player.kickers]))
-        else:
-            print("\n", end="")
+        self.display(f"{player.name}\'s hand > ", end="")
+        self.display(", ".join([Card.toString(card) for card in self.bestFive(player.hand)]))
 
-    def splitPot(self, winners, potValue):
+    # winners must be in seat order from the button, extra chips go to the first of them
+    def splitPot(self, winners, potValue, potNumber=0):
         n = len(winners)
         split = potValue // n
 
         for winner in winners:
-            winner.money += split
+            self.awardChips(winner, split, potNumber)
 
-        # extra chips go to the player next to the button
         if split * n != potValue:
             extraChips = potValue - (split * n)
-            nextToButton = self.activePlayers.head
-            winnerSet = set(winners)
-            while nextToButton not in winnerSet:
-                nextToButton = nextToButton.next
-            nextToButton.money += extraChips
+            self.awardChips(winners[0], extraChips, potNumber)
 
-            return split, nextToButton, extraChips
+            return split, winners[0], extraChips
 
         else:
             return split, None, None
 
-    def bettingRound(self, nodeToStart=None, stake=0):
+    # evaluates every player left once, sorts them once and pays out every pot in order
+    # returns (winners, total, split, extraChipsAwardee, extraChips, contested) for each pot with chips in it
+    def resolveShowdown(self):
+        players = self.activePlayers.getList()
+        seats = {player: seat for seat, player in enumerate(players)}
+        with self.span("evaluate"):
+            for player in players:
+                # the hand is only kept whole for displaying the best five
+                player.addToHand(self.community)
+                player.handStrength = player.handState.strength()
+                player.handRank = HandEvaluator.handCategory(player.handStrength)
 
-        if nodeToStart:
-            node = nodeToStart
-        else:
-            nodeToStart = self.activePlayers.head
-            node = nodeToStart
+            # ties stay in seat order from the button
+            ranked = sorted(players, key=lambda player: (player.handStrength, seats[player]))
+
+        if self.events:
+            self.events.emit(
+                Events.SHOWDOWN,
+                self.handsDealt,
+                hands={player.name: (list(player.hole), player.handStrength, player.handRank) for player in players},
+            )
+
+        results = []
+        potNumber = 0
+        with self.span("payout"):
+            while not self.pots.isEmpty():
+                pot = self.pots.dequeue()
+                if not pot.total:
+                    continue
+
+                potPlayers = set(pot.players)
+                inPot = [player for player in ranked if player in potPlayers]
+                if not inPot:
+                    # everyone who paid into this pot has folded, so it goes to whoever is left
+                    inPot = ranked
+                winners = [player for player in inPot if player.handStrength == inPot[0].handStrength]
+                if self.events:
+                    self.events.emit(
+                        Events.POT, self.handsDealt, number=potNumber, total=pot.total, players=[player.name for player in inPot]
+                    )
+
+                split, extraChipsAwardee, extraChips = self.splitPot(winners, pot.total, potNumber)
+                results.append((winners, pot.total, split, extraChipsAwardee, extraChips, len(inPot) > 1))
+                potNumber += 1
+
+        return results
+
+    # seatToStart is a seat index in activePlayers, defaults to the first seat still in the hand
+    # turn carries on a round from a saved self.turn instead
+    def bettingRound(self, seatToStart=None, stake=0, turn=None):
+        seats = self.activePlayers
+        if seatToStart is None:
+            seatToStart = seats.first()
 
-        player = node.data
+        seat = seatToStart
         startBet = stake
         start = True
         lastRaise = 0
+        if turn:
+            seat, seatToStart, stake, startBet, lastRaise, start = turn
+        player = seats.players[seat]
 
         # While loop conditionals for readability
-        notFinishedLoop = lambda currentNode: currentNode != nodeToStart
+        notFinishedLoop = lambda currentSeat: currentSeat != seatToStart
         betNotChanged = lambda currentStake: currentStake == startBet
+        # a player all in for less than the stake can't meet it, e.g. a short big blind
         playerNotMetBet = (
             lambda currentPlayer, currentStake: currentPlayer.currentBet != currentStake
-        )
-        multiplePlayersCanPlay = (
-            lambda firstNodeNotAllIn: firstNodeNotAllIn
-            != firstNotAllIn(firstNodeNotAllIn.next)
-            if firstNodeNotAllIn
-            else False
-        )
-
-        # find the first not all in player
-        firstNotAllIn = lambda startNode: self.activePlayers.search(
-            False, start=startNode, key=lambda x: x.isAllIn
+            and not currentPlayer.isAllIn
         )
 
-        firstNodeCanPlay = firstNotAllIn(nodeToStart)
-
-        while (self.activePlayers.length > 1
-               and (multiplePlayersCanPlay(firstNodeCanPlay) or playerNotMetBet(player, stake))
-               and (start or playerNotMetBet(player, stake) or (notFinishedLoop(node) and (betNotChanged(stake) or player.isAllIn)))
+        while (seats.length > 1
+               and (seats.canAct > 1 or playerNotMetBet(player, stake))
+               and (start or playerNotMetBet(player, stake) or (notFinishedLoop(seat) and (betNotChanged(stake) or player.isAllIn)))
         ):
 
             if not player.isAllIn:
-                bet, lastRaise = player.playTurn(stake, lastRaise, self.minBet)
+                # the player is about to be prompted, where the round is up to is kept so a snapshot can resume it
+                self.turn = (seat, seatToStart, stake, startBet, lastRaise, start)
+                self.formatting.flush()
+                contribution = player.totalPotContrib
+                if self.hud:
+                    player.hud = self.hud
+                    pot = sum(seated.totalPotContrib for seated in seats.players)
+                    self.hud.startTurn(player, self.community, seats.length - 1, pot, stake - player.currentBet)
+
+                if self.metrics:
+                    turnStart = time.perf_counter_ns()
+
+                with self.span("action"):
+                    bet, lastRaise = player.playTurn(stake, lastRaise, self.minBet)
+                seats.update(seat)
+                if self.hud:
+                    self.hud.stopTurn()
+
+                if self.history or self.metrics or self.events:
+                    chips = player.totalPotContrib - contribution
+                    action = player.lastAction
+                    if self.history:
+                        self.history.recordAction(player, self.phase, action, chips, stake)
+                    if self.metrics:
+                        self.metrics.record("turn", time.perf_counter_ns() - turnStart)
+                        self.metrics.count("betting_actions", label=action)
+                    if self.events:
+                        self.events.emit(
+                            Events.ACTION,
+                            self.handsDealt,
+                            name=player.name,
+                            phase=self.phase,
+                            action=action,
+                            chips=chips,
+                            stake=stake,
+                            bet=player.currentBet,
+                        )
 
                 if player.currentBet > stake:
                     stake = player.currentBet
-                    nodeToStart = node
-                    firstNodeCanPlay = firstNotAllIn(nodeToStart)
-
-                elif player.isAllIn:
-                    firstNodeCanPlay = firstNotAllIn(nodeToStart)
+                    seatToStart = seat
 
                 elif player.folded or player.currentBet == -1:
-                    self.activePlayers.deleteNode(player)
-                    if node == nodeToStart:
-                        nodeToStart = nodeToStart.next
+                    if seat == seatToStart:
+                        seatToStart = seats.nextActive(seat)
 
                     if player.currentBet == -1:
+                        if self.events:
+                            self.events.emit(Events.ELIMINATION, self.handsDealt, name=player.name, quit=True)
                         self.removePlayer(player)
 
-
-
             if start and not (player.folded or player.currentBet == -1):
                 start = False
 
-            node = node.next
-            player = node.data
-            time.sleep(0.5)
+            seat = seats.nextActive(seat)
+            player = seats.players[seat]
+            self.pause(0.5)
 
+        self.turn = None
         # reset current bets at end of round
-        if self.activePlayers.length > 1 and player.currentBet != 0:
-            node = self.activePlayers.head
-            player = node.data
-            while True:
+        if seats.length > 1:
+            for player in seats.getList():
                 player.currentBet = 0
-                node = node.next
-                player = node.data
-                if node == self.activePlayers.head:
-                    break
 
         self.phase += 1
         return
@@ -799,34 +1144,29 @@ class Poker:
         for player in playersInHand:
             if not HandFound:
                 player.addToHand(self.community)
-                self.mergeSort(player.hand, Card.getValue)
-                player.handRank, player.hand, player.kickers = self.getHandRank(
-                    player.hand
-                )
+                player.handStrength = HandEvaluator.evaluate(player.hand)
+                player.handRank = HandEvaluator.handCategory(player.handStrength)
+                if self.metrics:
+                    self.metrics.count("hand_evaluations")
 
-        self.mergeSort(playersInHand, lambda x: x.handRank)
+        # lower strength is a better hand
+        bestStrength = min(player.handStrength for player in playersInHand)
         winners = [
             player
             for player in playersInHand
-            if player.handRank == playersInHand[0].handRank
+            if player.handStrength == bestStrength
         ]
 
-        if len(winners) >= 2:
-            winners = self.findBiggestHand(
-                winners,
-                lambda i: lambda x: x.getCardHand(i).value,
-                len(winners[0].hand),
-            )
-
-            if len(winners) > 1 and winners[0].kickers:
-                winners = self.findBiggestHand(
-                    winners,
-                    lambda i: lambda x: x.getKicker(i).value,
-                    len(winners[0].kickers),
-                )
-
         return winners
 
+    # finds the 5 cards making up the evaluated hand, only used for display
+    def bestFive(self, cards):
+        bestHand = min(
+            itertools.combinations(cards, 5),
+            key=HandEvaluator.evaluate,
+        )
+        return sorted(bestHand, key=Card.valueOf, reverse=True)
+
     def findBiggestHand(self, players, closuredGetFunc, handLength):
         for i in range(handLength):
             getCard = closuredGetFunc(i)
@@ -908,6 +1248,8 @@ class Poker:
         else:
             return None
 
+    # reference evaluator kept for cross checks against HandEvaluator
+    # takes Card objects (see Card.fromInt) merge sorted by value
     # returns rank, [cardsInHand], [kicker(s)] > first card is highest
     def getHandRank(self, cards):
         values = [card.value for card in cards]
@@ -915,7 +1257,6 @@ class Poker:
         rank = None
         kickers = None
         hand = None
-        aceLow = False
         straightStart, straightEnd = self.checkStraight(values)
 
         # straight
@@ -931,8 +1272,6 @@ class Poker:
                     straight = []
                     i = 6
                     while i >= 4 and cards[i].value == 14:  # boundary is 3 Aces and a straight high 5 [2H,3H,4H,5H,AH,AC,AS]
-                        cards[i].value = 1
-                        acelow = True
                         straight.append(cards[i])
                         i -= 1
 
@@ -1042,15 +1381,6 @@ class Poker:
             hand = [cards[-1]]
             kickers = cards[-2:-6:-1]
 
-        #set ace value back to 14
-        if aceLow and rank < 6:
-            i = 0
-            card = straight[0]
-            while card.value == 1:
-                card.value = 14
-                i+=1
-                card = straight[i]
-
         return rank, hand, kickers
 
     def mergeSort(self, arr, key=lambda x: x, decending=False):
@@ -1090,5 +1420,10 @@ class Poker:
             return arr
 
 if __name__ == "__main__":
-    game = Poker()
+    # python Game.py --hud shows equity, pot odds and outs on every turn
+    if "--hud" in sys.argv:
+        import Hud
+        game = Poker(hud=Hud.EquityHud())
+    else:
+        game = Poker()
     game.play()
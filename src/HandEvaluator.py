@@ -0,0 +1,215 @@
+import itertools
+
+# Table driven evaluator for 5, 6 or 7 card hands
+# cards are ints: bits 2-5 hold the rank index (0 = 2 ... 12 = Ace), bits 0-1 hold the suit index
+# strength starts at 1 (royal flush) and lower is better like Poker.HAND_RANKS
+# multi deck shoes can repeat a card, so hands can hold 5+ of a rank or a flush with a pair in it
+
+NUMBER_OF_RANKS = 13
+NUMBER_OF_SUITS = 4
+MAX_CARDS = 7
+
+# low bits: sum of 8 ** rank (a rank count fingerprint), upper bits: a 4 bit counter per suit
+# counters start at 3 so bit 3 of a counter is only set once 5 cards share that suit
+FINGERPRINT_BASE = 8
+SUIT_SHIFT = 40
+RANK_MASK = (1 << SUIT_SHIFT) - 1
+FLUSH_BIAS = 0x3333 << SUIT_SHIFT
+FLUSH_CHECK = 0x8888 << SUIT_SHIFT
+FLUSH_SUIT = {0x8 << SUIT_SHIFT: 0, 0x80 << SUIT_SHIFT: 1, 0x800 << SUIT_SHIFT: 2, 0x8000 << SUIT_SHIFT: 3}
+
+
+def cardId(rankIndex, suitIndex):
+    return rankIndex << 2 | suitIndex
+
+
+def straightHigh(mask):
+    for high in range(12, 3, -1):
+        if (mask >> (high - 4)) & 0x1F == 0x1F:
+            return high
+
+    # ace low straight A2345
+    if mask & 0x100F == 0x100F:
+        return 3
+
+    return -1
+
+
+STRAIGHT_HIGHS = [straightHigh(mask) for mask in range(1 << NUMBER_OF_RANKS)]
+
+
+def rankMask(ranks):
+    mask = 0
+    for rank in ranks:
+        mask |= 1 << rank
+    return mask
+
+
+# returns a sortable key for the best hand in a flush suit, smaller key is a better hand
+# ranks are sorted high to low and may repeat
+def flushKey(ranks):
+    high = STRAIGHT_HIGHS[rankMask(ranks)]
+    if high == 12:
+        return (1,)
+    if high >= 0:
+        return (2, -high)
+
+    # repeated cards still count towards the flush
+    return (5, *[-rank for rank in ranks[:5]])
+
+
+# returns a sortable key for the best non flush hand, ranks are sorted high to low
+def rankCountKey(ranks):
+    counts = {}
+    for rank in ranks:
+        counts[rank] = counts.get(rank, 0) + 1
+
+    present = list(counts)
+    quads = [rank for rank in present if counts[rank] >= 4]
+    trips = [rank for rank in present if counts[rank] == 3]
+    pairs = [rank for rank in present if counts[rank] == 2]
+    kickers = lambda used, amount: [-rank for rank in present if rank not in used][:amount]
+
+    # five of a kind is ranked as four of a kind with a kicker above an ace
+    if quads:
+        if counts[quads[0]] > 4:
+            return (3, -quads[0], -NUMBER_OF_RANKS)
+        return (3, -quads[0], *kickers(quads[:1], 1))
+
+    if trips and (len(trips) > 1 or pairs):
+        return (4, -trips[0], -max(trips[1:] + pairs))
+
+    high = STRAIGHT_HIGHS[rankMask(present)]
+    if high >= 0:
+        return (6, -high)
+
+    if trips:
+        return (7, -trips[0], *kickers(trips, 2))
+
+    if len(pairs) >= 2:
+        return (8, -pairs[0], -pairs[1], *kickers(pairs[:2], 1))
+
+    if pairs:
+        return (9, -pairs[0], *kickers(pairs, 3))
+
+    return (10, *kickers((), 5))
+
+
+def buildTables():
+    powers = [FINGERPRINT_BASE ** rank for rank in range(NUMBER_OF_RANKS)]
+    flushKeys = {}
+    rankKeys = {}
+    for size in range(5, MAX_CARDS + 1):
+        for ranks in itertools.combinations_with_replacement(range(12, -1, -1), size):
+            key = sum([powers[rank] for rank in ranks])
+            flushKeys[key] = flushKey(ranks)
+            rankKeys[key] = rankCountKey(ranks)
+
+    # every 7 card key is also the key of its best 5 cards, so the distinct keys are the hand classes
+    # (7462 of them with a single deck)
+    orderedKeys = sorted(set(flushKeys.values()) | set(rankKeys.values()))
+    strengths = {key: strength for strength, key in enumerate(orderedKeys, 1)}
+
+    flushTable = {key: strengths[handKey] for key, handKey in flushKeys.items()}
+    rankTable = {key: strengths[handKey] for key, handKey in rankKeys.items()}
+    categories = [0] + [handKey[0] for handKey in orderedKeys]
+
+    return flushTable, rankTable, categories
+
+
+FLUSH_TABLE, RANK_TABLE, CATEGORIES = buildTables()
+
+
+# made hand category of 1 to 4 cards by rank fingerprint, too few cards for a straight or a flush
+def buildPartialCategories():
+    powers = [FINGERPRINT_BASE ** rank for rank in range(NUMBER_OF_RANKS)]
+    categories = {}
+    for size in range(1, 5):
+        for ranks in itertools.combinations_with_replacement(range(12, -1, -1), size):
+            categories[sum([powers[rank] for rank in ranks])] = rankCountKey(ranks)[0]
+
+    return categories
+
+
+PARTIAL_CATEGORIES = buildPartialCategories()
+
+CARD_KEYS = [0] * (NUMBER_OF_RANKS * NUMBER_OF_SUITS)
+RANK_KEYS = [0] * (NUMBER_OF_RANKS * NUMBER_OF_SUITS)
+for rankIndex in range(NUMBER_OF_RANKS):
+    for suitIndex in range(NUMBER_OF_SUITS):
+        RANK_KEYS[cardId(rankIndex, suitIndex)] = FINGERPRINT_BASE ** rankIndex
+        CARD_KEYS[cardId(rankIndex, suitIndex)] = (
+            FINGERPRINT_BASE ** rankIndex + (1 << (SUIT_SHIFT + 4 * suitIndex))
+        )
+
+
+# takes 5, 6 or 7 card ids and returns the hand strength, no sorting and no mutation
+def evaluate(cards):
+    key = sum(map(CARD_KEYS.__getitem__, cards), FLUSH_BIAS)
+    flush = key & FLUSH_CHECK
+    strength = RANK_TABLE[key & RANK_MASK]
+
+    if not flush:
+        return strength
+
+    suit = FLUSH_SUIT[flush]
+    suited = 0
+    for card in cards:
+        if card & 3 == suit:
+            suited += RANK_KEYS[card]
+
+    # with repeated cards a full house or better can share the hand with a flush
+    flushStrength = FLUSH_TABLE[suited]
+    return flushStrength if flushStrength < strength else strength
+
+
+def handCategory(strength):
+    return CATEGORIES[strength]
+
+
+# running evaluation of a hand that grows a card at a time, each add is O(1)
+# and strength is the same single lookup evaluate does once there are 5 or more cards
+class HandState:
+    __slots__ = ("key", "suited", "size")
+
+    def __init__(self, cards=()):
+        self.key = FLUSH_BIAS
+        self.suited = [0] * NUMBER_OF_SUITS
+        self.size = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        self.key += CARD_KEYS[card]
+        self.suited[card & 3] += RANK_KEYS[card]
+        self.size += 1
+
+    def extend(self, cards):
+        for card in cards:
+            self.add(card)
+
+    def strength(self):
+        if self.size < 5:
+            raise ValueError("A hand needs at least 5 cards to have a strength")
+
+        strength = RANK_TABLE[self.key & RANK_MASK]
+        flush = self.key & FLUSH_CHECK
+        if not flush:
+            return strength
+
+        flushStrength = FLUSH_TABLE[self.suited[FLUSH_SUIT[flush]]]
+        return flushStrength if flushStrength < strength else strength
+
+    # category of the best hand so far (see Poker.HAND_RANKS), 0 with no cards
+    def category(self):
+        if self.size >= 5:
+            return CATEGORIES[self.strength()]
+
+        return PARTIAL_CATEGORIES.get(self.key & RANK_MASK, 0)
+
+    def copy(self):
+        state = HandState()
+        state.key = self.key
+        state.suited = self.suited[:]
+        state.size = self.size
+        return state
@@ -0,0 +1,225 @@
+import mmap, os, struct
+
+# Append only binary hand history: a header then fixed width records, a hand is every record from its
+# HAND record to its END record and is written in one go once the hand is over
+# record layout: kind, seat, phase, code, 8 card bytes (or a name chunk), then 3 ints whose meaning depends on kind
+#   NAME    seat = chunk number, code = chunk length, cards = name chunk, x = name id
+#   HAND    seat = seats, x = hand number, y = big blind, z = button seat
+#   SEAT    seat, cards = hole cards, x = name id, y = stack before the blinds
+#   ACTION  seat, phase, code = index in ACTIONS, x = chips put in, y = bet after acting, z = stake before acting
+#   BOARD   phase, cards = community cards so far
+#   AWARD   seat, phase = pot number (0 is the main pot), code = hand category, x = chips won, y = hand strength
+#   END     x = hand number
+
+MAGIC = b"PKHH"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<4B8s3i")
+
+NAME, HAND, SEAT, ACTION, BOARD, AWARD, END = range(7)
+ACTIONS = ("blind", "check", "call", "bet", "raise", "all in", "fold", "quit")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+NAME_CHUNK = 8
+NO_CARD = 0xFF
+
+
+def packCards(cards):
+    return bytes(cards).ljust(NAME_CHUNK, bytes([NO_CARD]))
+
+
+def unpackCards(cards):
+    return [card for card in cards if card != NO_CARD]
+
+
+class HandHistoryWriter:
+    # appends to path, carrying on the name ids and hand numbers of an existing log
+    def __init__(self, path):
+        self.nameIds = {}
+        self.handNumber = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            reader = HandHistoryReader(path)
+            self.nameIds = {name: nameId for nameId, name in reader.names.items()}
+            self.handNumber = len(reader.handStarts)
+            reader.close()
+
+        self.file = open(path, "ab")
+        if not self.file.tell():
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+        self.buffer = bytearray()
+        # names first seen in the buffered hand, only kept once the hand is written along with their NAME records
+        self.newNames = {}
+        self.seats = {}
+
+    def add(self, kind, seat=0, phase=0, code=0, cards=b"", x=0, y=0, z=0):
+        self.buffer += RECORD.pack(kind, seat, phase, code, cards, x, y, z)
+
+    def nameId(self, name):
+        nameId = self.nameIds.get(name)
+        if nameId is None:
+            nameId = self.newNames.get(name)
+        if nameId is None:
+            nameId = len(self.nameIds) + len(self.newNames)
+            self.newNames[name] = nameId
+            encoded = name.encode()
+            for chunk in range(0, len(encoded), NAME_CHUNK):
+                part = encoded[chunk:chunk + NAME_CHUNK]
+                self.add(NAME, chunk // NAME_CHUNK, 0, len(part), part, nameId)
+
+        return nameId
+
+    # called before the blinds, seats are numbered in table order and the button is the last seat
+    # a hand that was started but never ended is dropped, along with any names it brought in
+    def startHand(self, players, minBet):
+        self.buffer.clear()
+        self.newNames = {}
+        self.seats = {player: seat for seat, player in enumerate(players)}
+        nameIds = [self.nameId(player.name) for player in players]
+
+        self.add(HAND, len(players), x=self.handNumber + 1, y=minBet, z=len(players) - 1)
+        for seat, player in enumerate(players):
+            self.add(SEAT, seat, cards=packCards(player.hole), x=nameIds[seat], y=player.money)
+
+    def recordAction(self, player, phase, action, chips, stake=0):
+        self.add(ACTION, self.seats[player], phase, ACTION_CODES[action], x=chips, y=player.currentBet, z=stake)
+
+    def recordBoard(self, phase, community):
+        self.add(BOARD, phase=phase, cards=packCards(community))
+
+    def recordAward(self, player, potNumber, amount):
+        self.add(AWARD, self.seats[player], potNumber, player.handRank, x=amount, y=player.handStrength)
+
+    # the whole hand goes to the file in one write
+    def endHand(self):
+        self.handNumber += 1
+        self.add(END, x=self.handNumber)
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.nameIds.update(self.newNames)
+        self.newNames = {}
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# reads a log through mmap so scans never copy or decode more than they need
+class HandHistoryReader:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        if os.path.getsize(path) < HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a hand history")
+
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} hand history")
+
+        # a record cut short by a crash mid write is ignored
+        self.length = (len(self.map) - HEADER.size) // RECORD.size
+        self.end = HEADER.size + self.length * RECORD.size
+
+        # records are fixed width so every kind byte can be sliced out at once
+        self.kinds = self.map[HEADER.size:self.end:RECORD.size]
+        self.handStarts = self.findKind(HAND)
+        self.names = {}
+        for index in self.findKind(NAME):
+            _, chunk, _, length, part, nameId, _, _ = self.record(index)
+            self.names[nameId] = self.names.get(nameId, b"") + part[:length]
+        self.names = {nameId: name.decode() for nameId, name in self.names.items()}
+
+    def findKind(self, kind):
+        indexes = []
+        target = bytes([kind])
+        index = self.kinds.find(target)
+        while index != -1:
+            indexes.append(index)
+            index = self.kinds.find(target, index + 1)
+
+        return indexes
+
+    def record(self, index):
+        return RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)
+
+    # every record from start onwards as raw tuples, optionally only those of the given kinds
+    def records(self, kinds=None, start=0):
+        offset = HEADER.size + start * RECORD.size
+        with memoryview(self.map) as view:
+            for record in RECORD.iter_unpack(view[offset:self.end]):
+                if kinds is None or record[0] in kinds:
+                    yield record
+
+    def __len__(self):
+        return len(self.handStarts)
+
+    # returns the hand as a dict, or None if the log ends before its END record
+    def hand(self, number):
+        index = self.handStarts[number]
+        _, _, _, _, _, handNumber, minBet, button = self.record(index)
+        hand = {
+            "number": handNumber,
+            "minBet": minBet,
+            "button": button,
+            "seats": [],
+            "actions": [],
+            "board": [],
+            "awards": [],
+        }
+
+        for index in range(index + 1, self.length):
+            kind, seat, phase, code, cards, x, y, z = self.record(index)
+            if kind == SEAT:
+                hand["seats"].append((self.names[x], y, unpackCards(cards)))
+            elif kind == ACTION:
+                hand["actions"].append((seat, phase, ACTIONS[code], x, y, z))
+            elif kind == BOARD:
+                hand["board"] = unpackCards(cards)
+            elif kind == AWARD:
+                hand["awards"].append((seat, phase, x, code, y))
+            elif kind == END:
+                return hand
+            elif kind == HAND:
+                break
+
+        return None
+
+    # yields complete hands, predicate takes the hand dict
+    def hands(self, predicate=None):
+        for number in range(len(self.handStarts)):
+            hand = self.hand(number)
+            if hand and (predicate is None or predicate(hand)):
+                yield hand
+
+    # hand numbers a player was dealt into, found from the seat records alone
+    def playerHands(self, name):
+        nameIds = {nameId for nameId, playerName in self.names.items() if playerName == name}
+        numbers = []
+        handNumber = None
+        for kind, _, _, _, _, x, _, _ in self.records((HAND, SEAT)):
+            if kind == HAND:
+                handNumber = x
+            elif x in nameIds:
+                numbers.append(handNumber)
+
+        return numbers
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,141 @@
+import random
+import StringFormatting
+from Game import Player, Poker, CHOICE_CODES, MASK_CHOICES
+from Delivery import MemoryDelivery
+
+# Headless games: every seat is an AgentPlayer and nothing prompts, prints or sleeps
+# an agent is any object with act(view) returning a choice from view["validChoices"],
+# or a (choice, amount) tuple for "raise" (amount to raise to) and "bet" (amount to bet)
+# view["legalActions"] has the same choices as a Game.CHOICES bitmask, minAmount and maxAmount bound the amount
+# (see Player.legalActions), minRaiseTo is the same as minAmount
+
+
+class AgentPlayer(Player):
+    def __init__(self, name, agent, money=100):
+        super().__init__(name)
+        self.money = money
+        self.agent = agent
+        self.table = None
+
+    # same return values as Player.playTurn, invalid actions raise ValueError instead of prompting again
+    def playTurn(self, stake, lastRaise, minBet):
+        legal = self.legalActions(stake, lastRaise, minBet)
+        action = self.agent.act(self.table.turnView(self, stake, lastRaise, legal))
+        choice, amount = action if isinstance(action, tuple) else (action, None)
+        code = CHOICE_CODES.get(choice) if isinstance(choice, str) else None
+        if code is None:
+            raise ValueError(f"{self.name} chose {choice!r} which isn't one of {', '.join(MASK_CHOICES[legal[0]])}")
+
+        return self.apply(code, amount, stake, lastRaise, minBet, legal)
+
+
+class HeadlessPoker(Poker):
+    PLAYER = AgentPlayer
+
+    # agents maps player names to agents, seats are filled in the order given
+    # money is every player's starting stack, or a dict of stacks by name
+    # history is an optional HandHistory.HandHistoryWriter, delivery defaults to a MemoryDelivery
+    # metrics is an optional Metrics.Metrics, tracer an optional Tracing.HandTracer
+    # streams an optional Streams.DealStreams, which deals instead of rng, and events an optional Events.EventBus
+    def __init__(self, agents, minBet, numberOfDecks=2, money=100, rng=None, history=None, delivery=None, metrics=None, tracer=None, streams=None, events=None):
+        stacks = money if isinstance(money, dict) else dict.fromkeys(agents, money)
+        players = [self.PLAYER(name, agent, stacks[name]) for name, agent in agents.items()]
+        super().__init__(
+            minBet,
+            numberOfDecks,
+            players,
+            history=history,
+            delivery=delivery if delivery else MemoryDelivery(),
+            metrics=metrics,
+            tracer=tracer,
+            streams=streams,
+            events=events,
+        )
+        self.formatting = StringFormatting.NullRenderer
+        if rng:
+            self.deck.rng = rng
+
+        for player in self.players:
+            player.table = self
+
+    def initiate(self):
+        if not 2 <= len(self.players) <= 6:
+            raise ValueError("A table needs between 2 and 6 players")
+
+        if len({player.name for player in self.players}) != len(self.players):
+            raise ValueError("Player names must be unique")
+
+        if self.minBet <= 0:
+            raise ValueError("The big blind must cost some amount of chips")
+
+    # plays until one player is left or hands have been played, returns the number of hands played
+    def run(self, hands=None):
+        played = 0
+        while (hands is None or played < hands) and self.deal():
+            self.playHand()
+            played += 1
+
+        return played
+
+    # legal is the turn's Player.legalActions, agents get its mask and amount range as well as the choice names
+    def turnView(self, player, stake, lastRaise, legal):
+        mask, minAmount, maxAmount = legal
+        players = self.players
+        return {
+            "name": player.name,
+            "hole": list(player.hole),
+            "community": list(self.community),
+            "phase": self.phase,
+            "stake": stake,
+            "lastRaise": lastRaise,
+            "minBet": self.minBet,
+            "minRaiseTo": minAmount,
+            "money": player.money,
+            "currentBet": player.currentBet,
+            "handCategory": player.handState.category(),
+            "potContribution": player.totalPotContrib,
+            "pot": sum([seat.totalPotContrib for seat in players]),
+            "validChoices": MASK_CHOICES[mask],
+            "legalActions": mask,
+            "minAmount": minAmount,
+            "maxAmount": maxAmount,
+            "players": [
+                (seat.name, seat.money, seat.currentBet, seat.folded, seat.isAllIn)
+                for seat in players
+            ],
+        }
+
+    def removePlayer(self, player):
+        self.players.remove(player)
+
+    def offerNewPlayers(self):
+        pass
+
+    def display(self, *args, **kwargs):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+
+# checks when it can, otherwise calls
+class CallingAgent:
+    def act(self, view):
+        return "check" if "check" in view["validChoices"] else "call" if "call" in view["validChoices"] else "all in"
+
+
+# picks any valid choice except quit, raises and bets go to a random legal amount
+class RandomAgent:
+    def __init__(self, rng=None):
+        self.rng = rng if rng else random.Random()
+
+    def act(self, view):
+        choice = self.rng.choice(sorted(view["validChoices"] - {"quit"}))
+
+        if choice == "raise" or choice == "bet":
+            if view["minAmount"] <= view["maxAmount"]:
+                return choice, self.rng.randint(view["minAmount"], view["maxAmount"])
+            # a raise or bet can be offered when the player can't reach its minimum
+            choice = "call" if choice == "raise" else "check"
+
+        return choice
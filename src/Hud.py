@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import Equity, HandEvaluator, StringFormatting
+
+# Optional heads up display for human turns: pot odds and outs show straight away,
+# equity against random hands is worked out on a background thread while the player is at the prompt
+# input() releases the GIL so the prompt stays responsive, and the work is cancelled as soon as the player acts
+# a result that is ready while the player is at the prompt is shown straight away and the prompt is shown again under it,
+# one that is ready between prompts waits for the next prompt
+
+HUD_ITERATIONS = 20000
+DECK_SIZE = HandEvaluator.NUMBER_OF_RANKS * HandEvaluator.NUMBER_OF_SUITS
+
+
+# cards left in the shoe that would improve the made hand with the next card, None before the flop or on the river
+def countOuts(hole, community, numberOfDecks):
+    if not 3 <= len(community) <= 4:
+        return None
+
+    known = list(hole) + list(community)
+    state = HandEvaluator.HandState(known)
+    category = state.category()
+    outs = 0
+    for card in range(DECK_SIZE):
+        copies = numberOfDecks - known.count(card)
+        if copies > 0:
+            nextState = state.copy()
+            nextState.add(card)
+            if nextState.category() < category:
+                outs += copies
+
+    return outs
+
+
+# share of the final pot a call costs, the equity a call needs to break even
+def potOdds(pot, toCall):
+    if toCall <= 0:
+        return None
+
+    return toCall / (pot + toCall)
+
+
+class EquityHud:
+    def __init__(self, numberOfDecks=2, iterations=HUD_ITERATIONS, display=print, read=input):
+        self.numberOfDecks = numberOfDecks
+        self.iterations = iterations
+        self.display = display
+        self.read = read
+        self.executor = ThreadPoolExecutor(1)
+        self.cancel = None
+        # the worker and the main thread only show lines while holding the lock
+        self.lock = threading.Lock()
+        # the prompt the player is answering, None between prompts
+        self.prompting = None
+        # lines from the worker that were ready between prompts
+        self.pending = []
+
+    # shows the instant figures and starts the equity in the background
+    def startTurn(self, player, community, opponents, pot, toCall):
+        self.stopTurn()
+
+        odds = potOdds(pot, toCall)
+        outs = countOuts(player.hole, community, self.numberOfDecks)
+        unseen = self.numberOfDecks * DECK_SIZE - len(player.hole) - len(community)
+        lines = [f"pot: {pot}", f"to call: {toCall}" + (f" (pot odds {odds:.1%})" if odds else "")]
+        if outs is not None:
+            lines.append(f"outs: {outs} of {unseen} unseen cards ({outs / unseen:.1%} next card)")
+        lines.append(f"equity vs {opponents} random hand{'s' if opponents > 1 else ''}: working...")
+        StringFormatting.printWithSeperators("\n".join(lines), "-")
+
+        cancel = threading.Event()
+        self.cancel = cancel
+        future = self.executor.submit(
+            Equity.randomOpponentEquity,
+            list(player.hole),
+            list(community),
+            opponents,
+            self.iterations,
+            self.numberOfDecks,
+            cancel=cancel,
+        )
+        future.add_done_callback(lambda done: self.showEquity(done, cancel, opponents, odds))
+
+    # runs on the worker thread, results of turns that are already over are thrown away
+    def showEquity(self, future, cancel, opponents, odds):
+        if cancel.is_set() or future.exception():
+            return
+
+        equity, samples = future.result()
+        verdict = ""
+        if odds:
+            verdict = ", calling is profitable" if equity > odds else ", calling loses chips"
+        line = f"\n[HUD] equity vs {opponents} random: {equity:.1%} over {samples} runouts{verdict}"
+
+        with self.lock:
+            if cancel.is_set():
+                return
+
+            if self.prompting is None:
+                self.pending.append(line)
+            else:
+                self.display(line)
+                self.display(self.prompting, end="", flush=True)
+
+    # reads the player's answer on the main thread, showing any result that was ready before the prompt
+    def prompt(self, message):
+        with self.lock:
+            for line in self.pending:
+                self.display(line)
+            self.pending = []
+            self.prompting = message
+
+        try:
+            return self.read(message)
+        finally:
+            with self.lock:
+                self.prompting = None
+
+    def stopTurn(self):
+        with self.lock:
+            self.pending = []
+            if self.cancel:
+                self.cancel.set()
+                self.cancel = None
+
+    def close(self):
+        self.stopTurn()
+        self.executor.shutdown(wait=False)
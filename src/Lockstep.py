@@ -0,0 +1,441 @@
+import numpy as np
+import HandEvaluator, Streams
+from Game import CHOICES, CHECK, CALL, BET, RAISE, ALL_IN, FOLD, QUIT
+
+# Second engine backend for strategy evaluation: thousands of tables stored as (tables x seats) NumPy arrays
+# and played in lockstep, every step of a betting round is one turn at every table still betting
+# the rules are the same as Poker with HeadlessPoker's agents: blinds, getValidChoices, checkRaiseBet,
+# bettingRound's loop, Pot.addChipsToPot's pot layering and resolveShowdown's payouts
+# seats are rolled every hand so the first seat still playing is seat 0 and the button is the last seat playing,
+# the same as the order of Poker.players after rotateBlinds
+#
+# a policy is called with a view of the tables where someone is to act (one seat per table) and returns
+# (choices, amounts) arrays, choices are indexes into Game.CHOICES and amounts are only read for raise (raise to)
+# and bet, validChoices, minAmount and maxAmount are what Player.legalActions returns
+
+MAX_SEATS = 16
+SHOE = HandEvaluator.NUMBER_OF_RANKS * HandEvaluator.NUMBER_OF_SUITS
+
+CARD_KEYS = np.array(HandEvaluator.CARD_KEYS, dtype=np.int64)
+RANK_KEYS = np.array(HandEvaluator.RANK_KEYS, dtype=np.int64)
+
+
+# the evaluator's dict tables as sorted key and strength arrays for searchsorted
+def lookupArrays(table):
+    keys = np.array(sorted(table), dtype=np.int64)
+    return keys, np.array([table[key] for key in keys.tolist()], dtype=np.int32)
+
+
+RANK_LOOKUP = lookupArrays(HandEvaluator.RANK_TABLE)
+FLUSH_LOOKUP = lookupArrays(HandEvaluator.FLUSH_TABLE)
+
+
+def lookup(arrays, keys):
+    tableKeys, strengths = arrays
+    return strengths[np.minimum(np.searchsorted(tableKeys, keys), len(tableKeys) - 1)]
+
+
+# HandEvaluator.evaluate over the last axis of an array of card ids (5 to 7 of them)
+def evaluate(cards):
+    key = CARD_KEYS[cards].sum(-1) + HandEvaluator.FLUSH_BIAS
+    strength = lookup(RANK_LOOKUP, key & HandEvaluator.RANK_MASK)
+    flush = (key & HandEvaluator.FLUSH_CHECK) != 0
+    if not flush.any():
+        return strength
+
+    # a suit's counter only reaches bit 3 with 5 or more cards, at most one suit can with 7 cards
+    counters = (key[flush] >> HandEvaluator.SUIT_SHIFT)[..., None] >> np.arange(0, 16, 4) & 0x8
+    suit = counters.argmax(-1)
+    flushCards = cards[flush]
+    suited = np.where((flushCards & 3) == suit[..., None], RANK_KEYS[flushCards], 0).sum(-1)
+    strength[flush] = np.minimum(strength[flush], lookup(FLUSH_LOOKUP, suited))
+    return strength
+
+
+# lowest set bit of every mask up to MAX_SEATS bits, -1 for no bits
+def lowestBits(bits):
+    masks = np.arange(1 << bits)
+    lowest = np.full(1 << bits, -1, dtype=np.int64)
+    nonzero = masks > 0
+    lowest[nonzero] = np.log2(masks[nonzero] & -masks[nonzero]).astype(np.int64)
+    return lowest
+
+
+class LockstepTables:
+    # money is every seat's starting stack, hand n at table t is dealt from the Streams id (seed, t, n)
+    def __init__(self, tables, seats, minBet, money=100, numberOfDecks=2, seed=None):
+        if not 2 <= seats <= MAX_SEATS:
+            raise ValueError(f"A table needs between 2 and {MAX_SEATS} seats")
+        if minBet <= 0:
+            raise ValueError("The big blind must cost some amount of chips")
+
+        self.tables = tables
+        self.seats = seats
+        self.minBet = minBet
+        self.numberOfDecks = numberOfDecks
+        self.seed = Streams.newSeed() if seed is None else seed
+        self.lowest = lowestBits(seats)
+        self.bits = 1 << np.arange(seats, dtype=np.int64)
+        self.rows = np.arange(tables)
+
+        shape = (tables, seats)
+        self.money = np.full(shape, money, dtype=np.int64)
+        # seatIds[t, s] is who sits in seat s, seats move as the button does
+        self.seatIds = np.broadcast_to(np.arange(seats), shape).copy()
+        # players who quit keep their chips but never play again
+        self.left = np.zeros(shape, dtype=bool)
+        self.currentBet = np.zeros(shape, dtype=np.int64)
+        self.currentPotContrib = np.zeros(shape, dtype=np.int64)
+        self.totalPotContrib = np.zeros(shape, dtype=np.int64)
+        self.folded = np.zeros(shape, dtype=bool)
+        self.allIn = np.zeros(shape, dtype=bool)
+        self.playing = np.zeros(shape, dtype=bool)
+        self.hole = np.zeros(shape + (2,), dtype=np.int64)
+        self.community = np.zeros((tables, 5), dtype=np.int64)
+        self.communitySize = 0
+        self.phase = np.zeros(tables, dtype=np.int64)
+        # a pot per layer, pot players as a seat mask, the last pot of a table is the one being filled
+        maxPots = 4 * (seats + 1) + 1
+        self.potTotal = np.zeros((tables, maxPots), dtype=np.int64)
+        self.potPlayers = np.zeros((tables, maxPots, seats), dtype=bool)
+        self.potCount = np.zeros(tables, dtype=np.int64)
+        self.handsPlayed = np.zeros(tables, dtype=np.int64)
+
+    def active(self):
+        return self.playing & ~self.folded
+
+    def mask(self, seats):
+        return seats @ self.bits
+
+    # SeatRing.nextSeat for one seat per row
+    def nextSeat(self, seat, mask):
+        higher = mask >> (seat + 1) << (seat + 1)
+        return np.where(higher != 0, self.lowest[higher], self.lowest[mask])
+
+    # tables with at least two players who can still play a hand
+    def tablesInPlay(self):
+        return ((self.money > 0) & ~self.left).sum(1) > 1
+
+    # one bit per CHOICES index, the same choices as Player.getValidChoices
+    def validChoices(self, money, currentBet, stake, lastRaise):
+        toCall = stake - currentBet
+        canCover = money - toCall > 0
+        canRaise = money - np.maximum(self.minBet, 2 * lastRaise) > 0
+        behind = currentBet < stake
+        choices = np.full(len(money), 1 << ALL_IN | 1 << FOLD | 1 << QUIT, dtype=np.int64)
+        choices |= np.where(canCover & behind, 1 << CALL | np.where(canRaise, 1 << RAISE, 0), 0)
+        choices |= np.where(canCover & ~behind, 1 << CHECK | np.where(canRaise, 1 << BET, 0), 0)
+        return choices
+
+    # cards[t] holds seat s's hole cards at s and seats + s, then the five community cards
+    def deal(self, tables, cards=None):
+        if cards is None:
+            cards = self.handCards(tables, self.handsPlayed[tables])
+
+        self.hole[tables, :, 0] = cards[:, :self.seats]
+        self.hole[tables, :, 1] = cards[:, self.seats:2 * self.seats]
+        self.community[tables] = cards[:, 2 * self.seats:]
+
+    # the cards deal uses for these tables' hands, any hand's cards can be made again from its number
+    def handCards(self, tables, hands):
+        # positions are in a sorted shoe like Deck's, each card numberOfDecks times in a row
+        return Streams.shuffleBatch(self.seed, tables, hands, self.numberOfDecks * SHOE, 2 * self.seats + 5) // self.numberOfDecks
+
+    def postBlind(self, tables, seat, blind):
+        paid = np.minimum(blind, self.money[tables, seat])
+        self.money[tables, seat] -= paid
+        self.currentBet[tables, seat] += paid
+        self.currentPotContrib[tables, seat] += paid
+        self.totalPotContrib[tables, seat] += paid
+        self.allIn[tables, seat] |= self.money[tables, seat] == 0
+
+    def view(self, tables, seat, stake, lastRaise, valid):
+        money = self.money[tables, seat]
+        currentBet = self.currentBet[tables, seat]
+        low = np.maximum(stake + 2 * lastRaise, self.minBet)
+        behind = currentBet < stake
+        sized = (valid & (1 << RAISE | 1 << BET)) != 0
+        minAmount = np.where(sized, np.where(behind & (low == stake), low + 1, low), 1)
+        return {
+            "tables": tables,
+            "seats": seat,
+            "seatIds": self.seatIds[tables, seat],
+            "hole": self.hole[tables, seat],
+            "community": self.community[tables, :self.communitySize],
+            "phase": self.phase[tables],
+            "stake": stake,
+            "lastRaise": lastRaise,
+            "minBet": self.minBet,
+            "minRaiseTo": minAmount,
+            "minAmount": minAmount,
+            "maxAmount": np.where(sized, np.where(behind, currentBet + money, money), 0),
+            "money": money,
+            "currentBet": currentBet,
+            "potContribution": self.totalPotContrib[tables, seat],
+            "pot": self.totalPotContrib[tables].sum(1),
+            "validChoices": valid,
+        }
+
+    # Player.playTurn for one seat at each table, returns the acting seats' new current bets
+    def playTurns(self, tables, seat, stake, lastRaise, policy):
+        money = self.money[tables, seat]
+        currentBet = self.currentBet[tables, seat]
+        valid = self.validChoices(money, currentBet, stake, lastRaise)
+        choices, amounts = policy(self.view(tables, seat, stake, lastRaise, valid))
+        choices = np.asarray(choices, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.int64)
+
+        invalid = (valid >> choices & 1) == 0
+        if invalid.any():
+            table = tables[invalid.argmax()]
+            raise ValueError(f"Table {table} chose {CHOICES[choices[invalid.argmax()]]!r} which isn't a valid choice")
+
+        # checkRaiseBet, then raiseOrBet's check that the player has the chips
+        raising = choices == RAISE
+        sized = raising | (choices == BET)
+        put = np.where(raising, amounts - currentBet, amounts)
+        badSize = sized & (
+            (amounts < 0)
+            | (amounts < stake + 2 * lastRaise)
+            | (amounts < self.minBet)
+            | (raising & (amounts == stake))
+            | (money - put < 0)
+        )
+        if badSize.any():
+            table = tables[badSize.argmax()]
+            raise ValueError(f"Table {table} can't {CHOICES[choices[badSize.argmax()]]} {amounts[badSize.argmax()]}")
+
+        put = np.select([sized, choices == CALL, choices == ALL_IN], [put, stake - currentBet, money], 0)
+        money = money - put
+        currentBet = currentBet + put
+        self.money[tables, seat] = money
+        self.currentBet[tables, seat] = currentBet
+        self.currentPotContrib[tables, seat] += put
+        self.totalPotContrib[tables, seat] += put
+        self.allIn[tables, seat] |= (choices == ALL_IN) | (sized & (money == 0))
+        gone = (choices == FOLD) | (choices == QUIT)
+        self.folded[tables, seat] |= gone
+        self.left[tables, seat] |= choices == QUIT
+
+        # only raises and bets set the last raise, an all in over the stake doesn't
+        newLastRaise = np.where(sized, currentBet - stake, lastRaise)
+        return currentBet, gone, newLastRaise
+
+    # Poker.bettingRound at every table in tables, preflop starts after the big blind with the stake at the blind
+    def bettingRound(self, tables, seatToStart, stake, policy):
+        startBet = stake.copy()
+        seat = seatToStart.copy()
+        start = np.ones(len(tables), dtype=bool)
+        lastRaise = np.zeros(len(tables), dtype=np.int64)
+        rows = np.arange(len(tables))
+
+        while len(rows):
+            t = tables[rows]
+            s = seat[rows]
+            active = self.active()[t]
+            length = active.sum(1)
+            canAct = (active & ~self.allIn[t]).sum(1)
+            isAllIn = self.allIn[t, s]
+            notMet = (self.currentBet[t, s] != stake[rows]) & ~isAllIn
+            going = (
+                (length > 1)
+                & ((canAct > 1) | notMet)
+                & (start[rows] | notMet | ((s != seatToStart[rows]) & ((stake[rows] == startBet[rows]) | isAllIn)))
+            )
+            rows = rows[going]
+            if not len(rows):
+                break
+
+            acting = rows[~self.allIn[tables[rows], seat[rows]]]
+            if len(acting):
+                t = tables[acting]
+                s = seat[acting]
+                currentBet, gone, lastRaise[acting] = self.playTurns(t, s, stake[acting], lastRaise[acting], policy)
+
+                raised = currentBet > stake[acting]
+                stake[acting] = np.where(raised, currentBet, stake[acting])
+                seatToStart[acting] = np.where(raised, s, seatToStart[acting])
+
+                moveStart = ~raised & gone & (s == seatToStart[acting])
+                if moveStart.any():
+                    moved = acting[moveStart]
+                    seatToStart[moved] = self.nextSeat(seat[moved], self.mask(self.active()[tables[moved]]))
+
+            t = tables[rows]
+            start[rows] &= self.folded[t, seat[rows]]
+            seat[rows] = self.nextSeat(seat[rows], self.mask(self.active()[t]))
+
+        # current bets are reset at the end of the round while there is still a hand to play
+        stillIn = self.active()[tables]
+        resetting = stillIn & (stillIn.sum(1) > 1)[:, None]
+        self.currentBet[tables] = np.where(resetting, 0, self.currentBet[tables])
+        self.phase[tables] += 1
+
+    # Pot.addChipsToPot until there is no next pot, at every table in tables
+    def buildPots(self, tables):
+        while len(tables):
+            current = self.potCount[tables] - 1
+            players = self.potPlayers[tables, current]
+            contributions = self.currentPotContrib[tables]
+            lowest = np.where(players, contributions, np.iinfo(np.int64).max).min(1)
+            contributions = contributions - np.where(players, lowest[:, None], 0)
+            self.currentPotContrib[tables] = contributions
+            self.potTotal[tables, current] += lowest * players.sum(1)
+
+            nextPot = (np.where(players, contributions, 0).sum(1)) != 0
+            tables = tables[nextPot]
+            current = current[nextPot]
+            self.potPlayers[tables, current + 1] = players[nextPot] & (contributions[nextPot] > 0)
+            self.potCount[tables] += 1
+
+    # Poker.resolveShowdown: every pot goes to the best hands still in it, ties split with odd chips to the
+    # first winner from the button, a pot with no one left in it goes to the best hand left
+    def resolveShowdown(self, tables):
+        active = self.active()[tables]
+        cards = np.concatenate([self.hole[tables], np.broadcast_to(self.community[tables, None], (len(tables), self.seats, 5))], 2)
+        strength = np.where(active, evaluate(cards), np.iinfo(np.int32).max)
+        rows = np.arange(len(tables))
+        for pot in range(self.potTotal.shape[1]):
+            paying = (pot < self.potCount[tables]) & (self.potTotal[tables, pot] > 0)
+            if not paying.any():
+                if not (pot < self.potCount[tables]).any():
+                    break
+                continue
+
+            inPot = active & self.potPlayers[tables, pot]
+            inPot = np.where(inPot.any(1)[:, None], inPot, active)
+            best = np.where(inPot, strength, np.iinfo(np.int32).max).min(1)
+            winners = inPot & (strength == best[:, None]) & paying[:, None]
+            total = np.where(paying, self.potTotal[tables, pot], 0)
+            count = np.maximum(winners.sum(1), 1)
+            split = total // count
+            self.money[tables] += winners * split[:, None]
+            self.money[tables, winners.argmax(1)] += np.where(paying, total - split * count, 0)
+            self.potTotal[tables, pot] = 0
+
+        return strength
+
+    # seats are rolled so the second player still at the table becomes seat 0, like rotateBlinds
+    def rotateBlinds(self, tables):
+        seated = self.playing[tables] & ~self.left[tables]
+        second = seated & (seated.cumsum(1) == 2)
+        shift = np.where(second.any(1), second.argmax(1), 0)
+        order = (np.arange(self.seats) + shift[:, None]) % self.seats
+        for name in ("money", "seatIds", "left"):
+            array = getattr(self, name)
+            array[tables] = np.take_along_axis(array[tables], order, 1)
+
+    # plays a hand at every table with two or more players left, cards is as deal takes it for those tables
+    # returns the tables that played
+    def playHand(self, policy, cards=None):
+        tables = self.rows[self.tablesInPlay()]
+        if not len(tables):
+            return tables
+
+        # Poker.deal and playHand's blinds
+        self.playing[tables] = (self.money[tables] > 0) & ~self.left[tables]
+        for name in ("currentBet", "currentPotContrib", "totalPotContrib"):
+            getattr(self, name)[tables] = 0
+        self.folded[tables] = False
+        self.allIn[tables] = False
+        self.deal(tables, cards)
+        self.communitySize = 0
+        self.phase[tables] = 1
+        self.potTotal[tables] = 0
+        self.potPlayers[tables] = False
+
+        playing = self.mask(self.playing[tables])
+        button = np.log2(playing).astype(np.int64)
+        smallBlind = self.nextSeat(button, playing)
+        bigBlind = self.nextSeat(smallBlind, playing)
+        self.postBlind(tables, bigBlind, self.minBet)
+        self.postBlind(tables, smallBlind, self.minBet // 2)
+
+        # the first pot is made before betting so players who fold preflop still lose their blinds to it
+        self.potPlayers[tables, 0] = self.playing[tables]
+        self.potCount[tables] = 1
+
+        betting = tables
+        for street in range(4):
+            betting = betting[self.active()[betting].sum(1) > 1]
+            if not len(betting):
+                break
+
+            if street == 0:
+                seatToStart = self.nextSeat(bigBlind[np.searchsorted(tables, betting)], self.mask(self.active()[betting]))
+                stake = np.full(len(betting), self.minBet, dtype=np.int64)
+            else:
+                seatToStart = self.lowest[self.mask(self.active()[betting])]
+                stake = np.zeros(len(betting), dtype=np.int64)
+
+            self.bettingRound(betting, seatToStart, stake, policy)
+            self.buildPots(betting)
+            if street < 3:
+                self.communitySize = 3 + street
+
+        showdown = tables[self.phase[tables] == 5]
+        if len(showdown):
+            self.resolveShowdown(showdown)
+
+        # everyone else folded, every pot goes to the last player in
+        won = tables[self.phase[tables] < 5]
+        if len(won):
+            winner = self.active()[won].argmax(1)
+            self.money[won, winner] += self.potTotal[won].sum(1)
+            self.potTotal[won] = 0
+
+        self.handsPlayed[tables] += 1
+        self.rotateBlinds(tables)
+        return tables
+
+    # plays until no table has two players left or hands hands have been played, returns the hands played
+    def run(self, policy, hands=None):
+        played = 0
+        while hands is None or played < hands:
+            tables = self.playHand(policy)
+            if not len(tables):
+                break
+            played += len(tables)
+
+        return played
+
+    # stacks by player id, rows are tables
+    def stacks(self):
+        stacks = np.empty_like(self.money)
+        np.put_along_axis(stacks, self.seatIds, self.money, 1)
+        return stacks
+
+
+def choiceMask(valid, choice):
+    return (valid >> choice & 1) == 1
+
+
+# checks when it can, otherwise calls, otherwise goes all in, like Headless.CallingAgent
+class CallingPolicy:
+    def __call__(self, view):
+        valid = view["validChoices"]
+        choices = np.where(choiceMask(valid, CHECK), CHECK, np.where(choiceMask(valid, CALL), CALL, ALL_IN))
+        return choices, np.zeros(len(valid), dtype=np.int64)
+
+
+# picks any valid choice but quit, with raises and bets of a random size, like Headless.RandomAgent
+class RandomPolicy:
+    def __init__(self, rng=None):
+        self.rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+
+    def __call__(self, view):
+        valid = view["validChoices"] & ~(1 << QUIT)
+        count = len(valid)
+        bits = (valid[:, None] >> np.arange(len(CHOICES)) & 1) == 1
+        # a uniform pick among the set bits
+        pick = (self.rng.random(count) * bits.sum(1)).astype(np.int64)
+        choices = (bits.cumsum(1) > pick[:, None]).argmax(1)
+
+        low = view["minAmount"]
+        top = view["maxAmount"]
+        reachable = low <= top
+        # a raise or bet can be offered when the player can't reach its minimum
+        choices = np.where((choices == RAISE) & ~reachable, CALL, choices)
+        choices = np.where((choices == BET) & ~reachable, CHECK, choices)
+        amounts = low + (self.rng.random(count) * (np.maximum(top - low, 0) + 1)).astype(np.int64)
+        return choices, amounts
@@ -0,0 +1,104 @@
+import json, os, time
+
+# Counters and timers for the engine, Poker only touches them when it was given a Metrics
+# so a game without one pays a single attribute check per instrumented spot
+# timings are perf_counter_ns deltas, exported in seconds
+# exports are written to a temp file and renamed so a scraper never reads half a file
+
+PREFIX = "poker"
+EXPORT_EVERY = 100
+
+
+def replaceFile(path, text):
+    temp = path + ".tmp"
+    with open(temp, "w") as file:
+        file.write(text)
+    os.replace(temp, path)
+
+
+def labelled(name, label):
+    return f'{name}{{kind="{label}"}}' if label else name
+
+
+class Metrics:
+    # the snapshot files are rewritten every exportEvery hands, and by export()
+    def __init__(self, jsonPath=None, prometheusPath=None, exportEvery=EXPORT_EVERY):
+        self.jsonPath = jsonPath
+        self.prometheusPath = prometheusPath
+        self.exportEvery = exportEvery
+        self.started = time.time()
+        self.hands = 0
+        # (name, label) -> count
+        self.counters = {}
+        # (name, label) -> [count, total ns, max ns]
+        self.timers = {}
+
+    def count(self, name, amount=1, label=None):
+        key = (name, label)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record(self, name, elapsed, label=None):
+        timer = self.timers.get((name, label))
+        if timer is None:
+            self.timers[(name, label)] = [1, elapsed, elapsed]
+        else:
+            timer[0] += 1
+            timer[1] += elapsed
+            if elapsed > timer[2]:
+                timer[2] = elapsed
+
+    def handFinished(self):
+        self.hands += 1
+        if self.exportEvery and self.hands % self.exportEvery == 0:
+            self.export()
+
+    def snapshot(self):
+        return {
+            "started": self.started,
+            "time": time.time(),
+            "counters": {labelled(name, label): value for (name, label), value in self.counters.items()},
+            "timers": {
+                labelled(name, label): {
+                    "count": count,
+                    "totalSeconds": total / 1e9,
+                    "meanSeconds": total / count / 1e9,
+                    "maxSeconds": most / 1e9,
+                }
+                for (name, label), (count, total, most) in self.timers.items()
+            },
+        }
+
+    def prometheus(self):
+        lines = []
+        typed = set()
+        for (name, label), value in sorted(self.counters.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{labelled(metric, label)} {value}")
+
+        timers = sorted(self.timers.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        for (name, label), (count, total, _) in timers:
+            metric = f"{PREFIX}_{name}_seconds"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{labelled(metric + '_count', label)} {count}")
+            lines.append(f"{labelled(metric + '_sum', label)} {total / 1e9:.9f}")
+
+        # the slowest of each timer is its own gauge, a summary can't carry it
+        for (name, label), (_, _, most) in timers:
+            metric = f"{PREFIX}_{name}_seconds_max"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{labelled(metric, label)} {most / 1e9:.9f}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        if self.jsonPath:
+            replaceFile(self.jsonPath, json.dumps(self.snapshot(), indent=2))
+        if self.prometheusPath:
+            replaceFile(self.prometheusPath, self.prometheus())
@@ -0,0 +1,352 @@
+import asyncio, json, sys, time, traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from Game import Card
+from Headless import AgentPlayer, HeadlessPoker
+
+# Table server: clients connect over TCP or a Unix socket and talk newline delimited JSON
+# client -> server: {"type": "join", "name": ...} then {"type": "action", "choice": ..., "amount": ...}
+# server -> client: joined, seated, hand, hole, board, turn, error, timeout, message, out and end messages
+# one event loop owns every connection, each table's game runs on a pool thread and only blocks
+# that thread while it waits for an answer, so there is a thread per table rather than per player
+# at most maxTables tables play at once, players joining while every table is taken are turned away
+
+ACTION_TIMEOUT = 30
+MAX_TABLES = 64
+
+
+def encode(message):
+    return (json.dumps(message) + "\n").encode()
+
+
+class Connection:
+    def __init__(self, reader, writer, loop):
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+        self.actions = asyncio.Queue()
+        self.closed = False
+        self.name = None
+
+    # event loop only, use post from a table thread
+    def send(self, message):
+        if not self.closed:
+            self.writer.write(encode(message))
+
+    def post(self, message):
+        self.loop.call_soon_threadsafe(self.send, message)
+
+    # returns the next message as a dict, or None once the client has gone
+    async def receive(self):
+        try:
+            line = await self.reader.readline()
+        except (ConnectionError, ValueError):
+            return None
+
+        if not line:
+            return None
+
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {}
+
+        return message if isinstance(message, dict) else {}
+
+    # actions sent before the turn started are stale, so they are dropped
+    async def requestAction(self, view, timeout):
+        while not self.actions.empty():
+            self.actions.get_nowait()
+
+        self.send({"type": "turn", **view})
+        try:
+            return await asyncio.wait_for(self.actions.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+# agent for a remote seat, act runs on the table thread
+# a player who runs out of time checks if they can and folds otherwise, a player who disconnects quits
+class RemoteAgent:
+    def __init__(self, connection, timeout=ACTION_TIMEOUT):
+        self.connection = connection
+        self.timeout = timeout
+        self.deadline = None
+
+    def act(self, view):
+        if self.connection.closed:
+            return "quit"
+
+        # the clock runs across every retry of the same turn
+        if self.deadline is None:
+            self.deadline = time.monotonic() + self.timeout
+        remaining = max(0, self.deadline - time.monotonic())
+
+        valid = view["validChoices"]
+        view = dict(view, validChoices=sorted(valid), clock=remaining)
+        future = asyncio.run_coroutine_threadsafe(
+            self.connection.requestAction(view, remaining), self.connection.loop
+        )
+        try:
+            message = future.result(remaining + 5)
+        except FutureTimeout:
+            future.cancel()
+            message = None
+
+        if message is None:
+            self.connection.post({"type": "timeout"})
+            return "check" if "check" in valid else "fold"
+
+        # anything but a choice name (and a whole number of chips to raise or bet) goes back to the client
+        choice = message.get("choice")
+        if not isinstance(choice, str):
+            raise ValueError(f"{choice!r} isn't an action")
+
+        if choice == "raise" or choice == "bet":
+            amount = message.get("amount")
+            if not isinstance(amount, int) or isinstance(amount, bool):
+                raise ValueError(f"{choice} needs a whole number of chips, not {amount!r}")
+            return choice, amount
+
+        return choice
+
+
+class RemotePlayer(AgentPlayer):
+    # invalid actions are sent back to the client to try again instead of stopping the table
+    def playTurn(self, stake, lastRaise, minBet):
+        self.agent.deadline = None
+        while True:
+            try:
+                return super().playTurn(stake, lastRaise, minBet)
+            except ValueError as e:
+                self.agent.connection.post({"type": "error", "message": str(e)})
+
+
+# Delivery backend sending each client only its own hole cards
+class ConnectionDelivery:
+    def __init__(self, connections):
+        self.connections = {connection.name: connection for connection in connections}
+
+    def clear(self):
+        pass
+
+    def deliver(self, hands):
+        for name, cards in hands.items():
+            self.connections[name].post(
+                {"type": "hole", "cards": list(cards), "names": [Card.toString(card) for card in cards]}
+            )
+
+    def remove(self, name):
+        pass
+
+
+class ServerTable(HeadlessPoker):
+    PLAYER = RemotePlayer
+
+    def __init__(self, tableId, connections, minBet, money=100, timeout=ACTION_TIMEOUT):
+        self.tableId = tableId
+        self.connections = connections
+        super().__init__(
+            {connection.name: RemoteAgent(connection, timeout) for connection in connections},
+            minBet,
+            money=money,
+            delivery=ConnectionDelivery(connections),
+        )
+
+    def broadcast(self, message):
+        for connection in self.connections:
+            connection.post(message)
+
+    def playHand(self):
+        self.broadcast({"type": "hand", "players": [(player.name, player.money) for player in self.players]})
+        super().playHand()
+
+    def dealStreet(self):
+        community = super().dealStreet()
+        self.broadcast({"type": "board", "cards": list(community)})
+        return community
+
+    def removePlayer(self, player):
+        super().removePlayer(player)
+        connection = player.agent.connection
+        connection.post({"type": "out"})
+        connection.loop.call_soon_threadsafe(connection.close)
+
+    def display(self, *args, **kwargs):
+        text = " ".join([str(arg) for arg in args]).strip()
+        if text:
+            self.broadcast({"type": "message", "text": text})
+
+
+class TableServer:
+    # a table starts as soon as tableSize players are waiting, hands limits how long each table plays
+    def __init__(self, tableSize=6, minBet=2, money=100, timeout=ACTION_TIMEOUT, hands=None, maxTables=MAX_TABLES):
+        if not 2 <= tableSize <= 6:
+            raise ValueError("Tables seat between 2 and 6 players")
+
+        self.tableSize = tableSize
+        self.maxTables = maxTables
+        self.minBet = minBet
+        self.money = money
+        self.timeout = timeout
+        self.hands = hands
+        self.waiting = []
+        self.names = set()
+        self.tables = {}
+        self.nextTableId = 0
+        self.executor = ThreadPoolExecutor(maxTables)
+        self.server = None
+
+    # listens on a Unix socket when path is given, otherwise on host and port (0 picks a free port)
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        if path:
+            self.server = await asyncio.start_unix_server(self.handleClient, path)
+        else:
+            self.server = await asyncio.start_server(self.handleClient, host, port)
+
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for table in list(self.tables.values()):
+            for connection in table.connections:
+                connection.close()
+        self.executor.shutdown(wait=False)
+
+    async def handleClient(self, reader, writer):
+        connection = Connection(reader, writer, asyncio.get_running_loop())
+        try:
+            message = await connection.receive()
+            name = message.get("name") if message else None
+            if not isinstance(name, str) or not name or name in self.names:
+                connection.send({"type": "error", "message": "Join with a name that isn't taken"})
+                return
+
+            if len(self.tables) >= self.maxTables:
+                connection.send({"type": "error", "message": "Every table is taken, try again later"})
+                return
+
+            connection.name = name
+            self.names.add(name)
+            self.waiting.append(connection)
+            connection.send({"type": "joined", "name": name, "waiting": len(self.waiting)})
+            if len(self.waiting) >= self.tableSize:
+                self.startTable()
+
+            while True:
+                message = await connection.receive()
+                if message is None:
+                    break
+
+                if message.get("type") == "action":
+                    connection.actions.put_nowait(message)
+
+        finally:
+            if connection in self.waiting:
+                self.waiting.remove(connection)
+            self.names.discard(connection.name)
+            connection.close()
+            # wakes a table waiting on this player's action
+            connection.actions.put_nowait({"choice": "quit"})
+
+    def startTable(self):
+        connections = self.waiting[:self.tableSize]
+        self.waiting = self.waiting[self.tableSize:]
+        tableId = self.nextTableId
+        self.nextTableId += 1
+
+        table = ServerTable(tableId, connections, self.minBet, self.money, self.timeout)
+        self.tables[tableId] = table
+        names = [connection.name for connection in connections]
+        for seat, connection in enumerate(connections):
+            connection.send({"type": "seated", "table": tableId, "seat": seat, "players": names})
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.runTable, table)
+        future.add_done_callback(lambda future: self.tableDone(table, future))
+
+    # runs on a pool thread
+    def runTable(self, table):
+        played = table.run(self.hands)
+        table.broadcast({
+            "type": "end",
+            "hands": played,
+            "stacks": {player.name: player.money for player in table.players},
+        })
+
+    # event loop only, a table that stopped on an error is logged and its players told before they are let go
+    def tableDone(self, table, future):
+        error = None if future.cancelled() else future.exception()
+        if error:
+            print(f"Table {table.tableId} stopped:", file=sys.stderr)
+            traceback.print_exception(error)
+            table.broadcast({"type": "error", "message": "The table stopped"})
+
+        for connection in table.connections:
+            connection.loop.call_soon(connection.close)
+        self.tables.pop(table.tableId, None)
+
+
+# minimal client, also used to drive tables from scripts
+class TableClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, name, host="127.0.0.1", port=None, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        client = cls(reader, writer)
+        client.send({"type": "join", "name": name})
+        return client
+
+    def send(self, message):
+        self.writer.write(encode(message))
+
+    def act(self, choice, amount=None):
+        self.send({"type": "action", "choice": choice, "amount": amount})
+
+    async def receive(self):
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    def close(self):
+        self.writer.close()
+
+    # plays with a local agent (see Headless) until the server closes the connection
+    # returns every message received
+    async def play(self, agent):
+        messages = []
+        message = await self.receive()
+        while message:
+            messages.append(message)
+            if message["type"] == "turn":
+                action = agent.act(dict(message, validChoices=set(message["validChoices"])))
+                if isinstance(action, tuple):
+                    self.act(*action)
+                else:
+                    self.act(action)
+
+            message = await self.receive()
+
+        self.close()
+        return messages
+
+
+async def serve(port):
+    server = TableServer()
+    await server.start(port=port)
+    print(f"Text Poker table server listening on port {port}")
+    await server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8765))
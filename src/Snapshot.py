@@ -0,0 +1,222 @@
+import random, struct
+import HandEvaluator, Streams
+from DataStructures import Queue, SeatRing
+from Game import Pot
+
+# Compact binary snapshots of a table, for checkpoints and for cloning states to search from
+# a snapshot holds everything a hand depends on so it can be taken and restored mid hand:
+# players in seat order with their stacks, bets and flags, the deck order and cursor, the community cards,
+# the phase, the deck's rng, the seat ring (the button is its last seat), where the betting round is up to
+# and the pots waiting to be paid out, so Poker.resumeHand can play a restored hand on to the same end
+# taken between hands it restores a table to carry on with deal and playHand as usual
+# layout: header, then per player a record, its name and hole cards, then the deck, community, the rng,
+# ring seats (indexes into the players), the turn and one record per pot with a bit per ring seat in it
+
+MAGIC = b"PKSN"
+VERSION = 3
+# magic, version, phase, players, seated players, ring seats, community cards, deck size, deck position, big blind,
+# hands dealt
+HEADER = struct.Struct("<4s6B2HiI")
+# money, current bet, current pot contribution, total pot contribution, hand strength, hand rank, flags,
+# hole cards, name length
+PLAYER = struct.Struct("<5i4B")
+# active, folded and all in seat masks, pots
+RING = struct.Struct("<3IH")
+# total, seat mask
+POT = struct.Struct("<iI")
+# whether a player is mid turn, then Poker.turn: seat, seat to start, stake, start bet, last raise, start
+TURN = struct.Struct("<?2B3i?")
+
+# the deck's rng: a kind byte then a Mersenne Twister state (the random module or a random.Random)
+# or a Streams.CounterRng key, any other rng isn't kept and the table's own carries on
+NO_RNG, MERSENNE, COUNTER = range(3)
+# the 624 words and index of random.getstate(), whether a gauss value is waiting and the value
+MERSENNE_STATE = struct.Struct("<625I?d")
+COUNTER_KEY = struct.Struct("<Q")
+
+FOLDED, ALL_IN = 1, 2
+
+
+def packRng(rng):
+    if isinstance(rng, Streams.CounterRng):
+        return bytes([COUNTER]) + COUNTER_KEY.pack(rng.key)
+
+    if hasattr(rng, "getstate"):
+        version, state, gauss = rng.getstate()
+        if version == 3:
+            return bytes([MERSENNE]) + MERSENNE_STATE.pack(*state, gauss is not None, gauss or 0.0)
+
+    return bytes([NO_RNG])
+
+
+# sets the deck's rng from a packed one, returns the offset after it
+def unpackRng(deck, blob, offset):
+    kind = blob[offset]
+    offset += 1
+    if kind == COUNTER:
+        (key,) = COUNTER_KEY.unpack_from(blob, offset)
+        deck.rng = Streams.CounterRng(key)
+        return offset + COUNTER_KEY.size
+
+    if kind == MERSENNE:
+        *state, waiting, gauss = MERSENNE_STATE.unpack_from(blob, offset)
+        if not hasattr(deck.rng, "setstate"):
+            deck.rng = random.Random()
+        deck.rng.setstate((3, tuple(state), gauss if waiting else None))
+        return offset + MERSENNE_STATE.size
+
+    if kind != NO_RNG:
+        raise ValueError(f"Unknown deck rng kind {kind}")
+    return offset
+
+
+def snapshot(game):
+    players = list(game.players)
+    seats = game.activePlayers
+    if seats:
+        # players out or quit during the hand keep their seat in the ring
+        players.extend([player for player in seats.players if player not in game.players])
+
+    deck = game.deck
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            game.phase,
+            len(players),
+            len(game.players),
+            seats.size if seats else 0,
+            len(game.community),
+            len(deck.cards),
+            deck.position,
+            game.minBet,
+            game.handsDealt,
+        )
+    ]
+    for player in players:
+        name = player.name.encode()
+        parts.append(
+            PLAYER.pack(
+                player.money,
+                player.currentBet,
+                player.currentPotContrib,
+                player.totalPotContrib,
+                player.handStrength,
+                player.handRank,
+                player.folded * FOLDED | player.isAllIn * ALL_IN,
+                len(player.hole),
+                len(name),
+            )
+        )
+        parts.append(name)
+        parts.append(bytes(player.hole))
+
+    parts.append(bytes(deck.cards))
+    parts.append(bytes(game.community))
+    parts.append(packRng(deck.rng))
+
+    if seats:
+        index = {player: i for i, player in enumerate(players)}
+        pots = []
+        node = game.pots.head
+        for _ in range(game.pots.size):
+            pots.append(node.data)
+            node = node.next
+
+        parts.append(RING.pack(seats.active, seats.folded, seats.allIn, len(pots)))
+        parts.append(bytes([index[player] for player in seats.players]))
+        parts.append(TURN.pack(game.turn is not None, *(game.turn or (0, 0, 0, 0, 0, False))))
+        for pot in pots:
+            mask = 0
+            for player in pot.players:
+                mask |= 1 << seats.seatOf[player]
+            parts.append(POT.pack(pot.total, mask))
+
+    return b"".join(parts)
+
+
+# restores into a table that has every player in the snapshot, players are matched by name
+# so agents, delivery and everything else not in the snapshot stay as they are
+# a hand restored mid way is played on with game.resumeHand()
+def restore(game, blob):
+    magic, version, phase, playerCount, seated, ringSize, communitySize, deckSize, position, minBet, handsDealt = (
+        HEADER.unpack_from(blob)
+    )
+    if magic != MAGIC:
+        raise ValueError("Not a table snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    known = {player.name: player for player in game.players}
+    if game.activePlayers:
+        for player in game.activePlayers.players:
+            known.setdefault(player.name, player)
+
+    offset = HEADER.size
+    players = []
+    for _ in range(playerCount):
+        money, currentBet, currentPotContrib, totalPotContrib, handStrength, handRank, flags, holeSize, nameSize = (
+            PLAYER.unpack_from(blob, offset)
+        )
+        offset += PLAYER.size
+        name = blob[offset:offset + nameSize].decode()
+        offset += nameSize
+        player = known.get(name)
+        if player is None:
+            raise ValueError(f"{name} isn't at this table")
+
+        player.money = money
+        player.currentBet = currentBet
+        player.currentPotContrib = currentPotContrib
+        player.totalPotContrib = totalPotContrib
+        player.handStrength = handStrength
+        player.handRank = handRank
+        player.folded = bool(flags & FOLDED)
+        player.isAllIn = bool(flags & ALL_IN)
+        player.hole = list(blob[offset:offset + holeSize])
+        player.hand = list(player.hole)
+        player.kickers = []
+        offset += holeSize
+        players.append(player)
+
+    game.deck.cards = list(blob[offset:offset + deckSize])
+    game.deck.position = position
+    offset += deckSize
+    game.community = list(blob[offset:offset + communitySize])
+    offset += communitySize
+    offset = unpackRng(game.deck, blob, offset)
+
+    game.players = players[:seated]
+    game.phase = phase
+    game.minBet = minBet
+    game.handsDealt = handsDealt
+    for player in players:
+        player.handState = HandEvaluator.HandState(player.hole + game.community if player.hole else ())
+
+    game.pots = Queue()
+    game.turn = None
+    if not ringSize:
+        game.activePlayers = None
+        return game
+
+    active, folded, allIn, potCount = RING.unpack_from(blob, offset)
+    offset += RING.size
+    seats = SeatRing([players[i] for i in blob[offset:offset + ringSize]])
+    offset += ringSize
+    midTurn, *turn = TURN.unpack_from(blob, offset)
+    offset += TURN.size
+    if midTurn:
+        game.turn = tuple(turn)
+    seats.active = active
+    seats.folded = folded
+    seats.allIn = allIn
+    seats.length = active.bit_count()
+    seats.canAct = (active & ~allIn).bit_count()
+    game.activePlayers = seats
+
+    for _ in range(potCount):
+        total, mask = POT.unpack_from(blob, offset)
+        offset += POT.size
+        game.pots.enqueue(Pot(total, [player for seat, player in enumerate(seats.players) if mask >> seat & 1]))
+
+    return game
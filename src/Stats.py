@@ -0,0 +1,241 @@
+import Events, HandHistory
+
+# the batch mode needs NumPy, the event mode doesn't
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Per player statistics: VPIP, PFR, aggression factor, went to showdown, won at showdown and net chips
+# a PlayerStats subscribed to an Events.EventBus counts each hand as it's played and adds it in when the hand ends,
+# fromHistory counts a whole HandHistory log in one pass, reading it in chunks of records as NumPy columns
+# so only a chunk is ever in memory
+# both keep the same counts per player, report turns them into rates:
+#   vpip    hands where the player put chips in preflop without being made to (a blind)
+#   pfr     hands where the player bet or raised preflop
+#   af      bets and raises over calls, over every street
+#   wtsd    showdowns over hands where the player saw the flop
+#   wsd     showdowns where the player won chips over showdowns
+
+COUNTERS = ("hands", "vpip", "pfr", "aggressive", "calls", "sawFlop", "showdowns", "showdownWins", "net")
+HANDS, VPIP, PFR, AGGRESSIVE, CALLS, SAW_FLOP, SHOWDOWNS, SHOWDOWN_WINS, NET = range(len(COUNTERS))
+
+# the events PlayerStats needs
+KINDS = (Events.HAND_START, Events.ACTION, Events.STREET, Events.SHOWDOWN, Events.PAYOUT, Events.HAND_END)
+
+VOLUNTARY = {"call", "bet", "raise", "all in"}
+FOLDS = {"fold", "quit"}
+
+CHUNK_RECORDS = 1 << 18
+# HandHistory.RECORD as a NumPy dtype
+RECORD_DTYPE = (
+    np.dtype([("kind", "u1"), ("seat", "u1"), ("phase", "u1"), ("code", "u1"), ("cards", "S8"), ("x", "<i4"), ("y", "<i4"), ("z", "<i4")])
+    if np
+    else None
+)
+
+
+def ratio(count, total):
+    return count / total if total else None
+
+
+class PlayerStats:
+    def __init__(self):
+        # name -> a count for each of COUNTERS
+        self.totals = {}
+        # the hand being played: name -> counts, names who folded and the showdown's players
+        self.hand = None
+        self.folded = set()
+        self.showdown = ()
+
+    # subscribe with bus.subscribe(stats, Stats.KINDS), in the background or not
+    def __call__(self, event):
+        kind = event.kind
+        data = event.data
+        if kind == Events.HAND_START:
+            self.hand = {name: [1] + [0] * (len(COUNTERS) - 1) for name, _ in data["players"]}
+            self.folded = set()
+            self.showdown = ()
+
+        elif kind == Events.ACTION:
+            name = data["name"]
+            action = data["action"]
+            counts = self.hand[name]
+            counts[NET] -= data["chips"]
+            # an all in is a raise if it took the bet above the stake and a call otherwise
+            raising = action == "bet" or action == "raise" or action == "all in" and data["bet"] > data["stake"]
+            if raising:
+                counts[AGGRESSIVE] += 1
+            elif action == "call" or action == "all in":
+                counts[CALLS] += 1
+
+            if data["phase"] == 1 and action in VOLUNTARY:
+                counts[VPIP] = 1
+                if raising:
+                    counts[PFR] = 1
+            if action in FOLDS:
+                self.folded.add(name)
+
+        elif kind == Events.STREET:
+            if data["phase"] == 2:
+                for name, counts in self.hand.items():
+                    if name not in self.folded:
+                        counts[SAW_FLOP] = 1
+
+        elif kind == Events.SHOWDOWN:
+            # everyone folding to the last player on the river still goes through the showdown, on their own
+            if len(data["hands"]) < 2:
+                return
+            self.showdown = data["hands"]
+            for name in self.showdown:
+                self.hand[name][SHOWDOWNS] = 1
+
+        elif kind == Events.PAYOUT:
+            counts = self.hand[data["name"]]
+            counts[NET] += data["amount"]
+            if data["amount"] and data["name"] in self.showdown:
+                counts[SHOWDOWN_WINS] = 1
+
+        elif kind == Events.HAND_END:
+            for name, counts in self.hand.items():
+                self.add(name, counts)
+            self.hand = None
+
+    def add(self, name, counts):
+        totals = self.totals.get(name)
+        if totals is None:
+            self.totals[name] = list(counts)
+        else:
+            for i, count in enumerate(counts):
+                totals[i] += count
+
+    # adds in another PlayerStats, e.g. one from each table of a tournament
+    def merge(self, other):
+        for name, counts in other.totals.items():
+            self.add(name, counts)
+        return self
+
+    # name -> {"hands", "vpip", "pfr", "af", "wtsd", "wsd", "net"}, a rate is None when nothing it divides by happened
+    def report(self):
+        return {
+            name: {
+                "hands": counts[HANDS],
+                "vpip": ratio(counts[VPIP], counts[HANDS]),
+                "pfr": ratio(counts[PFR], counts[HANDS]),
+                "af": ratio(counts[AGGRESSIVE], counts[CALLS]),
+                "wtsd": ratio(counts[SHOWDOWNS], counts[SAW_FLOP]),
+                "wsd": ratio(counts[SHOWDOWN_WINS], counts[SHOWDOWNS]),
+                "net": counts[NET],
+            }
+            for name, counts in self.totals.items()
+        }
+
+
+# the counts of a run of whole hands as a (COUNTERS, nameCount) array, players are the log's name ids
+# every flag is worked out per (hand, seat) cell then summed per player with bincount
+def chunkCounts(records, nameCount):
+    kind = records["kind"]
+    seat = records["seat"].astype(np.intp)
+    phase = records["phase"]
+    code = records["code"]
+    x = records["x"].astype(np.int64)
+
+    # name records before the chunk's first hand get -1 and are never used
+    hand = np.cumsum(kind == HandHistory.HAND) - 1
+    hands = int(hand[-1]) + 1
+    width = int(seat[kind == HandHistory.HAND].max())
+
+    isSeat = kind == HandHistory.SEAT
+    nameOf = np.full((hands, width), -1, dtype=np.intp)
+    nameOf[hand[isSeat], seat[isSeat]] = x[isSeat]
+    seated = nameOf >= 0
+
+    def cells(mask):
+        flags = np.zeros((hands, width), dtype=bool)
+        flags[hand[mask], seat[mask]] = True
+        return flags
+
+    def perPlayer(flags):
+        return np.bincount(nameOf[flags], minlength=nameCount)
+
+    def perRecord(mask, weights=None):
+        return np.bincount(nameOf[hand[mask], seat[mask]], None if weights is None else weights[mask], minlength=nameCount)
+
+    isAction = kind == HandHistory.ACTION
+    codes = HandHistory.ACTION_CODES
+    allIn = code == codes["all in"]
+    raising = isAction & ((code == codes["bet"]) | (code == codes["raise"]) | allIn & (records["y"] > records["z"]))
+    calling = isAction & ((code == codes["call"]) | allIn & ~raising)
+    preflop = isAction & (phase == 1)
+    folding = isAction & ((code == codes["fold"]) | (code == codes["quit"]))
+
+    flop = np.zeros(hands, dtype=bool)
+    flop[hand[(kind == HandHistory.BOARD) & (phase == 2)]] = True
+    # everyone who didn't fold is at the showdown, there is one whenever two or more of them are left
+    alive = seated & ~cells(folding)
+    showdown = alive & (alive.sum(1) > 1)[:, None]
+    isAward = kind == HandHistory.AWARD
+    won = cells(isAward & (x > 0))
+
+    counts = np.zeros((len(COUNTERS), nameCount), dtype=np.int64)
+    counts[HANDS] = perPlayer(seated)
+    counts[VPIP] = perPlayer(cells(preflop & (raising | calling)))
+    counts[PFR] = perPlayer(cells(preflop & raising))
+    counts[AGGRESSIVE] = perRecord(raising)
+    counts[CALLS] = perRecord(calling)
+    counts[SAW_FLOP] = perPlayer(seated & ~cells(folding & (phase == 1)) & flop[:, None])
+    counts[SHOWDOWNS] = perPlayer(showdown)
+    counts[SHOWDOWN_WINS] = perPlayer(showdown & won)
+    # chip totals are whole numbers well inside a float's exact range
+    counts[NET] = (perRecord(isAward, x) - perRecord(isAction, x)).astype(np.int64)
+
+    return counts
+
+
+# a PlayerStats of every complete hand in a HandHistory log, read chunkRecords records at a time
+# a hand cut by a chunk is carried into the next one, one cut short at the end of the log is left out
+def fromHistory(path, chunkRecords=CHUNK_RECORDS):
+    names = {}
+    totals = np.zeros((len(COUNTERS), 0), dtype=np.int64)
+    leftover = np.zeros(0, dtype=RECORD_DTYPE)
+
+    with open(path, "rb") as file:
+        header = file.read(HandHistory.HEADER.size)
+        if len(header) < HandHistory.HEADER.size:
+            raise ValueError(f"{path} is not a hand history")
+        magic, version, size = HandHistory.HEADER.unpack(header)
+        if magic != HandHistory.MAGIC or version != HandHistory.VERSION or size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a version {HandHistory.VERSION} hand history")
+
+        while True:
+            data = file.read(chunkRecords * RECORD_DTYPE.itemsize)
+            if not data:
+                break
+
+            records = np.frombuffer(data, dtype=RECORD_DTYPE, count=len(data) // RECORD_DTYPE.itemsize)
+            if leftover.size:
+                records = np.concatenate([leftover, records])
+
+            ends = np.flatnonzero(records["kind"] == HandHistory.END)
+            if not ends.size:
+                leftover = records
+                continue
+
+            cut = ends[-1] + 1
+            records, leftover = records[:cut], records[cut:]
+
+            for record in records[records["kind"] == HandHistory.NAME]:
+                nameId = int(record["x"])
+                names[nameId] = names.get(nameId, b"") + record["cards"][:record["code"]]
+
+            counts = chunkCounts(records, len(names))
+            if counts.shape[1] > totals.shape[1]:
+                totals = np.pad(totals, ((0, 0), (0, counts.shape[1] - totals.shape[1])))
+            totals[:, :counts.shape[1]] += counts
+
+    stats = PlayerStats()
+    for nameId, name in names.items():
+        if nameId < totals.shape[1] and totals[HANDS, nameId]:
+            stats.add(name.decode(), totals[:, nameId].tolist())
+
+    return stats
@@ -0,0 +1,97 @@
+import random
+from Game import Deck
+
+# the batched shuffle needs NumPy, the rest doesn't
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Counter based random streams for dealing: every (seed, table, hand) id hashes to its own SplitMix64 key,
+# so any hand can be dealt again from its id alone and parallel tables never share or overlap a stream
+# both engines shuffle the same way: a Fisher-Yates over the sorted shoe where the swap for position i is
+# driven by the key's i-th SplitMix64 value, mix64(key + (i + 1) * GOLDEN), so Deck (through CounterRng) and
+# shuffleBatch deal the same cards for the same id
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+
+# SplitMix64's output function
+def mix64(x):
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+
+def streamKey(seed, table=0, hand=0):
+    return mix64((mix64((mix64(seed & MASK64) + table * GOLDEN) & MASK64) + hand * GOLDEN) & MASK64)
+
+
+# stands in for a random.Random in Deck, randrange(i, n) is the swap for deck position i
+# so what a position gets only depends on the key, not on how many draws came before it
+class CounterRng:
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def randrange(self, start, stop):
+        return start + mix64((self.key + (start + 1) * GOLDEN) & MASK64) % (stop - start)
+
+
+def handRng(seed, table=0, hand=0):
+    return CounterRng(streamKey(seed, table, hand))
+
+
+def newSeed():
+    return random.SystemRandom().getrandbits(64)
+
+
+# the streams of one table, Poker deals hand n from forHand(n)
+class DealStreams:
+    # seed defaults to a fresh random one, kept so the run can be replayed
+    def __init__(self, seed=None, table=0):
+        self.seed = newSeed() if seed is None else seed
+        self.table = table
+
+    def forHand(self, hand):
+        return handRng(self.seed, self.table, hand)
+
+
+# a Deck ready to deal (seed, table, hand) in the same order as when it was played
+def replayDeck(seed, table, hand, numberOfDecks=2):
+    deck = Deck(numberOfDecks)
+    deck.shuffle(handRng(seed, table, hand))
+    return deck
+
+
+def mix64Array(x):
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+# streamKey for arrays of tables and hands
+def streamKeys(seed, tables, hands):
+    tables = np.asarray(tables, dtype=np.uint64)
+    hands = np.asarray(hands, dtype=np.uint64)
+    golden = np.uint64(GOLDEN)
+    with np.errstate(over="ignore"):
+        return mix64Array(mix64Array(np.uint64(mix64(seed & MASK64)) + tables * golden) + hands * golden)
+
+
+# a row per (table, hand) holding the first draw positions of a shuffled size item shoe, the same as
+# Deck.dealCard gives with handRng, every row only depends on its own id so any row can be made again on its own
+def shuffleBatch(seed, tables, hands, size, draw=None):
+    keys = streamKeys(seed, tables, hands)
+    draw = size if draw is None else draw
+    rows = np.arange(len(keys))
+    order = np.broadcast_to(np.arange(size), (len(keys), size)).copy()
+    with np.errstate(over="ignore"):
+        for i in range(draw):
+            values = mix64Array(keys + np.uint64((i + 1) * GOLDEN & MASK64))
+            j = i + (values % np.uint64(size - i)).astype(np.intp)
+            order[rows, i], order[rows, j] = order[rows, j], order[rows, i]
+
+    return order[:, :draw]
@@ -1,16 +1,17 @@
-def printPaddedInBox(string, boxChar, padding=2):
+import sys
+
+# every format function returns its text ready to write, newlines included
+# the print functions write it straight away, a FrameRenderer collects it so each screen update is one write
+
+
+def paddedInBox(string, boxChar, padding=2):
     boxSize = len(string) + 4
-    print(boxChar * boxSize)
-    for i in range(2):
-        for _ in range(padding):
-            print(boxChar, " " * (boxSize - 4), boxChar)
-        if i == 1:
-            break
-        print(boxChar, string, boxChar)
-    print(boxChar * boxSize)
+    edge = boxChar * boxSize + "\n"
+    blank = f"{boxChar} {' ' * (boxSize - 4)} {boxChar}\n" * padding
+    return edge + blank + f"{boxChar} {string} {boxChar}\n" + blank + edge
 
 
-def printInFancyBox(msg, indent=1, width=None, title=None):
+def fancyBox(msg, indent=1, width=None, title=None):
     lines = msg.split("\n")
     space = " " * indent
     if not width:
@@ -21,11 +22,11 @@ def printInFancyBox(msg, indent=1, width=None, title=None):
         box += f"║{space}{title:<{width}}{space}║\n"  # title
         box += f'║{space}{"-" * len(title):<{width}}{space}║\n'  # underscore
     box += "".join([f"║{space}{line:^{width}}{space}║\n" for line in lines])
-    box += f'╚{"═" * (width + indent * 2)}╝'  # lower_border
-    print(box)
+    box += f'╚{"═" * (width + indent * 2)}╝\n'  # lower_border
+    return box
 
 
-def borderedText(lines):
+def borderedBlock(lines):
     if type(lines) == str:
         lines = lines.splitlines()
     width = max(len(line) for line in lines)
@@ -33,23 +34,111 @@ def borderedText(lines):
     for line in lines:
         result.append("│" + (line + " " * width)[:width] + "│")
     result.append("└" + "─" * width + "┘")
-    text = "\n".join(result)
+    return "\n".join(result) + "\n"
 
-    print(text)
 
-
-def padAndCentreLine(line, width):
+def centredLine(line, width):
     lineLength = len(line)
     padding = width - lineLength if lineLength < width else 0
     padding = padding // 2
-    print("~" * padding + " " + line + " " + "~" * padding)
+    return "~" * padding + " " + line + " " + "~" * padding + "\n"
 
 
-def printWithSeperators(lines, sepChar):
+def withSeperators(lines, sepChar):
     lines = lines.splitlines()
-    print("\n")
     width = max(map(len, lines))
-    print(sepChar * width)
-    for line in lines:
-        print(line)
-    print(sepChar * width, end="\n\n")
+    return "\n\n" + sepChar * width + "\n" + "".join([line + "\n" for line in lines]) + sepChar * width + "\n\n"
+
+
+def printPaddedInBox(string, boxChar, padding=2):
+    print(paddedInBox(string, boxChar, padding), end="")
+
+
+def printInFancyBox(msg, indent=1, width=None, title=None):
+    print(fancyBox(msg, indent, width, title), end="")
+
+
+def borderedText(lines):
+    print(borderedBlock(lines), end="")
+
+
+def padAndCentreLine(line, width):
+    print(centredLine(line, width), end="")
+
+
+def printWithSeperators(lines, sepChar):
+    print(withSeperators(lines, sepChar), end="")
+
+
+# Has the print functions as methods (and display for plain print style lines) but only builds strings,
+# flush writes everything since the last flush in one go
+# with redraw every flush is a whole screen and only the lines that changed since the last one are rewritten
+# using ANSI cursor moves, for dashboards of many tables sharing one terminal
+class FrameRenderer:
+    # stream defaults to whatever sys.stdout is when flushing
+    def __init__(self, stream=None, redraw=False):
+        self.stream = stream
+        self.redraw = redraw
+        self.buffer = []
+        # lines on screen in redraw mode, None until the screen has been cleared
+        self.frame = None
+
+    def printPaddedInBox(self, string, boxChar, padding=2):
+        self.buffer.append(paddedInBox(string, boxChar, padding))
+
+    def printInFancyBox(self, msg, indent=1, width=None, title=None):
+        self.buffer.append(fancyBox(msg, indent, width, title))
+
+    def borderedText(self, lines):
+        self.buffer.append(borderedBlock(lines))
+
+    def padAndCentreLine(self, line, width):
+        self.buffer.append(centredLine(line, width))
+
+    def printWithSeperators(self, lines, sepChar):
+        self.buffer.append(withSeperators(lines, sepChar))
+
+    def display(self, *args, sep=" ", end="\n"):
+        self.buffer.append(sep.join([str(arg) for arg in args]) + end)
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        text = "".join(self.buffer)
+        self.buffer = []
+        if self.redraw:
+            text = self.changedLines(text.rstrip("\n").split("\n"))
+
+        stream = self.stream if self.stream else sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    def changedLines(self, lines):
+        if self.frame is None:
+            self.frame = []
+            changes = ["\x1b[2J"]
+        else:
+            changes = []
+
+        for row, line in enumerate(lines):
+            if row >= len(self.frame) or self.frame[row] != line:
+                changes.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        if len(lines) < len(self.frame):
+            changes.append(f"\x1b[{len(lines) + 1};1H\x1b[J")
+        # the cursor is left under the frame
+        changes.append(f"\x1b[{len(lines) + 1};1H")
+
+        self.frame = lines
+        return "".join(changes)
+
+
+# the same methods doing nothing, headless games never build their output
+class NullRenderer:
+    printPaddedInBox = staticmethod(lambda *args, **kwargs: None)
+    printInFancyBox = staticmethod(lambda *args, **kwargs: None)
+    borderedText = staticmethod(lambda *args, **kwargs: None)
+    padAndCentreLine = staticmethod(lambda *args, **kwargs: None)
+    printWithSeperators = staticmethod(lambda *args, **kwargs: None)
+    display = staticmethod(lambda *args, **kwargs: None)
+    flush = staticmethod(lambda: None)
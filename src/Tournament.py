@@ -0,0 +1,168 @@
+import os, random
+import Streams
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Headless import HeadlessPoker
+
+# Multi table tournaments: tables play a level of hands in worker processes, then the parent
+# raises the blinds, rebalances seats and starts the next level
+# a seat is a (name, money, agent) tuple, agents must be picklable to reach the workers
+
+TABLE_SIZE = 6
+BLIND_SCHEDULE = [2, 4, 6, 10, 16, 24, 40, 60, 100, 150, 250, 400]
+
+
+# the Streams table id of a table at a level, hands restart from 0 every level
+def streamTable(level, tableId):
+    return level << 16 | tableId
+
+
+# runs in the worker processes so must stay a top level function
+def playTable(tableId, seats, minBet, hands, streams):
+    game = HeadlessPoker(
+        {name: agent for name, _, agent in seats},
+        minBet,
+        money={name: money for name, money, _ in seats},
+        streams=streams,
+    )
+    played = game.run(hands)
+    remaining = [(player.name, player.money, player.agent) for player in game.players]
+    names = {name for name, _, _ in remaining}
+    eliminated = [name for name, _, _ in seats if name not in names]
+
+    return tableId, played, remaining, eliminated
+
+
+# as few tables as fit everyone at tableSize, but never a table of one: an odd field at 2 handed tables
+# puts the odd player on a table of 3
+def tablesNeeded(players, tableSize=TABLE_SIZE):
+    return max(1, min(-(-players // tableSize), players // 2))
+
+
+# moves seats so tables differ by at most one player, breaking tables that are no longer needed
+# returns a list of (name, fromTable, toTable) moves
+def rebalance(tables, tableSize=TABLE_SIZE):
+    moves = []
+    needed = tablesNeeded(sum(len(seats) for seats in tables.values()), tableSize)
+    smallest = lambda: min(tables, key=lambda tableId: len(tables[tableId]))
+    largest = lambda: max(tables, key=lambda tableId: len(tables[tableId]))
+
+    while len(tables) > needed:
+        brokenId = smallest()
+        broken = tables.pop(brokenId)
+        for seat in broken:
+            tableId = smallest()
+            tables[tableId].append(seat)
+            moves.append((seat[0], brokenId, tableId))
+
+    while len(tables[largest()]) - len(tables[smallest()]) > 1:
+        fromId, toId = largest(), smallest()
+        seat = tables[fromId].pop()
+        tables[toId].append(seat)
+        moves.append((seat[0], fromId, toId))
+
+    return moves
+
+
+class Tournament:
+    # agents maps player names to agents, blinds is the big blind for each level (the last one repeats)
+    def __init__(
+        self,
+        agents,
+        money=100,
+        tableSize=TABLE_SIZE,
+        blinds=BLIND_SCHEDULE,
+        handsPerLevel=20,
+        workers=None,
+        seed=None,
+    ):
+        if len(agents) < 2:
+            raise ValueError("A tournament needs at least 2 players")
+
+        if not 2 <= tableSize <= 6:
+            raise ValueError("Tables seat between 2 and 6 players")
+
+        self.tableSize = tableSize
+        self.blinds = blinds
+        self.handsPerLevel = handsPerLevel
+        self.workers = workers or os.cpu_count() or 1
+        # every hand is dealt from the Streams id (seed, streamTable(level, table), hand)
+        self.seed = Streams.newSeed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.level = 0
+        self.handsPlayed = 0
+        self.finishingOrder = []
+
+        seats = [(name, money, agent) for name, agent in agents.items()]
+        self.rng.shuffle(seats)
+        tableCount = tablesNeeded(len(seats), tableSize)
+        self.tables = {tableId: seats[tableId::tableCount] for tableId in range(tableCount)}
+
+    def getMinBet(self):
+        return self.blinds[min(self.level, len(self.blinds) - 1)]
+
+    def playersLeft(self):
+        return sum(len(seats) for seats in self.tables.values())
+
+    # generator of result dicts, each table's result is yielded as soon as its worker finishes
+    def run(self):
+        with ProcessPoolExecutor(self.workers) as pool:
+            while self.playersLeft() > 1:
+                minBet = self.getMinBet()
+                yield {
+                    "type": "level",
+                    "level": self.level,
+                    "minBet": minBet,
+                    "players": self.playersLeft(),
+                    "tables": len(self.tables),
+                }
+
+                futures = [
+                    pool.submit(
+                        playTable,
+                        tableId,
+                        seats,
+                        minBet,
+                        self.handsPerLevel,
+                        Streams.DealStreams(self.seed, streamTable(self.level, tableId)),
+                    )
+                    for tableId, seats in self.tables.items()
+                ]
+
+                for future in as_completed(futures):
+                    tableId, played, remaining, eliminated = future.result()
+                    self.handsPlayed += played
+                    self.tables[tableId] = remaining
+                    for name in eliminated:
+                        self.finishingOrder.append(name)
+
+                    yield {
+                        "type": "table",
+                        "level": self.level,
+                        "table": tableId,
+                        "hands": played,
+                        "stacks": {name: money for name, money, _ in remaining},
+                        "eliminated": eliminated,
+                    }
+
+                for tableId in [tableId for tableId, seats in self.tables.items() if not seats]:
+                    del self.tables[tableId]
+
+                moves = rebalance(self.tables, self.tableSize)
+                if moves:
+                    yield {"type": "rebalance", "level": self.level, "moves": moves}
+
+                self.level += 1
+
+        winner = next(iter(self.tables.values()))[0]
+        self.finishingOrder.append(winner[0])
+        yield {
+            "type": "winner",
+            "name": winner[0],
+            "money": winner[1],
+            "hands": self.handsPlayed,
+            "levels": self.level,
+        }
+
+    # finishing places from first to last
+    def getStandings(self):
+        return self.finishingOrder[::-1]
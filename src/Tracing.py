@@ -0,0 +1,98 @@
+import contextlib, heapq, time
+
+# Opt in per hand tracing: a hand is a tree of nested spans (deal, each street's betting, pots, showdown...)
+# every sampled hand adds its spans' self time to collapsed stacks ("hand;preflop;turn 1234" per line, in
+# microseconds) which flamegraph.pl, speedscope or inferno read directly
+# the slowest hands are also kept whole so outliers can be looked at span by span
+
+SAMPLE_EVERY = 1
+KEEP_SLOWEST = 10
+
+# shared no-op span for when tracing is off or a hand isn't sampled
+NULL_SPAN = contextlib.nullcontext()
+
+
+class Span:
+    __slots__ = ("tracer", "name")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer.begin(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.end()
+
+
+class HandTracer:
+    # only every sampleEvery-th hand is traced
+    def __init__(self, sampleEvery=SAMPLE_EVERY, keepSlowest=KEEP_SLOWEST, clock=time.perf_counter_ns):
+        self.sampleEvery = sampleEvery
+        self.keepSlowest = keepSlowest
+        self.clock = clock
+        self.hands = 0
+        self.tracing = False
+        # collapsed stack -> total self time in ns
+        self.stacks = {}
+        # open spans as [name, start, time spent in children]
+        self.open = []
+        # (path, start offset, duration) of the current hand's spans
+        self.spans = []
+        # min heap of (duration, hand number, spans) so the fastest kept hand is dropped first
+        self.slowest = []
+
+    def startHand(self):
+        self.hands += 1
+        self.tracing = self.hands % self.sampleEvery == 0
+        if self.tracing:
+            self.open = []
+            self.spans = []
+            self.begin("hand")
+
+    def span(self, name):
+        return Span(self, name) if self.tracing else NULL_SPAN
+
+    def begin(self, name):
+        self.open.append([name, self.clock(), 0])
+
+    def end(self):
+        path = ";".join([span[0] for span in self.open])
+        name, start, children = self.open.pop()
+        elapsed = self.clock() - start
+        self.stacks[path] = self.stacks.get(path, 0) + elapsed - children
+        if self.open:
+            self.open[-1][2] += elapsed
+        self.spans.append((path, start, elapsed))
+
+        return elapsed
+
+    # closes anything left open (a hand that raised part way) and the hand itself
+    def finishHand(self):
+        if not self.tracing:
+            return
+
+        while len(self.open) > 1:
+            self.end()
+        duration = self.end()
+        self.tracing = False
+
+        handStart = self.spans[-1][1]
+        spans = sorted([(path, start - handStart, elapsed) for path, start, elapsed in self.spans], key=lambda span: span[1])
+        if len(self.slowest) < self.keepSlowest:
+            heapq.heappush(self.slowest, (duration, self.hands, spans))
+        elif self.slowest and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, self.hands, spans))
+
+    # returns [(duration ns, hand number, [(path, start offset ns, duration ns)])], slowest first
+    def slowestHands(self):
+        return sorted(self.slowest, reverse=True)
+
+    def collapsed(self):
+        return "".join([f"{path} {max(elapsed // 1000, 1)}\n" for path, elapsed in sorted(self.stacks.items())])
+
+    def writeCollapsed(self, path):
+        with open(path, "w") as file:
+            file.write(self.collapsed())
@@ -0,0 +1,4 @@
+import os, sys
+
+# the modules in src import each other by plain name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
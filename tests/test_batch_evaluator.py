@@ -0,0 +1,32 @@
+import pytest
+import HandEvaluator
+
+np = pytest.importorskip("numpy")
+BatchEvaluator = pytest.importorskip("BatchEvaluator")
+
+
+@pytest.mark.parametrize("numberOfDecks", [1, 2])
+@pytest.mark.parametrize("size", [5, 6, 7])
+def test_matches_evaluate(numberOfDecks, size):
+    rng = np.random.default_rng(size * 10 + numberOfDecks)
+    shoe = np.repeat(np.arange(52), numberOfDecks)
+    cards = np.array([rng.choice(shoe, size, replace=False) for _ in range(20000)])
+    strengths = BatchEvaluator.evaluateBatch(cards)
+    assert strengths.tolist() == [HandEvaluator.evaluate(hand) for hand in cards.tolist()]
+    assert BatchEvaluator.handCategories(strengths).tolist() == [HandEvaluator.handCategory(s) for s in strengths.tolist()]
+
+
+# more hands than a chunk, so chunks are evaluated separately and put back in order
+def test_chunks():
+    rng = np.random.default_rng(4)
+    cards = np.argsort(rng.random((BatchEvaluator.CHUNK_SIZE + 1000, 52)), axis=1)[:, :7]
+    strengths = BatchEvaluator.evaluateBatch(cards)
+    picks = rng.integers(0, len(cards), 2000)
+    assert strengths[picks].tolist() == [HandEvaluator.evaluate(hand) for hand in cards[picks].tolist()]
+
+
+def test_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        BatchEvaluator.evaluateBatch(np.zeros((3, 4), dtype=np.int64))
+    with pytest.raises(ValueError):
+        BatchEvaluator.evaluateBatch(np.zeros(7, dtype=np.int64))
@@ -0,0 +1,42 @@
+import json
+import Benchmark
+
+
+def results(**opsPerSec):
+    return {"meta": {}, "results": {name.replace("_", "."): {"opsPerSec": ops} for name, ops in opsPerSec.items()}}
+
+
+def test_compare_flags_slowdowns_past_the_threshold():
+    old = results(SeatRing=1000, Pot_addChipsToPot=1000, Snapshot_restore=1000, CircularLinkedList=1000)
+    new = results(SeatRing=850, Pot_addChipsToPot=950, Snapshot_restore=2000, HandEvaluator_evaluate=5000)
+    rows = {name: (change, regressed) for name, _, _, change, regressed in Benchmark.compare(old, new)}
+    # cases only in one of the files aren't compared
+    assert sorted(rows) == ["Pot.addChipsToPot", "SeatRing", "Snapshot.restore"]
+    assert rows["SeatRing"][1] and not rows["Pot.addChipsToPot"][1] and not rows["Snapshot.restore"][1]
+    assert abs(rows["SeatRing"][0] + 0.15) < 1e-9
+    assert [name for name, *_, regressed in Benchmark.compare(old, new, 0.01) if regressed] == ["SeatRing", "Pot.addChipsToPot"]
+
+
+def test_compare_command_exits_nonzero_on_a_regression(tmp_path, capsys):
+    paths = {}
+    for label, data in (("old", results(SeatRing=1000)), ("fast", results(SeatRing=1200)), ("slow", results(SeatRing=500))):
+        paths[label] = str(tmp_path / f"{label}.json")
+        with open(paths[label], "w") as file:
+            json.dump(data, file)
+
+    assert Benchmark.main(["compare", paths["old"], paths["fast"]]) == 0
+    assert Benchmark.main(["compare", paths["old"], paths["slow"]]) == 1
+    assert "REGRESSION" in capsys.readouterr().out.splitlines()[-1]
+    assert Benchmark.main(["compare", paths["old"], paths["slow"], "--threshold", "0.6"]) == 0
+
+
+# results saved by run can be compared with themselves
+def test_saved_run_compares_clean(tmp_path, monkeypatch):
+    monkeypatch.setattr(Benchmark, "SAMPLE_NS", 100_000)
+    monkeypatch.setattr(Benchmark, "LATENCY_NS", 1_000_000)
+    path = str(tmp_path / "run.json")
+    assert Benchmark.main(["run", "SeatRing", "--repeat", "3", "--output", path]) == 0
+    with open(path) as file:
+        saved = json.load(file)
+    assert list(saved["results"]) == ["SeatRing"] and saved["meta"]["seed"] == Benchmark.SEED
+    assert Benchmark.main(["compare", path, path]) == 0
@@ -0,0 +1,67 @@
+import random
+import Events
+from Headless import HeadlessPoker, CallingAgent, RandomAgent
+
+
+# random games with an observer checking the table at each new street
+def watched(check, seeds=range(40)):
+    for seed in seeds:
+        agents = {f"p{i}": RandomAgent(random.Random(seed * 10 + i)) for i in range(2 + seed % 5)}
+        bus = Events.EventBus()
+        game = HeadlessPoker(agents, 2, money=40, rng=random.Random(seed), events=bus)
+        bus.subscribe(lambda event: check(game, event), [Events.STREET])
+        game.run(30)
+
+
+# bets from the last round are cleared for everyone before the next street, even when the last player
+# to act had no bet of their own (a stale bet let a lone player keep acting on later streets)
+def test_bets_reset_between_streets():
+    def check(game, event):
+        assert [player.currentBet for player in game.activePlayers.getList()] == [0] * game.activePlayers.length
+
+    watched(check)
+
+
+class FoldingAgent:
+    def act(self, view):
+        return "fold"
+
+
+# the small blind folds preflop and the other two check it down, the folded blind stays in the pot
+def test_preflop_folds_leave_their_blinds_in_the_pot():
+    pots = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: pots.append(event.data["total"]), [Events.POT])
+    game = HeadlessPoker({"a": FoldingAgent(), "b": CallingAgent(), "c": CallingAgent()}, 2, events=bus)
+    game.run(1)
+    assert sum(pots) == 5
+    assert sum(player.money for player in game.players) == 300
+
+
+def actions(stacks, minBet, agents=None):
+    acted = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: acted.append((event.data["name"], event.data["action"], event.data["chips"])), [Events.ACTION])
+    agents = agents or {name: CallingAgent() for name in stacks}
+    game = HeadlessPoker(agents, minBet, money=stacks, rng=random.Random(3), events=bus)
+    game.deal()
+    game.playHand()
+    return game, acted
+
+
+# a stack shorter than its blind posts what it has and plays the hand all in
+def test_short_stacks_post_blinds_all_in():
+    game, acted = actions({"a": 1, "b": 3, "c": 50}, 4)
+    assert acted[:2] == [("b", "blind", 3), ("a", "blind", 1)]
+    players = {player.name: player for player in game.activePlayers.players}
+    assert players["a"].isAllIn and players["b"].isAllIn
+    assert sum(player.money for player in players.values()) == 54
+
+
+
+# both blinds are all in for less than the stake and the button folds, nobody left can meet the stake
+# so the round ends instead of going round the all in players for ever
+def test_betting_does_not_wait_on_short_all_ins():
+    game, acted = actions({"a": 1, "b": 3, "c": 50}, 4, {"a": CallingAgent(), "b": CallingAgent(), "c": FoldingAgent()})
+    assert [name for name, action, _ in acted if action != "blind"] == ["c"]
+    assert sum(player.money for player in game.activePlayers.players) == 54
@@ -0,0 +1,36 @@
+from DataStructures import CircularLinkedList
+
+
+def linked(*items):
+    ring = CircularLinkedList()
+    for item in items:
+        ring.insertTail(item)
+    return ring
+
+
+# deleting the tail moves it back, so the ring stays closed and a deleted player never comes back round
+def test_delete_tail():
+    ring = linked(1, 2, 3)
+    assert ring.deleteNode(3)
+    assert ring.tail.data == 2 and ring.tail.next is ring.head
+    assert ring.getList() == [1, 2] and ring.length == 2
+    ring.insertTail(4)
+    assert ring.getList() == [1, 2, 4]
+
+
+def test_delete_head_and_missing():
+    ring = linked(1, 2, 3)
+    assert ring.deleteNode(1)
+    assert ring.getList() == [2, 3] and ring.tail.next is ring.head
+    assert not ring.deleteNode(9)
+    assert ring.deleteNode(2) and ring.deleteNode(3)
+    assert ring.getList() == [] and ring.length == 0
+
+
+
+# without a start node the search goes once round from the head
+def test_search_stops_after_a_lap():
+    ring = linked(1, 2, 3)
+    assert ring.search(3).data == 3
+    assert ring.search(9) is None
+    assert ring.search(1, start=ring.head.next).data == 1
@@ -0,0 +1,74 @@
+import os
+import pytest
+import Delivery
+from Game import Card
+from Headless import HeadlessPoker, CallingAgent
+
+HANDS = {"a": [0, 5], "b": [10, 51], "c": [22, 33]}
+
+
+def test_file_delivery_writes_one_hand_per_file(tmp_path):
+    directory = str(tmp_path / "hands")
+    files = Delivery.FileDelivery(directory, Card.toString)
+    files.clear()
+    files.deliver(HANDS)
+    assert sorted(os.listdir(directory)) == ["a.txt", "b.txt", "c.txt"]
+    for name, cards in HANDS.items():
+        with open(files.path(name)) as file:
+            assert file.read().splitlines() == [Card.toString(card) for card in cards]
+
+    files.deliver({"b": [1, 2]})
+    with open(files.path("b")) as file:
+        assert file.read().splitlines() == [Card.toString(1), Card.toString(2)]
+    files.remove("a")
+    assert sorted(os.listdir(directory)) == ["b.txt", "c.txt"]
+    files.clear()
+    assert os.listdir(directory) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_pipe_delivery_sends_each_reader_only_their_hand(tmp_path):
+    directory = str(tmp_path / "pipes")
+    pipes = Delivery.PipeDelivery(directory)
+    pipes.clear()
+    # nobody is reading yet, the pipes are made and the hands dropped without blocking
+    pipes.deliver(HANDS)
+    readers = {name: os.open(pipes.path(name), os.O_RDONLY | os.O_NONBLOCK) for name in ("a", "b")}
+    try:
+        pipes.deliver(HANDS)
+        for name, reader in readers.items():
+            assert os.read(reader, 1024).decode() == "".join(f"{card}\n" for card in HANDS[name])
+            # the writer has closed its end again, a hand is all there is
+            assert os.read(reader, 1024) == b""
+    finally:
+        for reader in readers.values():
+            os.close(reader)
+
+    pipes.remove("c")
+    assert sorted(os.listdir(directory)) == ["a.pipe", "b.pipe"]
+
+
+def test_memory_delivery_keeps_the_latest_hands():
+    memory = Delivery.MemoryDelivery()
+    memory.deliver(HANDS)
+    memory.deliver({"a": (7, 8)})
+    assert memory.hands == {"a": [7, 8], "b": [10, 51], "c": [22, 33]}
+    memory.remove("b")
+    memory.remove("b")
+    assert sorted(memory.hands) == ["a", "c"]
+    memory.clear()
+    assert memory.hands == {}
+
+
+# every player's file holds their own hole cards and nobody else's after each deal
+def test_game_delivers_every_hand(tmp_path):
+    directory = str(tmp_path / "hands")
+    files = Delivery.FileDelivery(directory, Card.toString)
+    game = HeadlessPoker({name: CallingAgent() for name in "abc"}, 2, delivery=files)
+    files.clear()
+    for _ in range(3):
+        game.deal()
+        for player in game.players:
+            with open(files.path(player.name)) as file:
+                assert file.read().splitlines() == [Card.toString(card) for card in player.hole]
+        game.playHand()
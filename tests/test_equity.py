@@ -0,0 +1,93 @@
+import pytest
+from Equity import calculateEquity, adaptiveEquity, exactEquity, canonicalSituation, enumerateSituation
+from Game import Card
+
+RANKS = {"J": "Jack", "Q": "Queen", "K": "King", "A": "Ace"}
+SUITS = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+
+
+def cards(string):
+    return [Card(RANKS.get(card[:-1], card[:-1]), SUITS[card[-1]]).id for card in string.split()]
+
+
+# a flush draw against top pair, close enough that a biased sampler would show
+HOLES = [cards("AH 5H"), cards("KS QD")]
+BOARD = cards("KH 9H 2C")
+
+
+def test_monte_carlo_agrees_with_exact():
+    exact = exactEquity(HOLES, BOARD)
+    for workers in (1, 2):
+        estimate = calculateEquity(HOLES, BOARD, iterations=20000, workers=workers, seed=1)
+        for seat, probabilities in zip(exact, estimate):
+            assert probabilities == pytest.approx(seat, abs=0.02)
+            assert sum(probabilities) == pytest.approx(1)
+
+
+def test_seeded_monte_carlo_repeats():
+    assert calculateEquity(HOLES, BOARD, iterations=2000, workers=2, seed=7) == calculateEquity(HOLES, BOARD, iterations=2000, workers=2, seed=7)
+
+
+def test_adaptive_stops_at_the_margin():
+    probabilities, samples, width = adaptiveEquity(HOLES, BOARD, margin=0.02, batchSize=500, workers=1, seed=1)
+    assert width <= 0.02
+    assert samples < 10000000 and samples % 500 == 0
+    for seat, estimate in zip(exactEquity(HOLES, BOARD), probabilities):
+        assert estimate == pytest.approx(seat, abs=0.04)
+
+
+def test_adaptive_stops_at_max_iterations():
+    _, samples, width = adaptiveEquity(HOLES, BOARD, margin=0, batchSize=500, maxIterations=2000, workers=1, seed=1)
+    assert samples == 2000
+    assert width > 0
+
+
+def test_adaptive_stops_at_the_time_budget():
+    _, samples, width = adaptiveEquity(HOLES, BOARD, margin=0, timeBudget=0.5, batchSize=200, workers=1, seed=1)
+    assert 0 < samples < 10000000
+    assert width > 0
+
+
+@pytest.mark.parametrize("holes, board, dead", [
+    ([cards("AH 5H")], [], []),
+    ([cards("AH 5H"), cards("KS")], [], []),
+    ([cards("AH 5H"), cards("KS QD")], cards("2C 3C 4C 5C 6C 7C"), []),
+    ([cards("AH 5H"), cards("AH QD")], [], []),
+    ([cards("AH 5H"), cards("KS QD")], [], [52]),
+    ([cards("AH 5H"), [cards("KS")[0], -1]], [], []),
+])
+def test_bad_cards_are_refused(holes, board, dead):
+    with pytest.raises(ValueError):
+        calculateEquity(holes, board, dead, iterations=10, workers=1)
+    with pytest.raises(ValueError):
+        exactEquity(holes, board, dead)
+
+
+@pytest.mark.parametrize("iterations", [0, -5])
+def test_iterations_must_be_positive(iterations):
+    with pytest.raises(ValueError):
+        calculateEquity(HOLES, BOARD, iterations=iterations)
+    with pytest.raises(ValueError):
+        adaptiveEquity(HOLES, BOARD, batchSize=iterations)
+
+
+# swaps the suits around in pairs, the ranks stay the same
+def relabel(ids):
+    return [card ^ 1 for card in ids]
+
+
+def test_canonical_situation_ignores_suit_names():
+    situation = canonicalSituation(HOLES, BOARD, cards("2D"))
+    assert canonicalSituation([relabel(hole) for hole in HOLES], relabel(BOARD), relabel(cards("2D"))) == situation
+    assert canonicalSituation([list(reversed(hole)) for hole in HOLES], list(reversed(BOARD)), cards("2D")) == situation
+    # which seat holds which cards still matters
+    assert canonicalSituation(list(reversed(HOLES)), BOARD, cards("2D")) != situation
+
+
+def test_exact_equity_is_cached_across_suit_relabellings():
+    enumerateSituation.cache_clear()
+    first = exactEquity(HOLES, BOARD)
+    assert enumerateSituation.cache_info().misses == 1
+    assert exactEquity([relabel(hole) for hole in HOLES], relabel(BOARD)) == first
+    info = enumerateSituation.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
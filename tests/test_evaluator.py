@@ -0,0 +1,102 @@
+import itertools, random
+from collections import Counter
+import pytest
+import HandEvaluator
+from Game import Card, Poker
+
+RANKS = {"J": "Jack", "Q": "Queen", "K": "King", "A": "Ace"}
+SUITS = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+
+
+# "AH 10S 2C" -> card ids
+def hand(string):
+    return [Card(RANKS.get(card[:-1], card[:-1]), SUITS[card[-1]]).id for card in string.split()]
+
+
+# brute force reference: the best (class, tiebreak ranks) over every 5 of the cards, higher is better
+# a rank held 5 times (multi deck shoes) counts as four of a kind with the highest possible kicker
+def rankFive(cards):
+    ranks = sorted([card >> 2 for card in cards], reverse=True)
+    flush = len({card & 3 for card in cards}) == 1
+    distinct = sorted(set(ranks), reverse=True)
+    straight = None
+    if len(distinct) == 5 and distinct[0] - distinct[4] == 4:
+        straight = distinct[0]
+    elif distinct == [12, 3, 2, 1, 0]:
+        straight = 3
+
+    groups = sorted(Counter(ranks).items(), key=lambda group: (-group[1], -group[0]))
+    shape = [count for _, count in groups]
+    order = [rank for rank, _ in groups]
+    if straight is not None and flush:
+        return 8, straight
+    if shape[0] >= 4:
+        return 7, order[0], 13 if shape[0] == 5 else order[1]
+    if shape == [3, 2]:
+        return 6, *order
+    if flush:
+        return 5, *ranks
+    if straight is not None:
+        return 4, straight
+    if shape[0] == 3:
+        return 3, *order
+    if shape[:2] == [2, 2]:
+        return 2, *order
+    if shape[0] == 2:
+        return 1, *order
+    return 0, *ranks
+
+
+def bruteForce(cards):
+    return max(rankFive(five) for five in itertools.combinations(cards, 5))
+
+
+# the brute force class as a Poker.HAND_RANKS category
+def category(best):
+    if best[0] == 8:
+        return 1 if best[1] == 12 else 2
+    return 10 - best[0]
+
+
+@pytest.mark.parametrize("numberOfDecks", [1, 2])
+def test_matches_brute_force(numberOfDecks):
+    rng = random.Random(numberOfDecks)
+    shoe = list(range(52)) * numberOfDecks
+    strengths = {}
+    for _ in range(4000):
+        cards = rng.sample(shoe, rng.choice([5, 6, 7]))
+        best = bruteForce(cards)
+        strength = HandEvaluator.evaluate(cards)
+        assert HandEvaluator.handCategory(strength) == category(best), cards
+        assert HandEvaluator.HandState(cards).strength() == strength
+        assert strengths.setdefault(best, strength) == strength, cards
+
+    # better hands always have lower strengths
+    ordered = [strengths[best] for best in sorted(strengths, reverse=True)]
+    assert ordered == sorted(ordered) and len(set(ordered)) == len(ordered)
+
+
+# a 7 card hand of each category, some with a better looking hand hidden in them
+CATEGORY_HANDS = [
+    ("AH KH QH JH 10H 2C 3D", 1),
+    ("9S 8S 7S 6S 5S AD AC", 2),
+    ("AS 2S 3S 4S 5S KD KC", 2),
+    ("7C 7D 7H 7S KD 2C 3D", 3),
+    ("QC QD QH 9S 9D 2C 3D", 4),
+    ("KC 3H 5H 9H JH 2H 3D", 5),
+    ("AC 2D 3H 4S 5C 9D KH", 6),
+    ("10C JD QH KS AC 2D 4H", 6),
+    ("8C 8D 8H AS KD 2C 4D", 7),
+    ("8C 8D 4H 4S KD 2C 2D", 8),
+    ("JC JD 4H 6S KD 2C 9D", 9),
+    ("AC QD 4H 6S 9D 2C 7D", 10),
+]
+
+
+@pytest.mark.parametrize("string, expected", CATEGORY_HANDS)
+def test_categories_match_get_hand_rank(string, expected):
+    cards = hand(string)
+    game = Poker.__new__(Poker)
+    rank = game.getHandRank(sorted([Card.fromInt(card) for card in cards], key=Card.getValue))[0]
+    assert rank == expected
+    assert HandEvaluator.handCategory(HandEvaluator.evaluate(cards)) == expected
@@ -0,0 +1,60 @@
+import collections, random
+import Events
+from Headless import HeadlessPoker, RandomAgent
+
+
+def play(seed, seats, hands, bus):
+    agents = {f"p{i}": RandomAgent(random.Random(seed * 10 + i)) for i in range(seats)}
+    game = HeadlessPoker(agents, 2, rng=random.Random(seed), events=bus)
+    game.run(hands)
+    return game
+
+
+def test_pots_match_payouts():
+    for seed in range(50):
+        bus = Events.EventBus()
+        events = []
+        bus.subscribe(events.append)
+        play(seed, 2 + seed % 5, 20, bus)
+
+        hands = collections.defaultdict(list)
+        for event in events:
+            hands[event.hand].append(event)
+        for handEvents in hands.values():
+            pots = {event.data["number"]: event.data for event in handEvents if event.kind == Events.POT}
+            paid = collections.Counter()
+            for event in handEvents:
+                if event.kind == Events.PAYOUT:
+                    paid[event.data["pot"]] += event.data["amount"]
+                    assert event.data["name"] in pots[event.data["pot"]]["players"]
+
+            assert all(pot["total"] for pot in pots.values())
+            assert {number: pot["total"] for number, pot in pots.items()} == dict(paid)
+
+
+def test_background_subscriber_sees_everything_in_order():
+    inline = []
+    background = []
+    bus = Events.EventBus()
+    bus.subscribe(inline.append)
+    subscriber = bus.subscribe(background.append, background=True, queueSize=2, batchSize=3)
+    play(1, 6, 50, bus)
+    bus.close()
+
+    assert subscriber.errors == 0 and subscriber.dropped == 0
+    assert [(event.kind, event.hand) for event in background] == [(event.kind, event.hand) for event in inline]
+
+
+def test_chips_put_in_are_paid_out():
+    bus = Events.EventBus()
+    totals = collections.Counter()
+
+    def tally(event):
+        if event.kind == Events.ACTION:
+            totals[event.hand] += event.data["chips"]
+        elif event.kind == Events.PAYOUT:
+            totals[event.hand] -= event.data["amount"]
+
+    bus.subscribe(tally, [Events.ACTION, Events.PAYOUT])
+    play(3, 5, 100, bus)
+    assert not any(totals.values())
@@ -0,0 +1,43 @@
+import StringFormatting
+from StringFormatting import FrameRenderer
+
+
+# a stream that keeps each write separately
+class Screen:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_flush_writes_everything_at_once():
+    screen = Screen()
+    renderer = FrameRenderer(screen)
+    renderer.printPaddedInBox("pot", "#")
+    renderer.printWithSeperators("a calls", "*")
+    renderer.display("b", "checks", sep=" ")
+    renderer.flush()
+    renderer.flush()
+    assert screen.writes == [StringFormatting.paddedInBox("pot", "#") + StringFormatting.withSeperators("a calls", "*") + "b checks\n"]
+
+
+def test_redraw_rewrites_only_changed_lines_in_one_write():
+    screen = Screen()
+    renderer = FrameRenderer(screen, redraw=True)
+    renderer.display("table 1: a to act\ntable 2: b to act\ntable 3: c to act")
+    renderer.flush()
+    assert screen.writes == ["\x1b[2J\x1b[1;1Htable 1: a to act\x1b[K\x1b[2;1Htable 2: b to act\x1b[K\x1b[3;1Htable 3: c to act\x1b[K\x1b[4;1H"]
+
+    renderer.display("table 1: a to act\ntable 2: b folds\ntable 3: c to act")
+    renderer.flush()
+    assert screen.writes[1] == "\x1b[2;1Htable 2: b folds\x1b[K\x1b[4;1H"
+
+    # a shorter frame clears what was below it
+    renderer.display("table 1: a wins")
+    renderer.flush()
+    assert screen.writes[2] == "\x1b[1;1Htable 1: a wins\x1b[K\x1b[2;1H\x1b[J\x1b[2;1H"
+    assert len(screen.writes) == 3
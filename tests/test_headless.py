@@ -0,0 +1,95 @@
+import random
+import pytest
+import Events
+from Headless import HeadlessPoker, CallingAgent, RandomAgent
+
+
+class QuitAgent:
+    def act(self, view):
+        return "quit"
+
+
+class BadAgent:
+    def act(self, view):
+        return "dance"
+
+
+def randomTable(seed, seats=5, money=40):
+    agents = {f"p{i}": RandomAgent(random.Random(seed * 10 + i)) for i in range(seats)}
+    return HeadlessPoker(agents, 2, money=money, rng=random.Random(seed))
+
+
+def test_seeded_games_replay():
+    def play(seed):
+        game = randomTable(seed)
+        played = game.run(40)
+        return played, [(player.name, player.money) for player in game.players]
+
+    for seed in range(5):
+        assert play(seed) == play(seed)
+
+
+# everyone who sat down keeps their chips somewhere: at the table or taken with them when they quit
+def test_chips_are_conserved_to_the_last_player():
+    for seed in range(20):
+        game = randomTable(seed, 2 + seed % 5, 10 + seed)
+        everyone = list(game.players)
+        total = sum(player.money for player in everyone)
+        game.run()
+        assert len(game.players) == 1
+        assert sum(player.money for player in everyone) == total
+
+
+def test_quitting_agent_leaves_the_table():
+    quits = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: quits.append(event.data), [Events.ELIMINATION])
+    game = HeadlessPoker({"a": CallingAgent(), "b": QuitAgent(), "c": CallingAgent()}, 2, events=bus)
+    quitter = game.players[1]
+    assert game.run(3) == 3
+    assert quits == [{"name": "b", "quit": True}]
+    assert sorted(player.name for player in game.players) == ["a", "c"]
+    # b was the big blind and quit at its first turn, its blind stays in the pot
+    assert quitter.money == 98
+    assert sum(player.money for player in game.players) == 202
+
+
+def test_invalid_actions_raise():
+    game = HeadlessPoker({"a": BadAgent(), "b": CallingAgent()}, 2)
+    game.deal()
+    with pytest.raises(ValueError):
+        game.playHand()
+
+
+@pytest.mark.parametrize("agents, minBet", [({"a": CallingAgent()}, 2), ({f"p{i}": CallingAgent() for i in range(7)}, 2), ({"a": CallingAgent(), "b": CallingAgent()}, 0)])
+def test_bad_tables_are_refused(agents, minBet):
+    with pytest.raises(ValueError):
+        HeadlessPoker(agents, minBet)
+
+
+def test_turn_view():
+    views = []
+
+    class Watcher(CallingAgent):
+        def act(self, view):
+            views.append(view)
+            return super().act(view)
+
+    game = HeadlessPoker({"a": Watcher(), "b": CallingAgent()}, 2, money={"a": 30, "b": 50})
+    game.run(1)
+    view = views[0]
+    assert view["name"] == "a" and len(view["hole"]) == 2 and view["phase"] == 1
+    assert view["validChoices"] >= {"call", "fold"}
+    assert view["players"][0][:2] == ("a", 29) and view["pot"] == 3
+    assert view["minRaiseTo"] == view["minAmount"] == 3 and view["maxAmount"] == 30
+
+
+def test_random_agent_keeps_to_the_legal_amounts():
+    agent = RandomAgent(random.Random(3))
+    view = {"validChoices": {"raise", "call", "quit"}, "minAmount": 8, "maxAmount": 12}
+    amounts = {agent.act(view) for _ in range(200)}
+    assert {choice for choice in amounts if not isinstance(choice, tuple)} == {"call"}
+    assert {amount for choice in amounts if isinstance(choice, tuple) for amount in choice[1:]} == set(range(8, 13))
+    # a raise the player can't reach the minimum of calls instead, an unreachable bet checks
+    assert {agent.act(dict(view, minAmount=20, maxAmount=11)) for _ in range(50)} == {"call"}
+    assert {agent.act({"validChoices": {"bet", "check"}, "minAmount": 1, "maxAmount": 0}) for _ in range(50)} == {"check"}
@@ -0,0 +1,80 @@
+import random
+import Events, HandHistory, Stats
+from Game import Player
+from Headless import HeadlessPoker, RandomAgent, CallingAgent
+
+
+def players(*names):
+    seats = []
+    for name in names:
+        player = Player(name)
+        player.money = 100
+        player.hole = [4, 9]
+        seats.append(player)
+    return seats
+
+
+def test_aborted_hand_leaves_no_trace(tmp_path):
+    path = str(tmp_path / "log.hh")
+    with HandHistory.HandHistoryWriter(path) as writer:
+        a, b = players("a", "b")
+        writer.startHand([a, b], 2)
+        writer.recordAction(a, 1, "blind", 2)
+        writer.endHand()
+
+        # "c" only ever sat in a hand that was never ended
+        c, d = players("c", "d")
+        writer.startHand([a, c], 2)
+        writer.recordAction(c, 1, "blind", 2)
+        writer.startHand([a, d, c], 2)
+        writer.recordAction(d, 1, "blind", 2)
+        writer.endHand()
+
+    with HandHistory.HandHistoryReader(path) as reader:
+        assert sorted(reader.names.values()) == ["a", "b", "c", "d"]
+        hands = list(reader.hands())
+        assert [hand["number"] for hand in hands] == [1, 2]
+        assert [name for name, _, _ in hands[1]["seats"]] == ["a", "d", "c"]
+
+    stats = Stats.fromHistory(path)
+    assert {name: counts[Stats.HANDS] for name, counts in stats.totals.items()} == {"a": 2, "b": 1, "c": 1, "d": 1}
+
+
+def test_appending_carries_on_names_and_numbers(tmp_path):
+    path = str(tmp_path / "log.hh")
+    for run in range(2):
+        with HandHistory.HandHistoryWriter(path) as history:
+            agents = {f"p{i}": RandomAgent(random.Random(run * 10 + i)) for i in range(3 + run)}
+            HeadlessPoker(agents, 2, rng=random.Random(run), history=history).run(20)
+
+    with HandHistory.HandHistoryReader(path) as reader:
+        assert sorted(reader.names.values()) == ["p0", "p1", "p2", "p3"]
+        assert [hand["number"] for hand in reader.hands()] == list(range(1, len(reader) + 1))
+
+
+# plays its choices in order, then checks or calls
+class ScriptAgent(CallingAgent):
+    def __init__(self, *script):
+        self.script = list(script)
+
+    def act(self, view):
+        return self.script.pop(0) if self.script else super().act(view)
+
+
+# the big blind's option preflop is a bet, which left the bet above the stake and used to be recorded as a raise
+def test_actions_are_recorded_as_chosen(tmp_path):
+    path = str(tmp_path / "log.hh")
+    sent = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: sent.append((event.data["name"], event.data["phase"], event.data["action"])), [Events.ACTION])
+    agents = {"a": ScriptAgent("call"), "b": ScriptAgent(("bet", 6)), "c": ScriptAgent("call", "fold")}
+    with HandHistory.HandHistoryWriter(path) as history:
+        HeadlessPoker(agents, 2, history=history, events=bus).run(1)
+
+    assert sent[:7] == [
+        ("b", 1, "blind"), ("a", 1, "blind"), ("c", 1, "call"), ("a", 1, "call"), ("b", 1, "bet"), ("c", 1, "fold"), ("a", 1, "call")
+    ]
+    with HandHistory.HandHistoryReader(path) as reader:
+        (hand,) = reader.hands()
+    names = [name for name, _, _ in hand["seats"]]
+    assert [(names[seat], phase, action) for seat, phase, action, _, _, _ in hand["actions"]] == sent
@@ -0,0 +1,75 @@
+import threading
+import pytest
+from Game import Card
+from Hud import EquityHud, countOuts, potOdds
+
+RANKS = {"J": "Jack", "Q": "Queen", "K": "King", "A": "Ace"}
+SUITS = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+
+
+def cards(string):
+    return [Card(RANKS.get(card[:-1], card[:-1]), SUITS[card[-1]]).id for card in string.split()]
+
+
+def test_outs():
+    # 9 hearts make the flush and the 14 other cards left of A, 5, K, 9 and 2 make a pair
+    assert countOuts(cards("AH 5H"), cards("KH 9H 2C"), 1) == 23
+    # two decks hold two copies of everything unseen and a second copy of each of the 5 seen cards
+    assert countOuts(cards("AH 5H"), cards("KH 9H 2C"), 2) == 2 * 23 + 5
+    # quads can't be improved on by a single card here
+    assert countOuts(cards("AH AD"), cards("AC AS 2C 3D"), 1) == 0
+    assert countOuts(cards("AH 5H"), [], 1) is None
+    assert countOuts(cards("AH 5H"), cards("KH 9H 2C 3D 7S"), 1) is None
+
+
+def test_pot_odds():
+    assert potOdds(10, 5) == pytest.approx(1 / 3)
+    assert potOdds(2, 2) == 0.5
+    assert potOdds(10, 0) is None
+
+
+class Seat:
+    hole = cards("AH 5H")
+
+
+# the result turns up while the player is still at the prompt, which is shown again under it
+def test_equity_shows_while_the_player_is_answering():
+    shown = []
+    ready = threading.Event()
+
+    def display(line, **kwargs):
+        shown.append(line)
+        if line.startswith("\n[HUD]"):
+            ready.set()
+
+    def read(message):
+        assert ready.wait(10)
+        return "call"
+
+    hud = EquityHud(1, 500, display, read)
+    hud.startTurn(Seat(), cards("KH 9H 2C"), 1, 10, 5)
+    assert hud.prompt("a would you like to: call, fold ") == "call"
+    hud.stopTurn()
+    hud.close()
+    assert "over 500 runouts" in shown[0] and shown[1] == "a would you like to: call, fold "
+
+
+def test_results_of_a_finished_turn_are_dropped():
+    shown = []
+    hud = EquityHud(1, 500, lambda line, **kwargs: shown.append(line), lambda message: "fold")
+    hud.startTurn(Seat(), cards("KH 9H 2C"), 1, 10, 5)
+    hud.stopTurn()
+    hud.executor.shutdown(wait=True)
+    hud.prompt("next player ")
+    assert shown == []
+
+
+# a result ready between prompts waits for the next one
+def test_results_between_prompts_wait_for_the_prompt():
+    shown = []
+    hud = EquityHud(1, 500, lambda line, **kwargs: shown.append(line), lambda message: "check")
+    hud.startTurn(Seat(), cards("KH 9H 2C"), 1, 10, 0)
+    hud.executor.shutdown(wait=True)
+    assert shown == []
+    hud.prompt("a would you like to: check ")
+    assert len(shown) == 1 and "over 500 runouts" in shown[0] and "calling" not in shown[0]
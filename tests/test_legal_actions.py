@@ -0,0 +1,88 @@
+import itertools
+import pytest
+import HandEvaluator
+from Game import Player, CHOICES, MASK_CHOICES, CALL, CHECK, RAISE
+
+
+def player(money, currentBet):
+    seat = Player("a")
+    seat.money = money
+    seat.currentBet = currentBet
+    return seat
+
+
+# the choices the interactive game offered before legalActions, written out so the mask is checked against them
+def originalChoices(money, currentBet, stake, lastRaise, minBet):
+    choices = {"all in", "fold", "quit"}
+    if money - (stake - currentBet) > 0:
+        if currentBet < stake:
+            choices.add("call")
+            if money - max(minBet, 2 * lastRaise) > 0:
+                choices.add("raise")
+        else:
+            choices.add("check")
+            if money - max(minBet, 2 * lastRaise) > 0:
+                choices.add("bet")
+
+    return choices
+
+
+# whether the interactive game accepted a raise to (or bet of) amount
+def originalAmount(money, currentBet, stake, lastRaise, minBet, amount, raising):
+    if amount < 0 or amount < stake + 2 * lastRaise or amount < minBet or raising and amount == stake:
+        return False
+
+    return money - (amount - currentBet if raising else amount) >= 0
+
+
+def test_mask_matches_the_original_choices_and_amounts():
+    for money, currentBet, stake, lastRaise, minBet in itertools.product(range(14), range(8), range(12), range(5), (1, 2, 4)):
+        if currentBet > stake:
+            continue
+        seat = player(money, currentBet)
+        mask, low, high = seat.legalActions(stake, lastRaise, minBet)
+        choices = originalChoices(money, currentBet, stake, lastRaise, minBet)
+        assert set(MASK_CHOICES[mask]) == choices, (money, currentBet, stake, lastRaise, minBet)
+        for amount in range(-2, 30):
+            allowed = low <= amount <= high
+            if choices & {"raise", "bet"}:
+                original = originalAmount(money, currentBet, stake, lastRaise, minBet, amount, "raise" in choices)
+                assert allowed == original, (money, currentBet, stake, lastRaise, minBet, amount)
+            else:
+                assert not allowed
+
+
+@pytest.mark.parametrize("numpyType", ["int64", "int32", None])
+def test_apply_takes_integer_like_amounts(numpyType):
+    amount = 10
+    if numpyType:
+        np = pytest.importorskip("numpy")
+        amount = getattr(np, numpyType)(10)
+    seat = player(100, 0)
+    total, lastRaise = seat.apply(RAISE, amount, 4, 2, 2)
+    assert (total, lastRaise) == (10, 6)
+    assert type(seat.money) is int and seat.money == 90
+
+
+@pytest.mark.parametrize("amount", [10.0, "10", None])
+def test_apply_rejects_other_amounts(amount):
+    with pytest.raises(ValueError):
+        player(100, 0).apply(RAISE, amount, 4, 2, 2)
+
+
+def test_apply_rejects_illegal_choices():
+    with pytest.raises(ValueError):
+        player(100, 0).apply(CHECK, None, 4, 2, 2)
+    assert player(100, 0).apply(CALL, None, 4, 2, 2) == (4, 2)
+    assert len(CHOICES) == 7
+
+
+# the terminal is shared by everyone at the table, so a turn's prompt never shows what the player holds
+def test_prompt_keeps_the_hand_private(monkeypatch, capsys):
+    seat = player(100, 0)
+    seat.hole = [48, 49]
+    seat.handState = HandEvaluator.HandState(seat.hole + [50, 4, 9])
+    monkeypatch.setattr("builtins.input", lambda message: "check")
+    assert seat.playTurn(0, 0, 2) == (0, 0)
+    out = capsys.readouterr().out
+    assert "Three Of A Kind" not in out and "hand" not in out
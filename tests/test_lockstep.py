@@ -0,0 +1,117 @@
+import pytest
+import Streams
+from Headless import HeadlessPoker
+
+np = pytest.importorskip("numpy")
+Lockstep = pytest.importorskip("Lockstep")
+
+BIG_BLIND = 2
+
+
+# a choice (and amount) from the spot alone, so both engines make the same one, never one of skip
+# unless nothing else is valid
+def pick(hole, phase, stake, currentBet, money, lastRaise, valid, skip):
+    h = (hole[0] * 31 + hole[1] * 17 + phase * 7 + stake * 3 + money + lastRaise * 5) % 23
+    order = [choice for choice in range(len(Lockstep.CHOICES)) if valid >> choice & 1 and choice not in skip]
+    choice = order[h % len(order)] if order else Lockstep.ALL_IN
+    if choice == Lockstep.QUIT and h != 22:
+        choice = Lockstep.FOLD
+    amount = 0
+    if choice == Lockstep.RAISE:
+        low = stake + max(BIG_BLIND, 2 * lastRaise)
+        if low <= currentBet + money:
+            amount = min(currentBet + money, low + h % 3)
+        else:
+            choice = Lockstep.CALL
+    if choice == Lockstep.BET:
+        low = max(BIG_BLIND, stake + 2 * lastRaise)
+        if low <= money:
+            amount = min(money, low + h % 4)
+        else:
+            choice = Lockstep.CHECK
+    return choice, amount
+
+
+class Policy:
+    def __init__(self, skip):
+        self.skip = skip
+
+    def __call__(self, view):
+        picks = [
+            pick(hole, phase, stake, currentBet, money, lastRaise, valid, self.skip)
+            for hole, phase, stake, currentBet, money, lastRaise, valid in zip(
+                view["hole"].tolist(), view["phase"].tolist(), view["stake"].tolist(), view["currentBet"].tolist(),
+                view["money"].tolist(), view["lastRaise"].tolist(), view["validChoices"].tolist(),
+            )
+        ]
+        return np.array([choice for choice, _ in picks]), np.array([amount for _, amount in picks])
+
+
+class Agent:
+    def __init__(self, skip):
+        self.skip = skip
+
+    def act(self, view):
+        valid = sum(1 << Lockstep.CHOICES.index(choice) for choice in view["validChoices"])
+        choice, amount = pick(view["hole"], view["phase"], view["stake"], view["currentBet"], view["money"], view["lastRaise"], valid, self.skip)
+        return (Lockstep.CHOICES[choice], amount) if choice in (Lockstep.RAISE, Lockstep.BET) else Lockstep.CHOICES[choice]
+
+
+# deals the cards it was given in order
+class FirstRng:
+    def randrange(self, start, stop):
+        return start
+
+
+def stacks(game, seats):
+    money = {player.name: player.money for player in game.players}
+    return [money.get(f"p{i}", 0) for i in range(seats)]
+
+
+# nobody goes all in or quits, so every seat stays in and both engines deal each hand from the same stream
+CALM = {Lockstep.ALL_IN, Lockstep.QUIT}
+
+
+@pytest.mark.parametrize("seats", [2, 6])
+def test_same_seeds(seats):
+    tables = Lockstep.LockstepTables(30, seats, BIG_BLIND, money=1000, seed=21)
+    games = [
+        HeadlessPoker({f"p{i}": Agent(CALM) for i in range(seats)}, BIG_BLIND, money=1000, streams=Streams.DealStreams(21, table))
+        for table in range(30)
+    ]
+    for _ in range(8):
+        tables.playHand(Policy(CALM))
+        for game in games:
+            assert game.run(1)
+        assert (tables.money > 0).all()
+        assert tables.stacks().tolist() == [stacks(game, seats) for game in games]
+
+
+# whole runs with players going out and quitting, each hand's cards handed to both engines
+@pytest.mark.parametrize("seats", [3, 6])
+def test_same_cards_to_the_end(seats):
+    rng = np.random.default_rng(seats)
+    tables = Lockstep.LockstepTables(40, seats, BIG_BLIND, money=40)
+    games = [
+        HeadlessPoker({f"p{i}": Agent(()) for i in range(seats)}, BIG_BLIND, money=40, rng=FirstRng())
+        for _ in range(40)
+    ]
+    while tables.tablesInPlay().any():
+        inPlay = tables.rows[tables.tablesInPlay()]
+        cards = rng.integers(0, 52, (len(inPlay), 2 * seats + 5))
+        for row, table in zip(cards.tolist(), inPlay.tolist()):
+            game = games[table]
+            seated = [seat for seat in range(seats) if tables.money[table, seat] > 0 and not tables.left[table, seat]]
+            dealt = [row[seat] for seat in seated] + [row[seats + seat] for seat in seated] + row[2 * seats:]
+            game.deck.cards = dealt + [0] * (len(game.deck.cards) - len(dealt))
+            assert game.deal()
+            assert [player.name for player in game.players] == [f"p{tables.seatIds[table, seat]}" for seat in seated]
+            game.playHand()
+        tables.playHand(Policy(()), cards)
+
+        for table in inPlay.tolist():
+            left = {f"p{tables.seatIds[table, seat]}" for seat in range(seats) if tables.left[table, seat]}
+            expected = stacks(games[table], seats)
+            assert [0 if f"p{i}" in left else chips for i, chips in enumerate(tables.stacks()[table].tolist())] == expected
+
+    assert not any(game.deal() for game in games)
@@ -0,0 +1,36 @@
+import random
+import pytest
+import Metrics
+from Headless import HeadlessPoker, CallingAgent
+
+
+class ScriptedAgent:
+    def __init__(self, moves):
+        self.moves = list(moves)
+
+    def act(self, view):
+        if self.moves:
+            return self.moves.pop(0)
+        return "check" if "check" in view["validChoices"] else "call"
+
+
+def sidePots(agents, money):
+    metrics = Metrics.Metrics(exportEvery=0)
+    HeadlessPoker(agents, 2, money=money, rng=random.Random(1), metrics=metrics).run(1)
+    return metrics.counters.get(("side_pots", None), 0)
+
+
+@pytest.mark.parametrize(
+    "moves, money, expected",
+    [
+        # folds split the pot into layers but none of them is a side pot
+        ([["fold"], [], []], [100, 100, 100], 0),
+        ([[], [], [("raise", 50)]], [10, 100, 100], 1),
+        ([[], [], [("raise", 50)]], [10, 30, 100], 2),
+        ([["fold"], [], ["call", ("bet", 98)]], [100, 60, 100], 1),
+    ],
+)
+def test_side_pots_only_count_all_in_caps(moves, money, expected):
+    names = ["a", "b", "c"]
+    agents = {name: ScriptedAgent(script) if script else CallingAgent() for name, script in zip(names, moves)}
+    assert sidePots(agents, dict(zip(names, money))) == expected
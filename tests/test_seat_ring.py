@@ -0,0 +1,72 @@
+import Events
+from DataStructures import SeatRing
+from Game import Player
+from Headless import HeadlessPoker, CallingAgent
+
+
+def ring(size):
+    return SeatRing([Player(f"p{seat}") for seat in range(size)])
+
+
+def test_next_seat_wraps_around():
+    seats = ring(5)
+    assert [seats.nextActive(seat) for seat in range(5)] == [1, 2, 3, 4, 0]
+    seats.fold(0)
+    seats.fold(4)
+    assert seats.nextActive(3) == 1
+    assert seats.first() == 1
+    assert seats.nextSeat(2, 1 << 2) == 2
+    assert seats.nextSeat(2, 0) is None
+
+
+def test_fold_and_all_in_counts():
+    seats = ring(4)
+    seats.setAllIn(1)
+    seats.setAllIn(1)
+    assert (seats.length, seats.canAct) == (4, 3)
+    seats.fold(2)
+    seats.fold(2)
+    assert (seats.length, seats.canAct) == (3, 2)
+    # an all in player folding only leaves the hand, they had already stopped acting
+    seats.fold(1)
+    assert (seats.length, seats.canAct) == (2, 2)
+    assert [player.name for player in seats.getList()] == ["p0", "p3"]
+    assert not seats.isActive(1) and seats.isActive(3)
+    assert seats.nextToAct(0) == 3 and seats.nextToAct(3) == 0
+
+
+def test_everyone_all_in():
+    seats = ring(3)
+    for seat in range(3):
+        seats.setAllIn(seat)
+    assert seats.canAct == 0
+    assert seats.nextToAct(0) is None
+    assert seats.nextActive(2) == 0
+
+
+def test_update_copies_player_flags():
+    seats = ring(3)
+    seats.players[0].isAllIn = True
+    seats.players[2].folded = True
+    seats.players[1].currentBet = -1
+    for seat in range(3):
+        seats.update(seat)
+    assert (seats.active, seats.folded, seats.allIn) == (0b001, 0b110, 0b001)
+    assert (seats.length, seats.canAct) == (1, 0)
+
+
+# heads up the button is the last seat and posts the big blind, the other seat posts the small blind
+# and acts first on every street, then the button moves across
+def test_heads_up_button_order():
+    started = []
+    acted = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: started.append((event.data["button"], event.data["smallBlind"], event.data["bigBlind"])), [Events.HAND_START])
+    bus.subscribe(lambda event: acted.append((event.hand, event.data["phase"], event.data["name"])), [Events.ACTION])
+    game = HeadlessPoker({"a": CallingAgent(), "b": CallingAgent()}, 2, events=bus)
+    game.run(2)
+    assert started == [("b", "a", "b"), ("a", "b", "a")]
+    hand = acted[0][0]
+    assert [(phase, name) for number, phase, name in acted if number == hand and phase > 1] == [
+        (2, "a"), (2, "b"), (3, "a"), (3, "b"), (4, "a"), (4, "b")
+    ]
@@ -0,0 +1,163 @@
+import asyncio
+import pytest
+import Server
+from Headless import CallingAgent, HeadlessPoker
+from Server import TableClient, TableServer
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+
+async def connect(server, names):
+    if not server.server:
+        await server.start()
+    port = server.server.sockets[0].getsockname()[1]
+    return [await TableClient.connect(name, port=port) for name in names]
+
+
+# every message until the server closes the connection, never acting
+async def listen(client):
+    messages = []
+    message = await client.receive()
+    while message:
+        messages.append(message)
+        message = await client.receive()
+    client.close()
+    return messages
+
+
+def kinds(messages, kind):
+    return [message for message in messages if message["type"] == kind]
+
+
+def test_full_game():
+    async def game():
+        server = TableServer(tableSize=3, hands=5)
+        clients = await connect(server, ["a", "b", "c"])
+        results = await asyncio.gather(*[client.play(CallingAgent()) for client in clients])
+        await server.stop()
+        return results
+
+    results = run(game())
+    for messages in results:
+        assert messages[0]["type"] == "joined"
+        assert kinds(messages, "seated")[0]["players"] == ["a", "b", "c"]
+        assert len(kinds(messages, "hole")) == 5
+        assert not kinds(messages, "error")
+        end = messages[-1]
+        assert end["type"] == "end" and end["hands"] == 5
+        assert sum(end["stacks"].values()) == 300
+
+
+def test_timeouts_check_or_fold():
+    async def game():
+        server = TableServer(tableSize=2, hands=3, timeout=0.2)
+        playing, silent = await connect(server, ["a", "b"])
+        results = await asyncio.gather(playing.play(CallingAgent()), listen(silent))
+        await server.stop()
+        return results
+
+    playing, silent = run(game())
+    assert kinds(silent, "turn") and len(kinds(silent, "timeout")) == len(kinds(silent, "turn"))
+    assert silent[-1]["type"] == playing[-1]["type"] == "end"
+    assert sum(playing[-1]["stacks"].values()) == 200
+
+
+# answers turns with bad messages first, a turn is sent again after the error for each one
+class MalformedClient:
+    BAD = [
+        b"not json\n",
+        b'{"type": "action", "choice": ["call"]}\n',
+        b'{"type": "action", "choice": {"name": "call"}}\n',
+        b'{"type": "action", "choice": "raise", "amount": "lots"}\n',
+        b'{"type": "action", "choice": "bet", "amount": 2.5}\n',
+        b'{"type": "action", "choice": "shove"}\n',
+    ]
+
+    def __init__(self, client):
+        self.client = client
+        self.bad = list(self.BAD)
+
+    async def play(self):
+        messages = []
+        message = await self.client.receive()
+        while message:
+            messages.append(message)
+            if message["type"] == "turn":
+                if self.bad:
+                    # the line that isn't JSON is ignored, so the next one goes with it
+                    while self.bad and self.bad[0].startswith(b"not"):
+                        self.client.writer.write(self.bad.pop(0))
+                    self.client.writer.write(self.bad.pop(0))
+                else:
+                    self.client.act(CallingAgent().act(dict(message, validChoices=set(message["validChoices"]))))
+            message = await self.client.receive()
+        self.client.close()
+        return messages
+
+
+def test_malformed_actions_are_sent_back():
+    async def game():
+        server = TableServer(tableSize=2, hands=3)
+        bad, good = await connect(server, ["a", "b"])
+        results = await asyncio.gather(MalformedClient(bad).play(), good.play(CallingAgent()))
+        await server.stop()
+        return results
+
+    bad, good = run(game())
+    assert len(kinds(bad, "error")) == len(MalformedClient.BAD) - 1
+    assert bad[-1]["type"] == good[-1]["type"] == "end"
+    assert bad[-1]["hands"] == 3
+
+
+def test_full_server_turns_players_away():
+    async def game():
+        server = TableServer(tableSize=2, maxTables=1)
+        seated = await connect(server, ["a", "b"])
+        while (await seated[0].receive())["type"] != "seated":
+            pass
+        (late,) = await connect(server, ["c"])
+        rejected = await listen(late)
+        for client in seated:
+            client.close()
+        await server.stop()
+        return rejected
+
+    rejected = run(game())
+    assert [message["type"] for message in rejected] == ["error"]
+
+
+def test_table_error_is_logged_and_ends_the_table(monkeypatch, capsys):
+    def broken(self, hands=None):
+        raise RuntimeError("broken table")
+
+    monkeypatch.setattr(Server.ServerTable, "run", broken)
+
+    async def game():
+        server = TableServer(tableSize=2)
+        clients = await connect(server, ["a", "b"])
+        results = await asyncio.gather(*[listen(client) for client in clients])
+        await server.stop()
+        return results
+
+    for messages in run(game()):
+        assert messages[-1] == {"type": "error", "message": "The table stopped"}
+    assert "broken table" in capsys.readouterr().err
+
+
+def test_rejects_bad_table_sizes():
+    with pytest.raises(ValueError):
+        TableServer(tableSize=7)
+
+
+class ListAgent:
+    def act(self, view):
+        return ["call"]
+
+
+def test_choice_that_isnt_a_name_is_invalid():
+    game = HeadlessPoker({"a": ListAgent(), "b": CallingAgent()}, 2)
+    game.deal()
+    with pytest.raises(ValueError):
+        game.playHand()
@@ -0,0 +1,133 @@
+import random
+import Events, HandEvaluator
+from Game import Card, Pot
+from DataStructures import Queue
+from Headless import HeadlessPoker, CallingAgent, RandomAgent
+
+RANKS = {"J": "Jack", "Q": "Queen", "K": "King", "A": "Ace"}
+SUITS = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+
+
+def cards(string):
+    return [Card(RANKS.get(card[:-1], card[:-1]), SUITS[card[-1]]).id for card in string.split()]
+
+
+# deals the cards it was given in order
+class FirstRng:
+    def randrange(self, start, stop):
+        return start
+
+
+class AllInAgent:
+    def act(self, view):
+        return "all in"
+
+
+class FoldingAgent:
+    def act(self, view):
+        return "fold"
+
+
+# a table whose next hand deals holes (one string per seat) and then board
+def table(agents, money, holes, board, minBet=2):
+    game = HeadlessPoker(agents, minBet, money=money, rng=FirstRng())
+    holes = [cards(hole) for hole in holes]
+    dealt = [hole[0] for hole in holes] + [hole[1] for hole in holes] + cards(board)
+    game.deck.cards = dealt + [card for card in game.deck.cards if card not in dealt]
+    return game
+
+
+def pots(game):
+    sent = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: sent.append((event.data["number"], event.data["total"], event.data["players"])), [Events.POT])
+    game.events = bus
+    return sent
+
+
+def stacks(game):
+    return {player.name: player.money for player in game.activePlayers.players}
+
+
+# all ins of 10, 30 and 60 against a deeper stack make a main pot and two side pots,
+# the shortest stack has the best hand so each pot goes to a different player
+def test_side_pots():
+    game = table(
+        {"a": AllInAgent(), "b": AllInAgent(), "c": AllInAgent(), "d": CallingAgent()},
+        {"a": 10, "b": 30, "c": 60, "d": 100},
+        ["AH AD", "KH KD", "QH QD", "4C 5S"],
+        "2C 7D 9H JS 3D",
+    )
+    sent = pots(game)
+    game.deal()
+    game.playHand()
+    assert sent == [(0, 40, ["a", "b", "c", "d"]), (1, 60, ["b", "c", "d"]), (2, 60, ["c", "d"])]
+    assert stacks(game) == {"a": 40, "b": 60, "c": 60, "d": 40}
+
+
+# the button calls, the small blind folds and the big blind checks it down, the board plays for both
+# so the 7 chip pot splits 3 each and the odd chip goes to the big blind, the first winner left of the button
+def test_odd_chip_goes_left_of_the_button():
+    game = table(
+        {"a": FoldingAgent(), "b": CallingAgent(), "c": CallingAgent()},
+        50,
+        ["2C 3D", "4C 5D", "6C 7D"],
+        "AS KS QS JS 10S",
+        minBet=3,
+    )
+    game.deal()
+    game.playHand()
+    assert stacks(game) == {"a": 49, "b": 51, "c": 50}
+
+
+def test_everyone_folds_to_the_big_blind():
+    game = table({"a": FoldingAgent(), "b": FoldingAgent(), "c": FoldingAgent()}, 50, ["2C 3D", "4C 5D", "6C 7D"], "")
+    sent = pots(game)
+    game.deal()
+    game.playHand()
+    assert sent == [(0, 3, ["b"])]
+    assert stacks(game) == {"a": 49, "b": 51, "c": 50}
+
+
+# chips only left by a player who has since folded still go to the best hand left
+def test_pot_whose_players_all_folded():
+    game = HeadlessPoker({"a": CallingAgent(), "b": CallingAgent(), "c": CallingAgent()}, 2, money=10)
+    game.deal()
+    a, b, c = game.activePlayers.players
+    a.money = b.money = c.money = 0
+    game.community = cards("2C 7D 9H JS 3D")
+    for player, hole in zip((a, b, c), ("AH AD", "KH KD", "QH QD")):
+        player.hole = cards(hole)
+        player.hand = list(player.hole)
+        player.handState = HandEvaluator.HandState(player.hole + game.community)
+    a.folded = True
+    game.activePlayers.fold(0)
+    game.pots = Queue()
+    game.pots.enqueue(Pot(30, [a, b, c]))
+    game.pots.enqueue(Pot(20, [a]))
+
+    results = game.resolveShowdown()
+    assert [(winners, total, contested) for winners, total, _, _, _, contested in results] == [([b], 30, True), ([b], 20, True)]
+    assert (a.money, b.money, c.money) == (0, 50, 0)
+
+
+# random games with blinds, all ins, side pots, splits and players quitting never make or lose a chip
+def test_chips_are_conserved():
+    for seed in range(30):
+        rng = random.Random(seed)
+        agents = {f"p{i}": RandomAgent(random.Random(seed * 10 + i)) for i in range(rng.randint(2, 6))}
+        game = HeadlessPoker(agents, 2, money=rng.randint(5, 60), rng=random.Random(seed))
+        total = sum(player.money for player in game.players)
+        while game.deal():
+            game.playHand()
+            assert sum(player.money for player in game.activePlayers.players) == total
+            total = sum(player.money for player in game.players)
+
+
+def test_split_pot_gives_the_odd_chips_to_the_first_winner():
+    game = HeadlessPoker({"a": CallingAgent(), "b": CallingAgent(), "c": CallingAgent()}, 2, money=0)
+    a, b, c = game.players
+    assert game.splitPot([b, c, a], 11) == (3, b, 2)
+    assert (a.money, b.money, c.money) == (3, 5, 3)
+    assert game.splitPot([a, c], 8) == (4, None, None)
+    assert (a.money, b.money, c.money) == (7, 5, 7)
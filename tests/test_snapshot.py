@@ -0,0 +1,97 @@
+import random
+import pytest
+import Events, Snapshot, Streams
+from Headless import HeadlessPoker
+
+NAMES = ("ann", "bob", "cat", "dan")
+
+
+# decides from the view alone, so a restored table makes the same choices as the one it was taken from
+class ViewAgent:
+    def act(self, view):
+        choices = sorted(view["validChoices"] - {"quit", "all in"}) or ["all in"]
+        choice = choices[hash((view["phase"], view["pot"], view["stake"], *view["hole"])) % len(choices)]
+        if choice in ("raise", "bet"):
+            return choice, view["minAmount"]
+        return choice
+
+
+# takes a snapshot of its table at its turn-th act
+class SnapshotAgent(ViewAgent):
+    def __init__(self, turn):
+        self.turn = turn
+        self.blob = None
+        self.game = None
+
+    def act(self, view):
+        self.turn -= 1
+        if self.turn == 0:
+            self.blob = Snapshot.snapshot(self.game)
+        return super().act(view)
+
+
+def table(agent=None, **kwargs):
+    agents = {name: ViewAgent() for name in NAMES}
+    if agent:
+        agents["cat"] = agent
+    game = HeadlessPoker(agents, 4, money=1000, **kwargs)
+    if agent:
+        agent.game = game
+    return game
+
+
+def stacks(game):
+    return {player.name: player.money for player in game.activePlayers.players}
+
+
+def test_round_trip():
+    game = table(rng=random.Random(1))
+    game.run(3)
+    game.deal()
+    game.dealStreet()
+    blob = Snapshot.snapshot(game)
+
+    clone = Snapshot.restore(table(), blob)
+    assert Snapshot.snapshot(clone) == blob
+    assert clone.deck.rng.getstate() == game.deck.rng.getstate()
+    assert clone.deck.dealCards(5) == game.deck.dealCards(5)
+
+
+@pytest.mark.parametrize("turn", [1, 3, 7, 12])
+def test_resume_mid_turn(turn):
+    agent = SnapshotAgent(turn)
+    game = table(agent, rng=random.Random(turn))
+    while agent.blob is None:
+        assert game.run(1)
+    before = stacks(game)
+
+    clone = Snapshot.restore(table(rng=random.Random()), agent.blob)
+    clone.resumeHand()
+    assert stacks(clone) == before
+
+    # the deck's rng carries on from the same state, so the hands after match too
+    game.run(5)
+    clone.run(5)
+    assert stacks(clone) == stacks(game)
+
+
+def test_resume_between_streets():
+    game = table(streams=Streams.DealStreams(8))
+    blobs = []
+    bus = Events.EventBus()
+    bus.subscribe(lambda event: blobs.append(Snapshot.snapshot(game)) if event.data["phase"] == 3 else None, [Events.STREET])
+    game.events = bus
+    while not blobs:
+        assert game.run(1)
+    before = stacks(game)
+
+    clone = Snapshot.restore(table(streams=Streams.DealStreams(8)), blobs[0])
+    assert clone.turn is None
+    clone.resumeHand()
+    assert stacks(clone) == before
+
+
+def test_resume_needs_a_hand():
+    game = table()
+    with pytest.raises(ValueError):
+        game.resumeHand()
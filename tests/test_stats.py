@@ -0,0 +1,54 @@
+import random
+import pytest
+import Events, HandHistory, Stats
+from Headless import HeadlessPoker, RandomAgent, CallingAgent
+
+pytest.importorskip("numpy")
+
+
+# tables of 2 to 6 players sharing names, counted by events as they play and logged to one hand history
+@pytest.fixture(scope="module")
+def played(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("stats") / "log.hh")
+    stats = Stats.PlayerStats()
+    for table in range(12):
+        bus = Events.EventBus()
+        bus.subscribe(stats, Stats.KINDS, background=table % 2 == 0)
+        with HandHistory.HandHistoryWriter(path) as history:
+            agents = {
+                f"p{(table + i) % 9}": RandomAgent(random.Random(table * 10 + i)) if i % 3 else CallingAgent()
+                for i in range(2 + table % 5)
+            }
+            HeadlessPoker(agents, 2, rng=random.Random(table), history=history, events=bus).run(150)
+        bus.close()
+
+    return path, stats
+
+
+@pytest.mark.parametrize("chunkRecords", [7, 100, Stats.CHUNK_RECORDS])
+def test_history_matches_events(played, chunkRecords):
+    path, stats = played
+    assert Stats.fromHistory(path, chunkRecords).totals == stats.totals
+
+
+def test_report(played):
+    _, stats = played
+    report = stats.report()
+    assert sum(player["net"] for player in report.values()) == 0
+    for player in report.values():
+        assert 0 <= player["pfr"] <= player["vpip"] <= 1
+        assert player["wsd"] is None or 0 <= player["wsd"] <= 1
+
+
+def test_cut_hand_is_left_out(played, tmp_path):
+    path, _ = played
+    with open(path, "rb") as file:
+        data = file.read()
+    cut = str(tmp_path / "cut.hh")
+    with open(cut, "wb") as file:
+        file.write(data[:-HandHistory.RECORD.size])
+
+    whole = Stats.fromHistory(path).totals
+    totals = Stats.fromHistory(cut, 100).totals
+    assert sum(counts[Stats.HANDS] for counts in whole.values()) - sum(counts[Stats.HANDS] for counts in totals.values()) > 0
+    assert all(totals[name][Stats.HANDS] <= counts[Stats.HANDS] for name, counts in whole.items())
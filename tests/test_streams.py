@@ -0,0 +1,49 @@
+import random
+import pytest
+import Streams
+from Game import Deck
+from Headless import HeadlessPoker, RandomAgent
+
+np = pytest.importorskip("numpy")
+Lockstep = pytest.importorskip("Lockstep")
+
+
+@pytest.mark.parametrize("numberOfDecks", [1, 2])
+def test_replay_deck_matches_shuffle_batch(numberOfDecks):
+    size = numberOfDecks * 52
+    tables = np.arange(40)
+    hands = tables * 7 + 3
+    rows = Streams.shuffleBatch(99, tables, hands, size)
+    for table, hand in zip(tables.tolist(), hands.tolist()):
+        deck = Streams.replayDeck(99, table, hand, numberOfDecks)
+        assert deck.dealCards(size) == (rows[table] // numberOfDecks).tolist()
+
+
+def test_rows_only_depend_on_their_id():
+    batch = Streams.shuffleBatch(3, np.arange(500), np.full(500, 4), 104, 17)
+    one = Streams.shuffleBatch(3, [123], [4], 104, 17)
+    assert (batch[123] == one[0]).all()
+    assert all(len(set(row)) == 17 for row in batch.tolist())
+
+
+def test_a_hand_deals_the_same_in_both_engines():
+    tables = Lockstep.LockstepTables(20, 6, 2, seed=11)
+    tables.deal(np.arange(20))
+    for table in range(20):
+        game = HeadlessPoker({f"p{i}": RandomAgent() for i in range(6)}, 2, streams=Streams.DealStreams(11, table))
+        game.deal()
+        assert [player.hole for player in game.players] == tables.hole[table].tolist()
+        for _ in range(3):
+            game.dealStreet()
+        assert game.community == tables.community[table].tolist()
+
+
+def test_stream_games_replay():
+    def play():
+        agents = {f"p{i}": RandomAgent(random.Random(i)) for i in range(4)}
+        game = HeadlessPoker(agents, 2, streams=Streams.DealStreams(5, 2))
+        game.run(50)
+        return {player.name: player.money for player in game.players}
+
+    assert play() == play()
+    assert Deck(2).cards == sorted(Deck(2).cards)
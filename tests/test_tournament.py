@@ -0,0 +1,40 @@
+import random
+import pytest
+from Headless import RandomAgent
+from Tournament import Tournament, rebalance, tablesNeeded
+
+
+@pytest.mark.parametrize("tableSize", range(2, 7))
+@pytest.mark.parametrize("players", [3, 5, 7, 13])
+def test_odd_fields_play_out(tableSize, players):
+    agents = {f"p{i}": RandomAgent(random.Random(i)) for i in range(players)}
+    tournament = Tournament(agents, money=20, tableSize=tableSize, handsPerLevel=5, workers=1, seed=players * tableSize)
+    assert all(len(seats) >= 2 for seats in tournament.tables.values())
+
+    for result in tournament.run():
+        if result["type"] == "level":
+            assert all(2 <= len(seats) <= max(tableSize, 3) for seats in tournament.tables.values())
+
+    standings = tournament.getStandings()
+    assert sorted(standings) == sorted(agents)
+    assert result["type"] == "winner" and result["name"] == standings[0]
+    assert result["money"] == 20 * players
+
+
+@pytest.mark.parametrize("tableSize", range(2, 7))
+def test_rebalance_never_leaves_a_lone_seat(tableSize):
+    rng = random.Random(tableSize)
+    for players in range(2, 40):
+        seats = [(f"p{i}", 0, None) for i in range(players)]
+        count = tablesNeeded(players, tableSize)
+        tables = {tableId: seats[tableId::count] for tableId in range(count)}
+        while sum(len(seats) for seats in tables.values()) > 1:
+            for tableId in list(tables):
+                if rng.random() < 0.3:
+                    tables[tableId].pop()
+                if not tables[tableId]:
+                    del tables[tableId]
+            if sum(len(seats) for seats in tables.values()) < 2:
+                break
+            rebalance(tables, tableSize)
+            assert all(2 <= len(seats) <= max(tableSize, 3) for seats in tables.values())
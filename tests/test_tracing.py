@@ -0,0 +1,66 @@
+import itertools
+from Headless import HeadlessPoker, CallingAgent
+from Tracing import HandTracer, NULL_SPAN
+
+
+# every reading is a microsecond after the last
+def ticks():
+    counter = itertools.count(0, 1000)
+    return lambda: next(counter)
+
+
+def test_collapsed_stacks_hold_each_spans_self_time():
+    tracer = HandTracer(clock=ticks())
+    tracer.startHand()
+    with tracer.span("deal"):
+        pass
+    with tracer.span("preflop"):
+        with tracer.span("action"):
+            pass
+    tracer.finishHand()
+    assert tracer.collapsed() == "hand 3\nhand;deal 1\nhand;preflop 2\nhand;preflop;action 1\n"
+
+    (duration, number, spans), = tracer.slowestHands()
+    assert (duration, number) == (7000, 1)
+    assert spans == [("hand", 0, 7000), ("hand;deal", 1000, 1000), ("hand;preflop", 3000, 3000), ("hand;preflop;action", 4000, 1000)]
+
+
+def test_spans_left_open_are_closed_with_the_hand():
+    tracer = HandTracer(clock=ticks())
+    tracer.startHand()
+    tracer.span("river").__enter__()
+    tracer.span("action").__enter__()
+    tracer.finishHand()
+    assert tracer.collapsed() == "hand 2\nhand;river 2\nhand;river;action 1\n"
+    assert not tracer.open and not tracer.tracing
+
+
+def test_sampling_and_keeping_the_slowest(tmp_path):
+    tracer = HandTracer(sampleEvery=2, keepSlowest=2, clock=ticks())
+    for hand in range(1, 9):
+        tracer.startHand()
+        if not tracer.tracing:
+            assert hand % 2 and tracer.span("deal") is NULL_SPAN
+            continue
+        for _ in range(hand):
+            with tracer.span("turn"):
+                pass
+        tracer.finishHand()
+
+    assert [number for _, number, _ in tracer.slowestHands()] == [8, 6]
+    path = str(tmp_path / "hands.folded")
+    tracer.writeCollapsed(path)
+    with open(path) as file:
+        assert file.read() == tracer.collapsed()
+    assert tracer.stacks["hand;turn"] == (2 + 4 + 6 + 8) * 1000
+
+
+def test_traced_games_nest_inside_the_hand():
+    tracer = HandTracer()
+    HeadlessPoker({name: CallingAgent() for name in "abc"}, 2, tracer=tracer).run(5)
+    lines = tracer.collapsed().splitlines()
+    paths = [line.rsplit(" ", 1)[0] for line in lines]
+    assert all(int(line.rsplit(" ", 1)[1]) >= 1 for line in lines)
+    assert all(path == "hand" or path.startswith("hand;") for path in paths)
+    assert {"hand;deal", "hand;blinds", "hand;showdown"} <= set(paths)
+    assert len(tracer.slowestHands()) == 5